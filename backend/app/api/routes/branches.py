@@ -1,10 +1,27 @@
 # banjos_restaurant\app\api\routes\branches.py
-from fastapi import APIRouter, UploadFile, File, HTTPException, Form
-from app.schemas.branches import BranchCreate, BranchResponse
-from app.services.branches_service import create_branch, get_branch, update_branch, delete_branch, get_all_branches
+from datetime import datetime
+from fastapi import APIRouter, UploadFile, File, HTTPException, Form, Depends, Query, Response
+from app.core.http_cache import STABLE_CACHE_CONTROL, conditional_get
+from app.schemas.branches import BranchCreate, BranchResponse, NearbyBranchResponse
+from app.services.branches_service import (
+    create_branch, get_branch, update_branch, delete_branch, get_all_branches, get_nearby_branches, get_open_branches
+)
 from typing import List, Optional
 
-router = APIRouter(prefix="", tags=["Branches"])
+router = APIRouter(prefix="", tags=["Branches"], dependencies=[Depends(conditional_get("branches", STABLE_CACHE_CONTROL))])
+
+# Answers that change with the clock, not only with branch writes, so they get no version ETag.
+# Included before `router`, so its paths are not taken for a branch ID.
+live_router = APIRouter(prefix="", tags=["Branches"])
+
+@live_router.get("/open-now", response_model=List[BranchResponse])
+async def list_open_branches(
+    response: Response,
+    at: Optional[datetime] = Query(None, description="Check this time instead of now; naive times are branch-local"),
+):
+    """Retrieve the open branches whose opening hours cover the current (or given) time."""
+    response.headers["Cache-Control"] = STABLE_CACHE_CONTROL
+    return await get_open_branches(at)
 
 @router.post("/", response_model=BranchResponse)
 async def create_new_branch(
@@ -56,6 +73,16 @@ async def list_branches():
     """Retrieve all branches."""
     return await get_all_branches()
 
+@router.get("/nearby", response_model=List[NearbyBranchResponse])
+async def list_nearby_branches(
+    lat: float = Query(..., ge=-90, le=90),
+    lng: float = Query(..., ge=-180, le=180),
+    radius: float = Query(10, gt=0, le=500, description="Search radius in kilometres"),
+    limit: int = Query(10, ge=1, le=50),
+):
+    """Retrieve the nearest open branches around a point, nearest first."""
+    return await get_nearby_branches(lat, lng, radius, limit)
+
 @router.get("/{branch_id}", response_model=BranchResponse)
 async def get_branch_by_id(branch_id: str):
     """Retrieve a branch by its ID."""
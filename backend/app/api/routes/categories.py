@@ -1,5 +1,6 @@
 # banjos_restaurant\app\api\routes\categories.py
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends
+from app.core.http_cache import conditional_get
 from app.schemas.categories import CategoryCreate, CategoryUpdate, CategoryResponse
 from app.services.categories_service import (
     create_category,
@@ -10,7 +11,10 @@ from app.services.categories_service import (
 )
 from typing import List
 
-router = APIRouter(prefix="", tags=["Categories"])
+# Categories drive the menu layout, so revalidate on every use
+CACHE_CONTROL = "public, no-cache"
+
+router = APIRouter(prefix="", tags=["Categories"], dependencies=[Depends(conditional_get("categories", CACHE_CONTROL))])
 
 @router.post("/", response_model=CategoryResponse)
 async def add_category(category: CategoryCreate):
@@ -0,0 +1,25 @@
+# banjos_restaurant\app\api\routes\email_outbox.py
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Any, Dict, List, Literal, Optional
+from app.core.auth import require_admin
+from app.utils.email import outbox
+
+# The outbox history lives in each worker's memory: a message is only visible on
+# the worker that queued it (its id is logged there as "Queued email <id>").
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+@router.get("/messages")
+async def list_outbox_messages(
+    status: Optional[Literal["queued", "sending", "retrying", "sent", "failed"]] = Query(None),
+    limit: int = Query(50, ge=1, le=500)
+) -> List[Dict[str, Any]]:
+    """API to list recent outgoing emails on this worker, newest first"""
+    return outbox.messages(status, limit)
+
+@router.get("/messages/{message_id}")
+async def get_outbox_message(message_id: str) -> Dict[str, Any]:
+    """API to get the delivery state of one outgoing email"""
+    record = outbox.status(message_id)
+    if not record:
+        raise HTTPException(status_code=404, detail="Message not found on this worker")
+    return record
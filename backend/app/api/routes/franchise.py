@@ -1,10 +1,12 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends, Query
 from app.core.database import dynamodb
-from typing import List
+from app.core.pagination import Page, PageParams, page_params
+from typing import Literal
 from app.models.franchise import FranchiseRequestCreate, FranchiseRequestResponse
 from app.services.franchise_service import (
     create_franchise_request,
-    get_all_requests,
+    get_requests_page,
+    export_requests,
     get_request_by_id,
     update_request_status,
     delete_request,
@@ -17,10 +19,15 @@ async def add_franchise_request(request_data: FranchiseRequestCreate):
     """API to create a franchise request"""
     return await create_franchise_request(request_data)
 
-@router.get("/requests/", response_model=List[FranchiseRequestResponse])
-async def list_franchise_requests():
-    """API to get all franchise requests"""
-    return await get_all_requests()
+@router.get("/requests/", response_model=Page[FranchiseRequestResponse])
+async def list_franchise_requests(params: PageParams = Depends(page_params)):
+    """API to get franchise requests, one page at a time"""
+    return await get_requests_page(params)
+
+@router.get("/requests/export")
+async def export_franchise_requests(export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format")):
+    """API to stream all franchise requests as NDJSON or CSV"""
+    return await export_requests(export_format)
 
 @router.get("/requests/{request_id}", response_model=FranchiseRequestResponse)
 async def retrieve_franchise_request(request_id: str):
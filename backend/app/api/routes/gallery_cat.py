@@ -1,15 +1,17 @@
-from fastapi import APIRouter, HTTPException, UploadFile, File, Form
-from typing import List, Optional
+from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Depends
+from app.core.http_cache import STABLE_CACHE_CONTROL, conditional_get
+from app.core.pagination import Page, PageParams, page_params
+from typing import Optional
 from app.schemas.gallery_cat import GalleryCreate, GalleryCategoryUpdate, GalleryCategoryResponse
 from app.services.gallery_cat_service import (
     create_gallery_category,
     get_gallery_category,
-    get_all_gallery_categories,
+    get_gallery_categories_page,
     update_gallery_category,
     delete_gallery_category,
 )
 
-router = APIRouter(prefix="", tags=["Gallery"])
+router = APIRouter(prefix="", tags=["Gallery"], dependencies=[Depends(conditional_get("gallery_categories", STABLE_CACHE_CONTROL))])
 
 @router.post("/categories/add", response_model=GalleryCategoryResponse)
 async def add_gallery_category(
@@ -21,10 +23,10 @@ async def add_gallery_category(
     new_category = await create_gallery_category(category_data, image)
     return new_category
 
-@router.get("/categories", response_model=List[GalleryCategoryResponse])
-async def list_gallery_categories():
-    """Retrieve all gallery categories."""
-    return await get_all_gallery_categories()
+@router.get("/categories", response_model=Page[GalleryCategoryResponse])
+async def list_gallery_categories(params: PageParams = Depends(page_params)):
+    """Retrieve gallery categories, one page at a time."""
+    return await get_gallery_categories_page(params)
 
 @router.get("/categories/{category_id}", response_model=GalleryCategoryResponse)
 async def get_gallery_category_by_id(category_id: str):
@@ -1,15 +1,17 @@
-from fastapi import APIRouter, HTTPException, UploadFile, File
-from typing import List, Optional
+from fastapi import APIRouter, HTTPException, UploadFile, File, Depends
+from app.core.http_cache import STABLE_CACHE_CONTROL, conditional_get
+from app.core.pagination import Page, PageParams, page_params
+from typing import Optional
 from app.schemas.image import ImageCreate, ImageUpdate, ImageResponse
 from app.services.image_service import (
     create_image,
     get_image,
-    get_all_images,
+    get_images_page,
     update_image,
     delete_image,
 )
 
-router = APIRouter(prefix="/images", tags=["Images"])
+router = APIRouter(prefix="/images", tags=["Images"], dependencies=[Depends(conditional_get("images", STABLE_CACHE_CONTROL))])
 
 @router.post("/add", response_model=ImageResponse)
 async def add_image(
@@ -27,10 +29,10 @@ async def add_image(
     new_image = await create_image(image_data, file)
     return new_image
 
-@router.get("/", response_model=List[ImageResponse])
-async def list_images():
-    """Retrieve all images."""
-    return await get_all_images()
+@router.get("/", response_model=Page[ImageResponse])
+async def list_images(params: PageParams = Depends(page_params)):
+    """Retrieve images, one page at a time."""
+    return await get_images_page(params)
 
 @router.get("/{image_id}", response_model=ImageResponse)
 async def get_image_by_id(image_id: str):
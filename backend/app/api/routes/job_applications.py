@@ -1,14 +1,16 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, Form, Depends
-from typing import Optional, List
+from fastapi import APIRouter, UploadFile, File, HTTPException, Form, Depends, Query
+from typing import Optional, List, Literal
 from datetime import datetime
+from app.core.pagination import Page, PageParams, page_params
 from app.schemas.job_applications import JobApplicationCreate, JobApplicationResponse, ALLOWED_STATUSES, StatusUpdate
 from app.services.job_applications_service import (
     create_job_application,
-    get_all_job_applications,
+    get_job_applications_page,
+    export_job_applications,
     get_job_application_by_id,
     update_job_application_status,
     delete_job_application,
-    filter_job_applications_by_title
+    filter_job_applications
 )
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -41,15 +43,27 @@ async def create_new_job_application(
     }
     return await create_job_application(JobApplicationCreate(**application_data), resume)
 
-@router.get("/", response_model=List[JobApplicationResponse])
-async def list_all_job_applications():
-    """Retrieve all job applications."""
-    return await get_all_job_applications()
+@router.get("/", response_model=Page[JobApplicationResponse])
+async def list_all_job_applications(params: PageParams = Depends(page_params)):
+    """Retrieve job applications, one page at a time."""
+    return await get_job_applications_page(params)
+
+@router.get("/export")
+async def export_all_job_applications(export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format")):
+    """Stream every job application as NDJSON or CSV."""
+    return await export_job_applications(export_format)
 
 @router.get("/filter", response_model=List[JobApplicationResponse])
-async def filter_applications_by_title(job_title: str):
-    """Filter job applications by job title."""
-    return await filter_job_applications_by_title(job_title)
+async def filter_applications_by_title(
+    job_title: Optional[str] = None,
+    job_position_id: Optional[str] = None,
+    match: Literal["substring", "prefix"] = "substring",
+    status: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+):
+    """Filter job applications by job title and/or position, optionally by status and creation time."""
+    return await filter_job_applications(job_title, job_position_id, match, status, created_from, created_to)
 
 @router.get("/{application_id}", response_model=JobApplicationResponse)
 async def get_single_job_application(application_id: str):
@@ -7,8 +7,8 @@ from app.services.job_position_service import (
     get_job_position_by_id,
     update_job_position,
     delete_job_position,
-    save_image,
 )
+from app.services.image_store_service import store_image
 
 router = APIRouter()
 
@@ -35,7 +35,9 @@ async def add_job_position(
         "image_url": None,
     }
     if image:
-        job_data["image_url"] = await save_image(image)
+        stored = await store_image(image)
+        job_data["image_url"] = stored.url
+        job_data["image_variants"] = stored.variants
     return await create_job_position(job_data)
 
 @router.get("/", response_model=list[JobPositionResponse])
@@ -73,8 +75,7 @@ async def modify_job_position(
         "job_type": job_type,
         "status": status,
     }
-    if image:
-        job_data["image_url"] = await save_image(image)
+    # The service stores the new image and releases the old one
     return await update_job_position(job_id, job_data, image)
 
 @router.delete("/{job_id}")
@@ -1,16 +1,23 @@
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Request, Response, Depends, Query
+from app.core.http_cache import conditional_get
 from typing import Optional, List
-from app.schemas.menu import MenuCreate, MenuUpdate, MenuResponse
+from app.schemas.menu import MenuCreate, MenuUpdate, MenuResponse, MenuBulkResult
 from app.services.menu_service import (
+    bulk_write_menu_items,
     create_menu_item,
     get_menu_item,
-    get_all_menu_items,
+    get_menu_snapshot,
     get_menu_items_by_category,
+    parse_bulk_rows,
+    search_menu_items,
     update_menu_item,
     delete_menu_item,
 )
 
-router = APIRouter(prefix="", tags=["Menu"])
+# Prices and availability change during the day: always revalidate (cheap with ETags)
+CACHE_CONTROL = "public, no-cache"
+
+router = APIRouter(prefix="", tags=["Menu"], dependencies=[Depends(conditional_get("menu", CACHE_CONTROL))])
 
 @router.post("/add", response_model=MenuResponse)
 async def add_menu_item(
@@ -35,10 +42,30 @@ async def add_menu_item(
     }
     return await create_menu_item(menu_data, image)
 
+@router.post("/bulk", response_model=MenuBulkResult)
+async def bulk_menu_items(request: Request):
+    """Create, update and toggle availability of many menu items in one request.
+
+    The body is a JSON array of operations, or CSV (`Content-Type: text/csv`)
+    whose header row names the same fields. Nothing is written unless every
+    row is valid.
+    """
+    rows = parse_bulk_rows(await request.body(), request.headers.get("content-type", ""))
+    return await bulk_write_menu_items(rows)
+
 @router.get("", response_model=List[MenuResponse])
-async def list_menu_items():
-    """Retrieve all menu items."""
-    return await get_all_menu_items()
+async def list_menu_items(request: Request, response: Response):
+    """Retrieve all menu items, served from the pre-encoded menu snapshot."""
+    snapshot = await get_menu_snapshot()
+    return snapshot.response(request, etag=response.headers.get("etag"), cache_control=CACHE_CONTROL)
+
+@router.get("/search", response_model=List[MenuResponse])
+async def search_menu(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100)
+):
+    """Search menu items by name, category and description, best matches first."""
+    return await search_menu_items(q, limit)
 
 @router.get("/category/{category_name}", response_model=List[MenuResponse])
 async def get_menu_items_by_category_route(category_name: str):
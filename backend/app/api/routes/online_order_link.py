@@ -1,15 +1,10 @@
-from fastapi import APIRouter, HTTPException, UploadFile, File, Form
+from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Depends
+from app.core.http_cache import STABLE_CACHE_CONTROL, conditional_get
 from app.services.online_order_link_service import OnlineOrderLinkService
 from app.schemas.online_order_link import OnlineOrderLinkCreate, OnlineOrderLinkUpdate
-import os
-import shutil
-from uuid import uuid4
+from app.services.image_store_service import store_image
 
-router = APIRouter()
-
-# Directory to store uploaded images
-IMAGE_DIR = "static/images"
-os.makedirs(IMAGE_DIR, exist_ok=True)
+router = APIRouter(dependencies=[Depends(conditional_get("online_order_links", STABLE_CACHE_CONTROL))])
 
 @router.get("/")
 async def get_links():
@@ -22,16 +17,11 @@ async def create_link(
     branch_id: str = Form(...),
     logo: UploadFile = File(...)
 ):
-    logo_filename = f"{uuid4()}_{logo.filename}"
-    logo_path = os.path.join(IMAGE_DIR, logo_filename)
-    with open(logo_path, "wb") as buffer:
-        shutil.copyfileobj(logo.file, buffer)
-
-    # Store the relative path to the logo
+    # Store the logo in the content-addressed image store
     link_data = OnlineOrderLinkCreate(
         platform=platform,
         url=url,
-        logo=f"/static/images/{logo_filename}",
+        logo=(await store_image(logo, variants=False)).url,
         branch_id=branch_id
     )
     link_id = await OnlineOrderLinkService.create_link(link_data)
@@ -54,11 +44,7 @@ async def update_link(
 ):
     update_data = {}
     if logo:
-        logo_filename = f"{uuid4()}_{logo.filename}"
-        logo_path = os.path.join(IMAGE_DIR, logo_filename)
-        with open(logo_path, "wb") as buffer:
-            shutil.copyfileobj(logo.file, buffer)
-        update_data['logo'] = f"/static/images/{logo_filename}"
+        update_data['logo'] = (await store_image(logo, variants=False)).url
 
     update_data['platform'] = platform
     update_data['url'] = url
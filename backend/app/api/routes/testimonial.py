@@ -1,17 +1,23 @@
-from fastapi import APIRouter, HTTPException, status, UploadFile, File, Form
+from fastapi import APIRouter, HTTPException, status, UploadFile, File, Form, Depends
+from app.core.http_cache import conditional_get
+from app.core.pagination import Page, PageParams, page_params
 from app.schemas.testimonial import TestimonialCreate, TestimonialResponse
 from app.services.testimonial_service import (
     create_testimonial, 
     get_testimonial, 
-    get_all_testimonials, 
+    get_testimonials_page, 
     update_testimonial_status,
     delete_testimonial
 )
 from app.core.config import IMAGES_DIR
+from app.services.image_store_service import store_image, release_image, is_content_addressed
 import os
 from datetime import datetime
 
-router = APIRouter()
+# Moderation changes what is shown, so revalidate on every use
+CACHE_CONTROL = "public, no-cache"
+
+router = APIRouter(dependencies=[Depends(conditional_get("testimonials", CACHE_CONTROL))])
 
 @router.post("/", response_model=TestimonialResponse, status_code=status.HTTP_201_CREATED)
 async def submit_testimonial(
@@ -30,17 +36,7 @@ async def submit_testimonial(
 
     # Save image if provided
     if image:
-        if not os.path.exists(IMAGES_DIR):
-            os.makedirs(IMAGES_DIR)
-        
-        timestamp = datetime.utcnow().strftime("%Y%m%d%H%M%S")
-        filename = f"{timestamp}_{image.filename}"
-        image_path = os.path.join(IMAGES_DIR, filename)
-        
-        with open(image_path, "wb") as buffer:
-            buffer.write(await image.read())
-        
-        testimonial_data["image"] = f"/static/images/{filename}"
+        testimonial_data["image"] = (await store_image(image, variants=False)).url
 
     # Create testimonial
     testimonial_id = await create_testimonial(testimonial_data)
@@ -53,9 +49,9 @@ async def read_testimonial(testimonial_id: str):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Testimonial not found")
     return testimonial
 
-@router.get("/", response_model=list[TestimonialResponse])
-async def read_all_testimonials():
-    testimonials = await get_all_testimonials()
+@router.get("/", response_model=Page[TestimonialResponse])
+async def read_all_testimonials(params: PageParams = Depends(page_params)):
+    testimonials = await get_testimonials_page(params)
     return testimonials
 
 @router.patch("/{testimonial_id}/status", status_code=status.HTTP_200_OK)
@@ -74,11 +70,13 @@ async def remove_testimonial(testimonial_id: str):
     if not testimonial:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Testimonial not found")
     
-    # Delete associated image if exists
-    if testimonial.get("image"):
+    await delete_testimonial(testimonial_id)
+
+    # Release the associated image; older uploads live directly under static/images
+    if is_content_addressed(testimonial.get("image")):
+        await release_image(testimonial["image"])
+    elif testimonial.get("image"):
         image_path = os.path.join(IMAGES_DIR, testimonial["image"].split("/static/images/")[-1])
         if os.path.exists(image_path):
             os.remove(image_path)
-    
-    await delete_testimonial(testimonial_id)
     return None
\ No newline at end of file
@@ -2,9 +2,9 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from datetime import timedelta
-from typing import List
 
 from app.schemas.user import UserRegister, UserLogin, Token, UserResponse
+from app.core.pagination import Page, PageParams, page_params
 from app.models.user import UserModel, UserRole
 from app.services.user_service import (
     create_user,
@@ -13,7 +13,7 @@ from app.services.user_service import (
     update_user,
     delete_user,
     bootstrap_admin,
-    get_all_users_from_db,
+    get_users_page,
     refresh_access_token
 )
 from app.core.auth import (
@@ -154,8 +154,9 @@ async def bootstrap_admin_user(user: UserRegister):
     user_data = user.dict()
     return await bootstrap_admin(user_data)
 
-@router.get("/", response_model=List[UserResponse])
+@router.get("/", response_model=Page[UserResponse])
 async def get_all_users(
+    params: PageParams = Depends(page_params),
     current_user: UserModel = Depends(require_admin)
 ):
-    return await get_all_users_from_db()
\ No newline at end of file
+    return await get_users_page(params)
\ No newline at end of file
@@ -0,0 +1,299 @@
+# banjos_restaurant\app\core\cache.py
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+from app.core.config import CACHE_TTL_SECONDS, CACHE_MAX_ENTRIES, CACHE_SYNC_INTERVAL_SECONDS
+from app.core.database import dynamodb
+
+GENERATION_PARTITION = "CacheGenerations"
+
+class TTLCache:
+    """A size-bounded LRU cache whose entries expire after `ttl` seconds.
+
+    `get_or_load` is the read-through entry point: concurrent misses for the
+    same key share a single load. `invalidate` drops everything, including
+    loads still in flight, so a write is never followed by a stale read.
+    Cached values are shared between requests and must not be mutated.
+    """
+
+    def __init__(self, name: str, ttl: float, maxsize: int):
+        self.name = name
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._loading: Dict[Hashable, asyncio.Task] = {}
+        self._generation = 0
+        self._hits = 0
+        self._misses = 0
+        self._coalesced = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return value
+            del self._entries[key]
+
+        pending = self._loading.get(key)
+        if pending is not None:
+            self._coalesced += 1
+            return await asyncio.shield(pending)
+
+        self._misses += 1
+        generation = self._generation
+        task = asyncio.ensure_future(loader())
+        self._loading[key] = task
+        try:
+            value = await asyncio.shield(task)
+        finally:
+            if self._loading.get(key) is task:
+                del self._loading[key]
+        # A write since the load started may have changed what it read
+        if generation == self._generation:
+            self._store(key, value)
+        return value
+
+    def _store(self, key: Hashable, value: Any) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    def invalidate(self) -> None:
+        """Drop every entry; call after any write to the cached entity."""
+        self._entries.clear()
+        self._loading.clear()
+        self._generation += 1
+        self._invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self._hits + self._misses + self._coalesced
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "hits": self._hits,
+            "misses": self._misses,
+            "coalesced": self._coalesced,
+            "evictions": self._evictions,
+            "invalidations": self._invalidations,
+            "hit_ratio": round((self._hits + self._coalesced) / lookups, 4) if lookups else None,
+        }
+
+class LiveIndex:
+    """An in-memory index over the documents `loader` returns, kept current.
+
+    `factory` makes an empty index with `add(doc_id, document)`,
+    `remove(doc_id)` and `stats()`; documents need an `id` attribute. Writers
+    in this process apply their change with `upsert`/`remove`. `mark_stale`
+    (for writes made elsewhere) or reaching `ttl` makes the next `current()`
+    rebuild from `loader`; concurrent callers share one rebuild.
+    """
+
+    def __init__(self, factory: Callable[[], Any], loader: Callable[[], Awaitable[Any]], ttl: float):
+        self.factory = factory
+        self.loader = loader
+        self.ttl = ttl
+        self._index: Any = None
+        self._built_at = 0.0
+        self._stale = True
+        self._version = 0
+        self._lock = asyncio.Lock()
+        self._rebuilds = 0
+        self._lookups = 0
+        self._errors = 0
+
+    def _fresh(self) -> bool:
+        return self._index is not None and not self._stale and time.monotonic() - self._built_at < self.ttl
+
+    async def rebuild(self) -> int:
+        """Re-index everything from `loader`; returns the number of documents."""
+        async with self._lock:
+            return await self._rebuild()
+
+    async def _rebuild(self) -> int:
+        version = self._version
+        # Cleared before loading, so a mark_stale during the load is not lost
+        self._stale = False
+        try:
+            documents = await self.loader()
+        except Exception:
+            self._stale = True
+            raise
+        index = self.factory()
+        for document in documents:
+            index.add(document.id, document)
+        self._index = index
+        self._built_at = time.monotonic()
+        self._rebuilds += 1
+        # A local write during the load may be missing from what was loaded
+        if self._version != version:
+            self._stale = True
+        return len(documents)
+
+    async def current(self) -> Any:
+        """The index, rebuilt first if it is stale; an older index is kept if rebuilding fails."""
+        if not self._fresh():
+            async with self._lock:
+                if not self._fresh():
+                    try:
+                        await self._rebuild()
+                    except Exception as e:
+                        self._errors += 1
+                        print(f"Error rebuilding index: {e}")
+                        if self._index is None:
+                            raise
+        self._lookups += 1
+        return self._index
+
+    def upsert(self, document: Any) -> None:
+        self._version += 1
+        if self._index is not None:
+            self._index.add(document.id, document)
+
+    def remove(self, doc_id: Hashable) -> None:
+        self._version += 1
+        if self._index is not None:
+            self._index.remove(doc_id)
+
+    def mark_stale(self) -> None:
+        self._stale = True
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **(self._index.stats() if self._index is not None else {}),
+            "rebuilds": self._rebuilds,
+            "lookups": self._lookups,
+            "errors": self._errors,
+            "stale": not self._fresh(),
+        }
+
+# Create global caches for the busiest public read paths
+menu_cache = TTLCache("menu", CACHE_TTL_SECONDS, CACHE_MAX_ENTRIES)
+categories_cache = TTLCache("categories", CACHE_TTL_SECONDS, CACHE_MAX_ENTRIES)
+branches_cache = TTLCache("branches", CACHE_TTL_SECONDS, CACHE_MAX_ENTRIES)
+
+caches: Dict[str, TTLCache] = {cache.name: cache for cache in (menu_cache, categories_cache, branches_cache)}
+
+class CacheInvalidationBus:
+    """Keep entity versions, and the caches built on them, coherent across workers.
+
+    Each entity (a cache name such as "menu", or e.g. "images") has a
+    generation counter item in DynamoDB. A write bumps the counter and
+    invalidates any local cache of that entity; every worker polls the
+    counters (one small query) every `interval` seconds and drops any cache
+    whose generation moved. Other workers therefore converge within one
+    interval; if polling fails, entries still expire after the cache TTL.
+    """
+
+    def __init__(self, caches: Dict[str, TTLCache], interval: float):
+        self.caches = caches
+        self.interval = interval
+        self._seen: Dict[str, int] = {}
+        self._subscribers: Dict[str, List[Callable[[], None]]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._polls = 0
+        self._remote_invalidations = 0
+        self._errors = 0
+        self._last_sync: Optional[float] = None
+
+    async def publish(self, name: str) -> None:
+        """Announce a write to entity `name` and invalidate its local cache, if any."""
+        try:
+            response = await dynamodb.update_item(
+                key={"Home": {"S": GENERATION_PARTITION}, "1": {"S": name}},
+                update_expression="ADD generation :one",
+                expression_attribute_names=None,
+                expression_attribute_values={":one": {"N": "1"}},
+                return_values="UPDATED_NEW"
+            )
+            generation = int(response["Attributes"]["generation"]["N"])
+            previous = self._seen.get(name, 0 if self._last_sync is not None else None)
+            if previous is not None and generation > previous + 1:
+                # Other workers wrote since the last poll, which will now see no change
+                self._notify_remote(name)
+            self._seen[name] = generation
+        except Exception as e:
+            self._errors += 1
+            print(f"Error publishing cache invalidation for {name}: {e}")
+        finally:
+            # Invalidate after the bump so nothing loaded before the write survives it
+            if name in self.caches:
+                self.caches[name].invalidate()
+
+    def subscribe(self, name: str, callback: Callable[[], None]) -> None:
+        """Call `callback` whenever another worker writes entity `name`.
+
+        For derived state beyond the caches; writes made in this process are
+        not announced, as the writer updates local state itself.
+        """
+        self._subscribers.setdefault(name, []).append(callback)
+
+    def generation(self, name: str) -> Optional[int]:
+        """The current generation of entity `name`, or None while polling is not keeping up."""
+        if self._last_sync is None or time.monotonic() - self._last_sync > 3 * self.interval + 1:
+            return None
+        return self._seen.get(name, 0)
+
+    async def sync(self) -> None:
+        """Record every entity's generation and invalidate caches whose generation moved."""
+        items = await dynamodb.query_partition(GENERATION_PARTITION)
+        for item in items:
+            name = item.get("1", {}).get("S", "")
+            generation = int(item.get("generation", {}).get("N", "0"))
+            if self._seen.get(name) == generation:
+                continue
+            if self._last_sync is not None:
+                self._notify_remote(name)
+            self._seen[name] = generation
+            if name in self.caches:
+                self.caches[name].invalidate()
+        self._polls += 1
+        self._last_sync = time.monotonic()
+
+    def _notify_remote(self, name: str) -> None:
+        self._remote_invalidations += 1
+        for callback in self._subscribers.get(name, ()):
+            callback()
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.sync()
+            except Exception as e:
+                self._errors += 1
+                print(f"Error syncing cache generations: {e}")
+            await asyncio.sleep(self.interval)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "interval_seconds": self.interval,
+            "generations": dict(self._seen),
+            "polls": self._polls,
+            "remote_invalidations": self._remote_invalidations,
+            "errors": self._errors,
+            "seconds_since_sync": round(time.monotonic() - self._last_sync, 3) if self._last_sync else None,
+        }
+
+# Create a global cache invalidation bus instance
+cache_bus = CacheInvalidationBus(caches, CACHE_SYNC_INTERVAL_SECONDS)
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    return {**{name: cache.stats() for name, cache in caches.items()}, "bus": cache_bus.stats()}
@@ -0,0 +1,164 @@
+# banjos_restaurant\app\core\codec.py
+import enum
+import types
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Generic, Iterable, List, Literal, Optional, Tuple, Type, TypeVar, Union, get_args, get_origin
+from pydantic import BaseModel, TypeAdapter
+from pydantic_core import PydanticUndefined
+
+M = TypeVar("M", bound=BaseModel)
+
+# (value -> attribute, attribute or None -> value) for a field the built-in kinds do not cover
+AttributeCodec = Tuple[Callable[[Any], Dict[str, Any]], Callable[[Optional[Dict[str, Any]]], Any]]
+
+_EMPTY: Dict[str, Any] = {}
+_NULL = {"NULL": True}
+_MISSING = object()
+
+# What a required field decodes to when its attribute is absent, as the hand-written readers did
+_ZERO_VALUES = {"S": "", "int": 0, "float": 0.0, "BOOL": False}
+
+# What an absent timestamp with a default factory decodes to: fixed, so a
+# legacy item reads the same on every request instead of as "now"
+UNKNOWN_TIMESTAMP = datetime(1970, 1, 1)
+
+def _attribute_kind(annotation: Any) -> str:
+    """How a field is stored: "S", "int" or "float" (both N), "BOOL", or "M" (a map of S)."""
+    origin = get_origin(annotation)
+    if origin is Union or origin is types.UnionType:
+        members = [member for member in get_args(annotation) if member is not type(None)]
+        if len(members) == 1:
+            return _attribute_kind(members[0])
+    elif origin is dict and get_args(annotation)[1] is str:
+        return "M"
+    elif origin is Literal:
+        return "S"
+    elif origin is None:
+        if annotation is bool:
+            return "BOOL"
+        if annotation is int:
+            return "int"
+        if annotation is float:
+            return "float"
+        if isinstance(annotation, type) and not issubclass(annotation, (BaseModel, list, tuple, set, dict)):
+            return "S"  # str, EmailStr, datetime, str enums and other scalars
+    raise TypeError(f"No DynamoDB attribute type for {annotation!r}")
+
+def _string(value: Any) -> str:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return str(value.value)
+    return str(value)
+
+def _encoder(kind: str) -> Callable[[Any], Dict[str, Any]]:
+    if kind == "S":
+        return lambda value: _NULL if value is None else {"S": _string(value)}
+    if kind in ("int", "float"):
+        return lambda value: _NULL if value is None else {"N": str(value)}
+    if kind == "BOOL":
+        return lambda value: _NULL if value is None else {"BOOL": bool(value)}
+    return lambda value: {"M": {name: {"S": text} for name, text in (value or {}).items()}}
+
+def _decoder_expression(kind: str, attribute: str, default: str) -> str:
+    """Source for reading one attribute from `item` (bound locally as `_get`).
+
+    `default` is only evaluated when the attribute is absent or NULL, so it
+    may be a call to a default factory.
+    """
+    read = f"_get({attribute!r}, _EMPTY)"
+    if kind in ("S", "BOOL"):
+        return f"(_a[{kind!r}] if {kind!r} in (_a := {read}) else {default})"
+    if kind in ("int", "float"):
+        return f"({kind}(_a['N']) if 'N' in (_a := {read}) else {default})"
+    return f"{{name: value.get('S', '') for name, value in {read}.get('M', _EMPTY).items()}}"
+
+class ItemCodec(Generic[M]):
+    """Converts between the DynamoDB items of one partition and a Pydantic model.
+
+    Attribute types follow the model's annotations: strings, emails, datetimes
+    and enums are S, ints and floats N, bools BOOL and `Dict[str, str]` a map
+    of S; `custom` gives an `(encode, decode)` pair for any other field. The
+    `key_field` is stored as the sort key "1". An absent or NULL attribute
+    decodes to the field's default, or to "", 0 or False when it has none.
+    A `default_factory` only fills in new items on encode: datetimes that
+    have one decode to UNKNOWN_TIMESTAMP, and other factories are called for
+    each item.
+
+    The decoder is generated as one function when the codec is built, so a
+    read costs a couple of dict lookups per field and no temporary dicts.
+    """
+
+    def __init__(
+        self,
+        model: Type[M],
+        home: str,
+        key_field: str = "id",
+        custom: Optional[Dict[str, AttributeCodec]] = None,
+        exclude: Iterable[str] = ()
+    ):
+        self.model = model
+        self.home = home
+        self.key_field = key_field
+        custom = custom or {}
+        skipped = {key_field, *exclude}
+        self._encoders: Dict[str, Callable[[Any], Dict[str, Any]]] = {}
+        self._defaults: Dict[str, Any] = {}
+        self._factories: Dict[str, Callable[[], Any]] = {}
+        namespace: Dict[str, Any] = {"_EMPTY": _EMPTY}
+        entries = [f"{key_field!r}: _get('1', _EMPTY).get('S', '')"]
+        for position, (name, field) in enumerate(model.model_fields.items()):
+            if name in skipped:
+                continue
+            kind = "custom" if name in custom else _attribute_kind(field.annotation)
+            default = f"_default_{position}"
+            if field.default is not PydanticUndefined:
+                self._defaults[name] = field.default
+                namespace[default] = field.default
+            elif field.default_factory is not None:
+                self._factories[name] = field.default_factory
+                if datetime in (field.annotation, *get_args(field.annotation)):
+                    # e.g. created_at on items written before the attribute existed
+                    namespace[default] = UNKNOWN_TIMESTAMP
+                else:
+                    namespace[default] = field.default_factory
+                    default += "()"
+            else:
+                namespace[default] = _ZERO_VALUES.get(kind)
+            if kind == "custom":
+                self._encoders[name], namespace[f"_decode_{position}"] = custom[name]
+                entries.append(f"{name!r}: _decode_{position}(_get({name!r}))")
+            else:
+                self._encoders[name] = _encoder(kind)
+                entries.append(f"{name!r}: {_decoder_expression(kind, name, default)}")
+        source = "def fields(item):\n    _get = item.get\n    return {\n" + "".join(f"        {entry},\n" for entry in entries) + "    }\n"
+        exec(compile(source, f"<{model.__name__} codec>", "exec"), namespace)
+        self.fields: Callable[[Dict[str, Any]], Dict[str, Any]] = namespace["fields"]
+        self._list_adapter = TypeAdapter(List[model])
+
+    def decode(self, item: Dict[str, Any]) -> M:
+        """The model for one raw DynamoDB item."""
+        return self.model.model_validate(self.fields(item))
+
+    def decode_many(self, items: Iterable[Dict[str, Any]]) -> List[M]:
+        """Models for many raw items, validated as one list."""
+        fields = self.fields
+        return self._list_adapter.validate_python([fields(item) for item in items])
+
+    def attribute(self, field: str, value: Any) -> Dict[str, Any]:
+        """The DynamoDB attribute value for one field, e.g. for an update expression."""
+        return self._encoders[field](value)
+
+    def encode(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """The full DynamoDB item for `data`; absent fields get the model's default, if it has one."""
+        item = {"Home": {"S": self.home}, "1": {"S": str(data[self.key_field])}}
+        for field, encode in self._encoders.items():
+            value = data.get(field, _MISSING)
+            if value is _MISSING:
+                if field in self._factories:
+                    value = self._factories[field]()
+                else:
+                    value = self._defaults.get(field, _MISSING)
+            if value is not _MISSING:
+                item[field] = encode(value)
+        return item
@@ -6,11 +6,21 @@ from typing import Optional
 # Load environment variables from .env file
 load_dotenv()
 
+# Runtime environment ("production" turns off template reload checks)
+ENVIRONMENT: str = os.getenv("ENVIRONMENT", "development")
+IS_PRODUCTION: bool = ENVIRONMENT.lower() == "production"
+
 # DynamoDB configuration
 AWS_ACCESS_KEY_ID: Optional[str] = os.getenv("AWS_ACCESS_KEY_ID")
 AWS_SECRET_ACCESS_KEY: Optional[str] = os.getenv("AWS_SECRET_ACCESS_KEY")
 AWS_REGION: str = os.getenv("AWS_REGION", "us-east-2")
 DYNAMODB_TABLE: str = os.getenv("DYNAMODB_TABLE", "banjosthefoodchain")
+DYNAMODB_MAX_WORKERS: int = int(os.getenv("DYNAMODB_MAX_WORKERS", "32"))
+DYNAMODB_MAX_ATTEMPTS: int = int(os.getenv("DYNAMODB_MAX_ATTEMPTS", "5"))
+# Batch reads/writes: chunks in flight per call, and retries of items DynamoDB leaves unprocessed
+DYNAMODB_BATCH_CONCURRENCY: int = int(os.getenv("DYNAMODB_BATCH_CONCURRENCY", "8"))
+DYNAMODB_BATCH_MAX_ATTEMPTS: int = int(os.getenv("DYNAMODB_BATCH_MAX_ATTEMPTS", "8"))
+DYNAMODB_BATCH_RETRY_BASE_SECONDS: float = float(os.getenv("DYNAMODB_BATCH_RETRY_BASE_SECONDS", "0.05"))
 
 # JWT configuration
 JWT_SECRET_KEY: str = os.getenv("JWT_SECRET_KEY", "your-very-secret-key-123456")
@@ -18,13 +28,59 @@ JWT_ALGORITHM: str = os.getenv("JWT_ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
 REFRESH_TOKEN_EXPIRE_DAYS: int = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "7"))
 
+# Password hashing
+BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+PASSWORD_HASH_MAX_QUEUE: int = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "64"))
+
 # Security
 SECURE_COOKIES: bool = os.getenv("SECURE_COOKIES", "True") == "True"
 CSRF_PROTECTION: bool = os.getenv("CSRF_PROTECTION", "True") == "True"
 
+# Email delivery (point EMAIL_SMTP_HOST at a local SMTP stand-in and disable TLS/auth for tests)
+EMAIL_SMTP_HOST: str = os.getenv("EMAIL_SMTP_HOST", "smtp.gmail.com")
+EMAIL_SMTP_PORT: int = int(os.getenv("EMAIL_SMTP_PORT", "587"))
+EMAIL_SMTP_STARTTLS: bool = os.getenv("EMAIL_SMTP_STARTTLS", "True") == "True"
+EMAIL_SMTP_AUTH: bool = os.getenv("EMAIL_SMTP_AUTH", "True") == "True"
+EMAIL_SMTP_TIMEOUT: float = float(os.getenv("EMAIL_SMTP_TIMEOUT", "30"))
+EMAIL_OUTBOX_WORKERS: int = int(os.getenv("EMAIL_OUTBOX_WORKERS", "2"))
+EMAIL_MAX_ATTEMPTS: int = int(os.getenv("EMAIL_MAX_ATTEMPTS", "5"))
+EMAIL_RETRY_BASE_SECONDS: float = float(os.getenv("EMAIL_RETRY_BASE_SECONDS", "2"))
+EMAIL_OUTBOX_HISTORY: int = int(os.getenv("EMAIL_OUTBOX_HISTORY", "1000"))
+EMAIL_TEMPLATE_CACHE_DIR: Optional[str] = os.getenv("EMAIL_TEMPLATE_CACHE_DIR")
+
+# In-process read-through cache for menu, categories and branches
+CACHE_TTL_SECONDS: float = float(os.getenv("CACHE_TTL_SECONDS", "300"))
+CACHE_MAX_ENTRIES: int = int(os.getenv("CACHE_MAX_ENTRIES", "512"))
+# How often each worker polls the shared cache generation counters for writes made elsewhere
+CACHE_SYNC_INTERVAL_SECONDS: float = float(os.getenv("CACHE_SYNC_INTERVAL_SECONDS", "2"))
+
+# Cursor pagination for list endpoints; cursors are signed so clients cannot forge start keys
+PAGE_DEFAULT_LIMIT: int = int(os.getenv("PAGE_DEFAULT_LIMIT", "50"))
+PAGE_MAX_LIMIT: int = int(os.getenv("PAGE_MAX_LIMIT", "200"))
+CURSOR_SECRET_KEY: str = os.getenv("CURSOR_SECRET_KEY", JWT_SECRET_KEY)
+# Items per DynamoDB page while streaming exports; bounds memory per export
+EXPORT_PAGE_SIZE: int = int(os.getenv("EXPORT_PAGE_SIZE", "500"))
+
+# IANA timezone that branch opening hours are written in
+BRANCH_TIMEZONE: str = os.getenv("BRANCH_TIMEZONE", "Asia/Kolkata")
+
+# Most operations a single POST /menu/bulk may carry
+MENU_BULK_MAX_ROWS: int = int(os.getenv("MENU_BULK_MAX_ROWS", "1000"))
+
 # Static files configuration
 STATIC_FILES_DIR: str = "static"
 IMAGES_DIR: str = os.path.join(STATIC_FILES_DIR, "images")
+# Content-addressed image store; paths never change content, so they are cached forever
+CAS_IMAGES_DIR: str = "static/images/cas"
+
+# Uploads are streamed to disk in chunks and rejected once they pass the size cap
+MAX_UPLOAD_BYTES: int = int(os.getenv("MAX_UPLOAD_BYTES", str(25 * 1024 * 1024)))
+UPLOAD_CHUNK_SIZE: int = int(os.getenv("UPLOAD_CHUNK_SIZE", str(1024 * 1024)))
+
+# Resized/WebP image variants are rendered on a process pool (requires Pillow)
+IMAGE_VARIANT_WORKERS: int = int(os.getenv("IMAGE_VARIANT_WORKERS", str(min(2, os.cpu_count() or 1))))
 
 # Ensure the static/images directory exists
-os.makedirs(IMAGES_DIR, exist_ok=True)
\ No newline at end of file
+os.makedirs(IMAGES_DIR, exist_ok=True)
+os.makedirs(CAS_IMAGES_DIR, exist_ok=True)
\ No newline at end of file
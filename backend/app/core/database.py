@@ -1,58 +1,411 @@
 # banjos_restaurant\app\core\database.py
+import asyncio
+import random
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 import boto3
-from app.core.config import AWS_ACCESS_KEY_ID, AWS_SECRET_ACCESS_KEY, AWS_REGION, DYNAMODB_TABLE
+import orjson
+from botocore.config import Config
+from app.core.config import (
+    AWS_ACCESS_KEY_ID,
+    AWS_SECRET_ACCESS_KEY,
+    AWS_REGION,
+    DYNAMODB_TABLE,
+    DYNAMODB_MAX_WORKERS,
+    DYNAMODB_MAX_ATTEMPTS,
+    DYNAMODB_BATCH_CONCURRENCY,
+    DYNAMODB_BATCH_MAX_ATTEMPTS,
+    DYNAMODB_BATCH_RETRY_BASE_SECONDS,
+)
+
+# Per-request limits of BatchGetItem and BatchWriteItem
+BATCH_GET_MAX_KEYS = 100
+BATCH_WRITE_MAX_ITEMS = 25
+# Most operations TransactWriteItems accepts in one call
+TRANSACT_WRITE_MAX_ITEMS = 100
+# Longest single wait between retries of unprocessed batch items
+BATCH_RETRY_MAX_SECONDS = 2.0
+
+class UnprocessedItemsError(Exception):
+    """A batch call still had unprocessed keys or writes after every retry.
+
+    `unprocessed` holds them in the request format DynamoDB returned them in.
+    """
+
+    def __init__(self, operation: str, unprocessed):
+        super().__init__(f"{operation} left {len(unprocessed)} requests unprocessed")
+        self.unprocessed = unprocessed
 
 class DynamoDB:
     def __init__(self):
+        # One pooled HTTP connection per executor thread, so concurrent calls never queue on the pool
         self.client = boto3.client(
             'dynamodb',
             aws_access_key_id=AWS_ACCESS_KEY_ID,
             aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
-            region_name=AWS_REGION
+            region_name=AWS_REGION,
+            config=Config(
+                max_pool_connections=DYNAMODB_MAX_WORKERS,
+                retries={"max_attempts": DYNAMODB_MAX_ATTEMPTS, "mode": "adaptive"},
+            )
         )
         self.table_name = DYNAMODB_TABLE
-
-    async def put_item(self, item):
-        """Insert an item into DynamoDB."""
-        response = self.client.put_item(
-            TableName=self.table_name,
-            Item=item
+        self._executor = ThreadPoolExecutor(
+            max_workers=DYNAMODB_MAX_WORKERS,
+            thread_name_prefix="dynamodb"
         )
+
+    async def _run(self, operation: str, **kwargs):
+        """Run a blocking boto3 call on the bounded DynamoDB executor."""
+        loop = asyncio.get_running_loop()
+        method = getattr(self.client, operation)
+        return await loop.run_in_executor(self._executor, partial(method, **kwargs))
+
+    async def _call(self, operation: str, **kwargs):
+        """Run a table-scoped boto3 call on the bounded DynamoDB executor."""
+        return await self._run(operation, TableName=self.table_name, **kwargs)
+
+    async def put_item(self, item, condition_expression=None, expression_attribute_names=None, expression_attribute_values=None):
+        """Insert an item into DynamoDB, optionally guarded by a condition."""
+        kwargs = {"Item": item}
+        if condition_expression:
+            kwargs["ConditionExpression"] = condition_expression
+        if expression_attribute_names:
+            kwargs["ExpressionAttributeNames"] = expression_attribute_names
+        if expression_attribute_values:
+            kwargs["ExpressionAttributeValues"] = expression_attribute_values
+        response = await self._call("put_item", **kwargs)
         return response
 
     async def get_item(self, key):
         """Retrieve an item from DynamoDB using its primary key."""
-        response = self.client.get_item(
-            TableName=self.table_name,
+        response = await self._call(
+            "get_item",
             Key=key
         )
         return response.get('Item')
 
-    async def update_item(self, key, update_expression, expression_attribute_names, expression_attribute_values):
-        """Update an item in DynamoDB."""
-        response = self.client.update_item(
-            TableName=self.table_name,
-            Key=key,
-            UpdateExpression=update_expression,
-            ExpressionAttributeNames=expression_attribute_names,
-            ExpressionAttributeValues=expression_attribute_values
-        )
+    async def update_item(
+        self,
+        key,
+        update_expression,
+        expression_attribute_names,
+        expression_attribute_values,
+        return_values=None,
+        condition_expression=None
+    ):
+        """Update an item in DynamoDB, optionally guarded by a condition.
+
+        With `return_values` (e.g. "ALL_NEW") the item is available under the
+        response's `Attributes`, so callers need no second read to build their
+        response. A failed condition raises `ConditionalCheckFailedException`.
+        """
+        kwargs = {
+            "Key": key,
+            "UpdateExpression": update_expression,
+            "ExpressionAttributeValues": expression_attribute_values,
+        }
+        # DynamoDB rejects an empty ExpressionAttributeNames map
+        if expression_attribute_names:
+            kwargs["ExpressionAttributeNames"] = expression_attribute_names
+        if condition_expression:
+            kwargs["ConditionExpression"] = condition_expression
+        if return_values:
+            kwargs["ReturnValues"] = return_values
+        response = await self._call("update_item", **kwargs)
         return response
 
-    async def delete_item(self, key):
-        """Delete an item from DynamoDB."""
-        response = self.client.delete_item(
-            TableName=self.table_name,
-            Key=key
-        )
+    async def delete_item(self, key, condition_expression=None, expression_attribute_values=None, return_values=None):
+        """Delete an item from DynamoDB, optionally guarded by a condition.
+
+        With `return_values="ALL_OLD"` the deleted item is available under the
+        response's `Attributes`.
+        """
+        kwargs = {"Key": key}
+        if condition_expression:
+            kwargs["ConditionExpression"] = condition_expression
+        if expression_attribute_values:
+            kwargs["ExpressionAttributeValues"] = expression_attribute_values
+        if return_values:
+            kwargs["ReturnValues"] = return_values
+        response = await self._call("delete_item", **kwargs)
+        return response
+
+    async def transact_write(self, operations):
+        """Apply several writes atomically.
+
+        Each operation is a single-key dict such as
+        `{"Put": {"Item": ..., "ConditionExpression": ...}}`, `{"Update": {...}}`,
+        `{"Delete": {...}}` or `{"ConditionCheck": {...}}`; the table name is
+        filled in. A failed condition raises `TransactionCanceledException`
+        with per-operation `CancellationReasons`.
+        """
+        transact_items = [
+            {action: {"TableName": self.table_name, **params}}
+            for operation in operations
+            for action, params in operation.items()
+        ]
+        response = await self._run("transact_write_items", TransactItems=transact_items)
         return response
 
+    async def batch_get(self, keys):
+        """Retrieve many items by primary key.
+
+        Keys are deduplicated and read in chunks of 100, several chunks at a
+        time. Returns the items found, in no particular order; keys without
+        an item are simply absent.
+        """
+        unique_keys = list({orjson.dumps(key, option=orjson.OPT_SORT_KEYS): key for key in keys}.values())
+        chunks = await self._run_chunks(
+            self._batch_get_chunk,
+            [unique_keys[start:start + BATCH_GET_MAX_KEYS] for start in range(0, len(unique_keys), BATCH_GET_MAX_KEYS)]
+        )
+        return [item for chunk in chunks for item in chunk]
+
+    async def batch_write(self, puts=(), deletes=()):
+        """Put and delete many items, 25 requests per call, several calls at a time.
+
+        Not atomic: chunks are applied independently, and a key may appear
+        only once across `puts` and `deletes`. Raises `UnprocessedItemsError`
+        if some writes are still throttled after every retry.
+        """
+        requests = [{"PutRequest": {"Item": item}} for item in puts]
+        requests += [{"DeleteRequest": {"Key": key}} for key in deletes]
+        await self._run_chunks(
+            self._batch_write_chunk,
+            [requests[start:start + BATCH_WRITE_MAX_ITEMS] for start in range(0, len(requests), BATCH_WRITE_MAX_ITEMS)]
+        )
+        return len(requests)
+
+    async def _run_chunks(self, run_chunk, chunks):
+        """Run `run_chunk` over every chunk, at most DYNAMODB_BATCH_CONCURRENCY at once."""
+        # Bounded so one large batch cannot occupy every executor thread
+        semaphore = asyncio.Semaphore(DYNAMODB_BATCH_CONCURRENCY)
+
+        async def bounded(chunk):
+            async with semaphore:
+                return await run_chunk(chunk)
+
+        return await asyncio.gather(*(bounded(chunk) for chunk in chunks))
+
+    async def _batch_get_chunk(self, keys):
+        items = []
+        request_items = {self.table_name: {"Keys": keys}}
+        for attempt in range(DYNAMODB_BATCH_MAX_ATTEMPTS):
+            if attempt:
+                await self._batch_backoff(attempt)
+            response = await self._run("batch_get_item", RequestItems=request_items)
+            items.extend(response.get("Responses", {}).get(self.table_name, []))
+            request_items = response.get("UnprocessedKeys")
+            if not request_items:
+                return items
+        raise UnprocessedItemsError("batch_get", request_items[self.table_name]["Keys"])
+
+    async def _batch_write_chunk(self, requests):
+        request_items = {self.table_name: requests}
+        for attempt in range(DYNAMODB_BATCH_MAX_ATTEMPTS):
+            if attempt:
+                await self._batch_backoff(attempt)
+            response = await self._run("batch_write_item", RequestItems=request_items)
+            request_items = response.get("UnprocessedItems")
+            if not request_items:
+                return
+        raise UnprocessedItemsError("batch_write", request_items[self.table_name])
+
+    @staticmethod
+    async def _batch_backoff(attempt: int):
+        """Exponential backoff with jitter, so throttled chunks do not retry in lockstep."""
+        delay = min(BATCH_RETRY_MAX_SECONDS, DYNAMODB_BATCH_RETRY_BASE_SECONDS * 2 ** (attempt - 1))
+        await asyncio.sleep(delay * random.uniform(0.5, 1.5))
+
     async def scan(self):
         """Scan the entire DynamoDB table."""
-        response = self.client.scan(
-            TableName=self.table_name
-        )
-        return response.get('Items', [])
+        items = []
+        async for page in self.scan_pages():
+            items.extend(page)
+        return items
+
+    async def scan_pages(self, limit=None, exclusive_start_key=None, segment=None, total_segments=None):
+        """Scan the table lazily, yielding one page of items at a time.
+
+        `limit` is the page size sent to DynamoDB. With `total_segments` and no
+        `segment`, every segment is scanned concurrently and pages are yielded as
+        they arrive; pass `segment` to scan a single slice (e.g. from a worker).
+        `exclusive_start_key` resumes a single-stream or single-segment scan.
+        """
+        kwargs = {}
+        if limit is not None:
+            kwargs["Limit"] = limit
+        if total_segments is not None and segment is None:
+            async for page in self._scan_segments(total_segments, **kwargs):
+                yield page
+            return
+        if total_segments is not None:
+            kwargs["Segment"] = segment
+            kwargs["TotalSegments"] = total_segments
+        if exclusive_start_key:
+            kwargs["ExclusiveStartKey"] = exclusive_start_key
+        async for page in self._paginate("scan", **kwargs):
+            yield page.get('Items', [])
+
+    async def _scan_segments(self, total_segments, **kwargs):
+        """Run a parallel scan, merging segment pages through a bounded queue."""
+        # At most one buffered page per segment keeps memory flat while segments race
+        queue = asyncio.Queue(maxsize=total_segments)
+        finished = object()
+
+        async def scan_segment(segment):
+            try:
+                async for page in self._paginate("scan", Segment=segment, TotalSegments=total_segments, **kwargs):
+                    await queue.put(page.get('Items', []))
+            except Exception as e:
+                await queue.put(e)
+                return
+            await queue.put(finished)
+
+        tasks = [asyncio.create_task(scan_segment(segment)) for segment in range(total_segments)]
+        try:
+            remaining = total_segments
+            while remaining:
+                page = await queue.get()
+                if page is finished:
+                    remaining -= 1
+                elif isinstance(page, Exception):
+                    raise page
+                else:
+                    yield page
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _paginate(self, operation: str, **kwargs):
+        """Yield raw response pages, following LastEvaluatedKey until exhausted."""
+        while True:
+            response = await self._call(operation, **kwargs)
+            yield response
+            last_evaluated_key = response.get('LastEvaluatedKey')
+            if not last_evaluated_key:
+                break
+            kwargs["ExclusiveStartKey"] = last_evaluated_key
+
+    async def query_pages(
+        self,
+        home,
+        page_size=None,
+        filter_expression=None,
+        expression_attribute_names=None,
+        expression_attribute_values=None,
+        scan_index_forward=True
+    ):
+        """Query one `Home` partition lazily, yielding one page of items at a time.
+
+        `page_size` is the Limit sent to DynamoDB, so at most one page is held
+        in memory however large the partition grows.
+        """
+        kwargs = {
+            "KeyConditionExpression": "#pk = :pk",
+            "ExpressionAttributeNames": {"#pk": "Home", **(expression_attribute_names or {})},
+            "ExpressionAttributeValues": {":pk": {"S": home}, **(expression_attribute_values or {})},
+            "ScanIndexForward": scan_index_forward,
+        }
+        if filter_expression:
+            kwargs["FilterExpression"] = filter_expression
+        if page_size is not None:
+            kwargs["Limit"] = page_size
+        async for page in self._paginate("query", **kwargs):
+            yield page.get('Items', [])
+
+    async def query_partition(
+        self,
+        home,
+        filter_expression=None,
+        expression_attribute_names=None,
+        expression_attribute_values=None,
+        limit=None,
+        scan_index_forward=True,
+        sort_key_prefix=None,
+        sort_key_range=None
+    ):
+        """Retrieve the items of one `Home` partition, following pagination.
+
+        `limit` caps the number of items returned; the optional filter is applied
+        server-side after the key condition. `sort_key_prefix` or an inclusive
+        `sort_key_range` of `(low, high)` narrows the key condition itself, so
+        only matching items are read.
+        """
+        key_condition = "#pk = :pk"
+        key_values = {":pk": {"S": home}}
+        if sort_key_prefix is not None:
+            key_condition += " AND begins_with(#sk, :prefix)"
+            key_values[":prefix"] = {"S": sort_key_prefix}
+        elif sort_key_range is not None:
+            key_condition += " AND #sk BETWEEN :lo AND :hi"
+            key_values[":lo"] = {"S": sort_key_range[0]}
+            key_values[":hi"] = {"S": sort_key_range[1]}
+        key_names = {"#pk": "Home"}
+        if len(key_values) > 1:
+            key_names["#sk"] = "1"
+        kwargs = {
+            "KeyConditionExpression": key_condition,
+            "ExpressionAttributeNames": {**key_names, **(expression_attribute_names or {})},
+            "ExpressionAttributeValues": {**key_values, **(expression_attribute_values or {})},
+            "ScanIndexForward": scan_index_forward,
+        }
+        if filter_expression:
+            kwargs["FilterExpression"] = filter_expression
+        if limit is not None and not filter_expression:
+            kwargs["Limit"] = limit
+
+        items = []
+        async for page in self._paginate("query", **kwargs):
+            items.extend(page.get('Items', []))
+            if limit is not None and len(items) >= limit:
+                return items[:limit]
+        return items
+
+    async def query_page(
+        self,
+        home,
+        limit,
+        exclusive_start_key=None,
+        filter_expression=None,
+        expression_attribute_names=None,
+        expression_attribute_values=None,
+        scan_index_forward=True
+    ):
+        """Retrieve one page of a `Home` partition: up to `limit` items.
+
+        Returns `(items, last_key)`; pass `last_key` back as
+        `exclusive_start_key` for the next page. It is None once the partition
+        is exhausted. With a filter, reads continue until the page is full, and
+        the key is that of the last returned item so nothing is skipped.
+        """
+        kwargs = {
+            "KeyConditionExpression": "#pk = :pk",
+            "ExpressionAttributeNames": {"#pk": "Home", **(expression_attribute_names or {})},
+            "ExpressionAttributeValues": {":pk": {"S": home}, **(expression_attribute_values or {})},
+            "ScanIndexForward": scan_index_forward,
+            "Limit": limit,
+        }
+        if filter_expression:
+            kwargs["FilterExpression"] = filter_expression
+        if exclusive_start_key:
+            kwargs["ExclusiveStartKey"] = exclusive_start_key
+
+        items = []
+        async for page in self._paginate("query", **kwargs):
+            items.extend(page.get('Items', []))
+            if len(items) > limit:
+                items = items[:limit]
+                return items, {"Home": items[-1]["Home"], "1": items[-1]["1"]}
+            if len(items) == limit:
+                return items, page.get('LastEvaluatedKey')
+        return items, None
+
+    def close(self):
+        """Release the executor threads and pooled HTTP connections."""
+        self._executor.shutdown(wait=False)
+        self.client.close()
 
 # Create a global DynamoDB instance
-dynamodb = DynamoDB()
\ No newline at end of file
+dynamodb = DynamoDB()
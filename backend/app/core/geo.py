@@ -0,0 +1,105 @@
+# banjos_restaurant\app\core\geo.py
+import heapq
+import math
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+class GeoGridIndex:
+    """Points bucketed into a fixed latitude/longitude grid for haversine radius queries.
+
+    A query only measures points in the cells overlapping the bounding box
+    of its radius, so its cost follows the local density, not the total.
+    Documents need `latitude` and `longitude` attributes.
+    """
+
+    def __init__(self, cell_degrees: float = 0.25):
+        self.cell_degrees = cell_degrees
+        self._columns = math.ceil(360 / cell_degrees)
+        self.documents: Dict[Hashable, Any] = {}
+        # cell -> {doc_id: (latitude radians, longitude radians, cos latitude)}
+        self._cells: Dict[Tuple[int, int], Dict[Hashable, Tuple[float, float, float]]] = {}
+        self._doc_cells: Dict[Hashable, Tuple[int, int]] = {}
+
+    def _cell(self, latitude: float, longitude: float) -> Tuple[int, int]:
+        row = math.floor((latitude + 90) / self.cell_degrees)
+        column = math.floor((longitude + 180) / self.cell_degrees) % self._columns
+        return row, column
+
+    def add(self, doc_id: Hashable, document: Any) -> None:
+        """Index `document` at its coordinates, replacing any earlier version."""
+        self.remove(doc_id)
+        latitude, longitude = document.latitude, document.longitude
+        cell = self._cell(latitude, longitude)
+        phi = math.radians(latitude)
+        self._cells.setdefault(cell, {})[doc_id] = (phi, math.radians(longitude), math.cos(phi))
+        self._doc_cells[doc_id] = cell
+        self.documents[doc_id] = document
+
+    def remove(self, doc_id: Hashable) -> None:
+        cell = self._doc_cells.pop(doc_id, None)
+        if cell is not None:
+            points = self._cells[cell]
+            del points[doc_id]
+            if not points:
+                del self._cells[cell]
+        self.documents.pop(doc_id, None)
+
+    def _candidate_cells(self, latitude: float, longitude: float, radius_km: float):
+        """The occupied cells that overlap the bounding box of a radius around a point."""
+        lat_span = radius_km / KM_PER_DEGREE
+        row_low, _ = self._cell(max(-90.0, latitude - lat_span), 0)
+        row_high, _ = self._cell(min(90.0, latitude + lat_span), 0)
+        # Longitude degrees shrink towards the poles; near them the box spans every column
+        cos_edge = math.cos(math.radians(min(90.0, abs(latitude) + lat_span)))
+        if cos_edge * KM_PER_DEGREE * 180 <= radius_km:
+            columns = None
+        else:
+            lng_span = radius_km / (KM_PER_DEGREE * cos_edge)
+            first = math.floor((longitude - lng_span + 180) / self.cell_degrees)
+            last = math.floor((longitude + lng_span + 180) / self.cell_degrees)
+            columns = None if last - first + 1 >= self._columns else [column % self._columns for column in range(first, last + 1)]
+
+        box_cells = (row_high - row_low + 1) * (len(columns) if columns is not None else self._columns)
+        if box_cells > len(self._cells):
+            # A wide box over a sparse grid: walking the occupied cells is cheaper
+            wanted = None if columns is None else set(columns)
+            for (row, column), points in self._cells.items():
+                if row_low <= row <= row_high and (wanted is None or column in wanted):
+                    yield points
+            return
+        for row in range(row_low, row_high + 1):
+            for column in (columns if columns is not None else range(self._columns)):
+                points = self._cells.get((row, column))
+                if points:
+                    yield points
+
+    def nearest(
+        self,
+        latitude: float,
+        longitude: float,
+        radius_km: float,
+        limit: int,
+        predicate: Optional[Callable[[Any], bool]] = None
+    ) -> List[Tuple[float, Any]]:
+        """Up to `limit` `(distance_km, document)` pairs within `radius_km`, nearest first."""
+        phi = math.radians(latitude)
+        lam = math.radians(longitude)
+        cos_phi = math.cos(phi)
+        # Rank by the haversine term, which grows with distance; asin is only taken for the results
+        max_term = math.sin(min(math.pi / 2, radius_km / (2 * EARTH_RADIUS_KM))) ** 2
+        sin = math.sin
+        matches = []
+        for points in self._candidate_cells(latitude, longitude, radius_km):
+            for doc_id, (point_phi, point_lam, point_cos) in points.items():
+                term = sin((point_phi - phi) / 2) ** 2 + cos_phi * point_cos * sin((point_lam - lam) / 2) ** 2
+                if term <= max_term and (predicate is None or predicate(self.documents[doc_id])):
+                    matches.append((term, doc_id))
+        return [
+            (2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(term))), self.documents[doc_id])
+            for term, doc_id in heapq.nsmallest(limit, matches)
+        ]
+
+    def stats(self) -> Dict[str, int]:
+        return {"documents": len(self.documents), "cells": len(self._cells)}
@@ -0,0 +1,61 @@
+# banjos_restaurant\app\core\http_cache.py
+from typing import Optional
+from fastapi import Request, Response, HTTPException, status
+from app.core.cache import cache_bus
+
+# For listings that change a few times a day at most (branches, gallery, ordering links):
+# a client may reuse a response for a minute without asking, and revalidates with the
+# ETag afterwards. A minute bounds how long an edit can go unseen while sparing
+# page navigations a round trip.
+STABLE_CACHE_CONTROL = "public, max-age=60"
+
+# Suffixes that tell compressed representations of the same version apart
+ENCODING_SUFFIXES = ("-gzip", "-br")
+
+def entity_etag(entity: str) -> Optional[str]:
+    """A strong ETag for the current version of `entity`, or None if it is not known."""
+    generation = cache_bus.generation(entity)
+    return None if generation is None else f'"{entity}-{generation}"'
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """The ETag of a content-encoded representation, e.g. `"menu-4-gzip"`."""
+    return f'{etag[:-1]}-{encoding}"'
+
+def _opaque_tag(tag: str) -> str:
+    # If-None-Match uses weak comparison, and any encoding of a version is unchanged content
+    tag = tag.strip()
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    for suffix in ENCODING_SUFFIXES:
+        if tag.endswith(f'{suffix}"'):
+            return f'{tag[:-len(suffix) - 1]}"'
+    return tag
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(_opaque_tag(tag) == etag for tag in if_none_match.split(","))
+
+def conditional_get(entity: str, cache_control: str):
+    """Router dependency that tags GET responses with the entity version.
+
+    The version is read before the handler loads anything, so a tag can only
+    ever be older than the body it accompanies. A matching If-None-Match is
+    answered with 304 without touching the handler or DynamoDB.
+    """
+    async def dependency(request: Request, response: Response):
+        if request.method not in ("GET", "HEAD"):
+            return
+        response.headers["Cache-Control"] = cache_control
+        etag = entity_etag(entity)
+        if etag is None:
+            return
+        response.headers["ETag"] = etag
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            raise HTTPException(
+                status_code=status.HTTP_304_NOT_MODIFIED,
+                headers={"ETag": etag, "Cache-Control": cache_control}
+            )
+    return dependency
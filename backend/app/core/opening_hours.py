@@ -0,0 +1,224 @@
+# banjos_restaurant\app\core\opening_hours.py
+import re
+from datetime import datetime
+from typing import Any, Dict, Hashable, List, Optional, Set, Tuple
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+DAYS = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+
+# An interval is (start, end) in minutes since Monday 00:00, end exclusive
+Interval = Tuple[int, int]
+
+_DAY = r"\b(mon|tue|wed|thu|fri|sat|sun)[a-z]*\.?"
+_TIME = r"(\d{1,2})(?:[:.](\d{2}))?(?:\s*([ap])\.?m\b\.?)?"
+_TOKEN = re.compile(
+    rf"(?P<days>{_DAY}\s*(?:-|to)\s*{_DAY})"
+    rf"|(?P<day>{_DAY})"
+    r"|(?P<every>daily|every\s*day|all\s*days|all\s*week)"
+    r"|(?P<weekdays>weekdays)"
+    r"|(?P<weekends>weekends?)"
+    r"|(?P<always>24\s*/\s*7|24\s*x\s*7|24\s*hours|24\s*hrs|open\s*24h?)"
+    r"|(?P<closed>closed)"
+    rf"|(?P<range>(?<![\d:.])(?:{_TIME}|noon|midnight)\s*(?:-|to)\s*(?:{_TIME}|noon|midnight)(?![\d:]))"
+)
+_RANGE_END = re.compile(rf"(?:{_TIME}|(noon|midnight))\s*$")
+_RANGE_START = re.compile(rf"^(?:{_TIME}|(noon|midnight))")
+
+def _minutes(match: "re.Match", default_meridiem: Optional[str] = None) -> Tuple[int, Optional[str]]:
+    """Minutes past midnight of a matched time, and its am/pm marker if it had one."""
+    hour, minute, meridiem, word = match.groups()
+    if word == "noon":
+        return 12 * 60, "p"
+    if word == "midnight":
+        return 0, "a"
+    hour, minute = int(hour), int(minute or 0)
+    meridiem = meridiem or default_meridiem
+    if meridiem == "p" and hour < 12:
+        hour += 12
+    elif meridiem == "a" and hour == 12:
+        hour = 0
+    if hour > 24 or minute > 59:
+        raise ValueError(f"Invalid time {match.group(0)!r}")
+    return hour * 60 + minute, meridiem
+
+def _parse_range(text: str) -> Interval:
+    """'10:00-23:00', '11am - 11pm', '5-9pm' -> minutes past midnight; overnight ends pass 1440."""
+    separator = re.search(r"\s*(?:-|to)\s*(?=\d|noon|midnight)", text)
+    start_text, end_text = text[:separator.start()], text[separator.end():]
+    end, end_meridiem = _minutes(_RANGE_END.search(end_text))
+    start_match = _RANGE_START.search(start_text)
+    start, start_meridiem = _minutes(start_match)
+    if start_meridiem is None and end_meridiem == "p" and start < 7 * 60 and start + 12 * 60 < end:
+        # "5-9pm" is 17:00-21:00, while "10-11pm" stays 10:00-23:00
+        start += 12 * 60
+    elif start_meridiem is None and end_meridiem is None and 0 < end < start <= 12 * 60:
+        # "10-2" is 10:00-14:00 on a 12-hour clock, while "22-2" stays overnight
+        end += 12 * 60
+    if end <= start:
+        end += MINUTES_PER_DAY
+    return start, end
+
+def _token_days(kind: str, text: str) -> Set[int]:
+    """The weekdays (Monday is 0) a day token names."""
+    if kind == "days":
+        first, last = re.findall(_DAY, text)
+        start, stop = DAYS.index(first), DAYS.index(last)
+        return {(start + offset) % 7 for offset in range((stop - start) % 7 + 1)}
+    if kind == "day":
+        return {DAYS.index(re.match(_DAY, text).group(1))}
+    if kind == "weekdays":
+        return set(range(5))
+    if kind == "weekends":
+        return {5, 6}
+    return set(range(7))
+
+_DAY_KINDS = ("days", "day", "every", "weekdays", "weekends")
+_HOURS_KINDS = ("range", "always")
+
+def parse_opening_hours(text: Optional[str]) -> Optional[List[Interval]]:
+    """Parse free-text opening hours into merged weekly intervals.
+
+    Understands day names and ranges ("Mon-Fri", "Sat & Sun", "daily",
+    "weekends"), 12- and 24-hour time ranges, several ranges per day,
+    overnight hours, "24/7" and closed days ("Sun closed", "closed on
+    Mondays"). Days may come before their hours ("Mon-Fri 9-5") or after
+    them ("10-22 daily"), whichever the text starts with. Hours without days
+    apply to every day that is not closed. Returns None when no hours can be
+    recognised, so callers can tell "unknown" from "never open".
+    """
+    if not text:
+        return None
+    tokens = list(_TOKEN.finditer(text.lower().replace("\u2013", "-").replace("\u2014", "-")))
+    hours_first = next((token.lastgroup in _HOURS_KINDS for token in tokens if token.lastgroup in _DAY_KINDS + _HOURS_KINDS), False)
+    rules: List[Tuple[Set[int], List[Interval]]] = []
+    days: Set[int] = set()
+    ranges: List[Interval] = []
+    closed_days: Set[int] = set()
+    closing = False
+    recognised = False
+    position = 0
+    while position < len(tokens):
+        token = tokens[position]
+        kind = token.lastgroup
+        position += 1
+        if kind in _DAY_KINDS:
+            # Take the whole run of day tokens ("Sat & Sun") at once
+            named = _token_days(kind, token.group(0))
+            while position < len(tokens) and tokens[position].lastgroup in _DAY_KINDS:
+                named |= _token_days(tokens[position].lastgroup, tokens[position].group(0))
+                position += 1
+            if position < len(tokens) and tokens[position].lastgroup == "closed":
+                # "Monday closed" names a closed day, whatever came before it
+                closed_days.update(named)
+                recognised = True
+                position += 1
+            elif closing:
+                closed_days.update(named)
+            elif hours_first:
+                # "10-22 daily": the days finish the hours before them
+                if ranges:
+                    rules.append((named, ranges))
+                    ranges = []
+            else:
+                if ranges:
+                    rules.append((days, ranges))
+                    days, ranges = set(), []
+                days.update(named)
+        elif kind == "closed":
+            recognised = True
+            closing = True
+        else:
+            try:
+                ranges.append((0, MINUTES_PER_DAY) if kind == "always" else _parse_range(token.group(0)))
+            except ValueError:
+                continue
+            recognised = True
+            closing = False
+    if ranges:
+        rules.append((set() if hours_first else days, ranges))
+    if not recognised:
+        return None
+
+    intervals: List[Interval] = []
+    for rule_days, rule_ranges in rules:
+        for day in (rule_days or set(range(7))) - closed_days:
+            for start, end in rule_ranges:
+                start, end = day * MINUTES_PER_DAY + start, day * MINUTES_PER_DAY + end
+                if end > MINUTES_PER_WEEK:
+                    # Sunday night runs on into Monday morning
+                    intervals.append((0, end - MINUTES_PER_WEEK))
+                    end = MINUTES_PER_WEEK
+                intervals.append((start, end))
+    return _merge(intervals)
+
+def _merge(intervals: List[Interval]) -> List[Interval]:
+    merged: List[Interval] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+def minute_of_week(moment: datetime) -> int:
+    """Minutes since Monday 00:00 of a local time."""
+    return moment.weekday() * MINUTES_PER_DAY + moment.hour * 60 + moment.minute
+
+def intervals_attribute(intervals: Optional[List[Interval]]) -> Dict[str, Any]:
+    """DynamoDB attribute for parsed opening hours; NULL when they are unknown."""
+    if intervals is None:
+        return {"NULL": True}
+    return {"L": [{"L": [{"N": str(start)}, {"N": str(end)}]} for start, end in intervals]}
+
+def parse_intervals(attribute: Optional[Dict[str, Any]]) -> Optional[List[Interval]]:
+    """Inverse of `intervals_attribute`."""
+    if not attribute or "L" not in attribute:
+        return None
+    return [(int(pair["L"][0]["N"]), int(pair["L"][1]["N"])) for pair in attribute["L"]]
+
+class WeeklyIntervalIndex:
+    """Documents bucketed by the hours of the week their opening intervals cover.
+
+    `open_at` checks only the intervals that touch the queried hour.
+    Documents need an `opening_intervals` attribute (None when unknown).
+    """
+
+    BUCKET_MINUTES = 60
+
+    def __init__(self):
+        self.documents: Dict[Hashable, Any] = {}
+        self._buckets: List[Dict[Hashable, List[Interval]]] = [
+            {} for _ in range(MINUTES_PER_WEEK // self.BUCKET_MINUTES)
+        ]
+        self._doc_buckets: Dict[Hashable, List[int]] = {}
+
+    def add(self, doc_id: Hashable, document: Any) -> None:
+        """Index `document` by its opening intervals, replacing any earlier version."""
+        self.remove(doc_id)
+        self.documents[doc_id] = document
+        buckets = []
+        for start, end in document.opening_intervals or ():
+            for bucket in range(start // self.BUCKET_MINUTES, (end - 1) // self.BUCKET_MINUTES + 1):
+                self._buckets[bucket].setdefault(doc_id, []).append((start, end))
+                buckets.append(bucket)
+        self._doc_buckets[doc_id] = buckets
+
+    def remove(self, doc_id: Hashable) -> None:
+        for bucket in self._doc_buckets.pop(doc_id, ()):
+            self._buckets[bucket].pop(doc_id, None)
+        self.documents.pop(doc_id, None)
+
+    def open_at(self, minute: int) -> List[Any]:
+        """Documents open at `minute` of the week."""
+        return [
+            self.documents[doc_id]
+            for doc_id, intervals in self._buckets[minute // self.BUCKET_MINUTES].items()
+            if any(start <= minute < end for start, end in intervals)
+        ]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "documents": len(self.documents),
+            "with_hours": sum(1 for document in self.documents.values() if document.opening_intervals),
+        }
@@ -0,0 +1,78 @@
+# banjos_restaurant\app\core\pagination.py
+import base64
+import hashlib
+import hmac
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Generic, List, Optional, TypeVar
+import orjson
+from fastapi import HTTPException, Query, status
+from pydantic import BaseModel
+from app.core.config import CURSOR_SECRET_KEY, PAGE_DEFAULT_LIMIT, PAGE_MAX_LIMIT
+from app.core.database import dynamodb
+
+T = TypeVar("T")
+
+class Page(BaseModel, Generic[T]):
+    """The envelope every paginated list endpoint returns."""
+    items: List[T]
+    next_cursor: Optional[str] = None
+    limit: int
+
+@dataclass(frozen=True)
+class PageParams:
+    limit: int
+    cursor: Optional[str] = None
+
+def page_params(
+    limit: int = Query(PAGE_DEFAULT_LIMIT, ge=1, description=f"Page size, at most {PAGE_MAX_LIMIT}"),
+    cursor: Optional[str] = Query(None, description="The next_cursor of the previous page"),
+) -> PageParams:
+    """Route dependency for `limit` and `cursor`; oversized limits are capped, not rejected."""
+    return PageParams(limit=min(limit, PAGE_MAX_LIMIT), cursor=cursor)
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+def _signature(scope: str, payload: bytes) -> bytes:
+    # The scope is signed too, so a cursor from one listing is rejected by another
+    return hmac.new(CURSOR_SECRET_KEY.encode(), scope.encode() + b"\x00" + payload, hashlib.sha256).digest()[:16]
+
+def encode_cursor(scope: str, last_key: Optional[Dict[str, Any]]) -> Optional[str]:
+    """Wrap a DynamoDB LastEvaluatedKey in an opaque, signed token."""
+    if not last_key:
+        return None
+    payload = orjson.dumps(last_key)
+    return f"{_b64encode(payload)}.{_b64encode(_signature(scope, payload))}"
+
+def decode_cursor(scope: str, cursor: Optional[str]) -> Optional[Dict[str, Any]]:
+    """The start key inside `cursor`; 400 if it was tampered with or belongs elsewhere."""
+    if not cursor:
+        return None
+    try:
+        payload, signature = (_b64decode(part) for part in cursor.split("."))
+        if not hmac.compare_digest(signature, _signature(scope, payload)):
+            raise ValueError("bad signature")
+        return orjson.loads(payload)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+async def fetch_page(home: str, params: PageParams, parse: Callable[[Dict[str, Any]], T], **query) -> Page[T]:
+    """Read one page of partition `home` and build the envelope.
+
+    `parse` turns a raw DynamoDB item into a response item; `query` is passed
+    on to `dynamodb.query_page` (e.g. a filter expression).
+    """
+    items, last_key = await dynamodb.query_page(
+        home,
+        params.limit,
+        exclusive_start_key=decode_cursor(home, params.cursor),
+        **query
+    )
+    return Page(
+        items=[parse(item) for item in items],
+        next_cursor=encode_cursor(home, last_key),
+        limit=params.limit
+    )
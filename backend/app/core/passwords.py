@@ -0,0 +1,70 @@
+# banjos_restaurant\app\core\passwords.py
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple, Dict, Any
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+from app.core.config import BCRYPT_ROUNDS, PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_QUEUE
+
+class PasswordHasher:
+    """Hash and verify passwords on a dedicated, size-bounded thread pool.
+
+    bcrypt releases the GIL while it works, so a small thread pool gives real
+    parallelism without blocking the event loop. Requests beyond the workers
+    plus `max_queue` are rejected with a 503 instead of piling up.
+    """
+
+    def __init__(self, rounds: int, workers: int, max_queue: int):
+        self.context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=rounds)
+        self.rounds = rounds
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._pending = 0
+        self._peak_pending = 0
+        self._completed = 0
+        self._rejected = 0
+
+    async def _submit(self, func, *args):
+        if self._pending >= self.workers + self.max_queue:
+            self._rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many password operations in progress, please retry"
+            )
+        self._pending += 1
+        self._peak_pending = max(self._peak_pending, self._pending)
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, func, *args)
+        finally:
+            self._pending -= 1
+            self._completed += 1
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(self.context.hash, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self._submit(self.context.verify, password, hashed_password)
+
+    async def verify_and_update(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """Verify a password and, if its hash uses outdated settings, return a fresh hash."""
+        return await self._submit(self.context.verify_and_update, password, hashed_password)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rounds": self.rounds,
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "in_flight": min(self._pending, self.workers),
+            "queued": max(self._pending - self.workers, 0),
+            "peak_pending": self._peak_pending,
+            "completed": self._completed,
+            "rejected": self._rejected,
+        }
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+# Create a global password hasher instance
+password_hasher = PasswordHasher(BCRYPT_ROUNDS, PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_QUEUE)
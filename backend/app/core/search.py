@@ -0,0 +1,94 @@
+# banjos_restaurant\app\core\search.py
+import bisect
+import heapq
+import math
+import re
+import unicodedata
+from collections import defaultdict
+from typing import Any, Dict, Hashable, Iterable, List, Optional
+
+_WORD = re.compile(r"\w+")
+
+# A query term that only prefixes a token ("chick" -> "chicken") counts for less than an exact match
+PREFIX_MATCH_WEIGHT = 0.5
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lowercase word tokens with accents folded, so "Crème" matches "creme"."""
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return _WORD.findall(text.lower())
+
+class InvertedIndex:
+    """Token -> {document id: weight} postings over a few weighted text fields.
+
+    A query matches documents that contain every query term, either as a
+    whole token or as a prefix of one. Matches are ranked by field-weighted
+    term frequency times inverse document frequency.
+    """
+
+    def __init__(self, field_weights: Dict[str, float]):
+        self.field_weights = field_weights
+        self.documents: Dict[Hashable, Any] = {}
+        self._postings: Dict[str, Dict[Hashable, float]] = {}
+        # Sorted, so the tokens a prefix expands to are one bisect away
+        self._vocabulary: List[str] = []
+        self._document_tokens: Dict[Hashable, List[str]] = {}
+
+    def add(self, doc_id: Hashable, document: Any) -> None:
+        """Index `document` (read via its field attributes), replacing any earlier version."""
+        self.remove(doc_id)
+        weights: Dict[str, float] = defaultdict(float)
+        for field, weight in self.field_weights.items():
+            for token in tokenize(getattr(document, field, None)):
+                weights[token] += weight
+        for token, weight in weights.items():
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = {}
+                bisect.insort(self._vocabulary, token)
+            postings[doc_id] = weight
+        self._document_tokens[doc_id] = list(weights)
+        self.documents[doc_id] = document
+
+    def remove(self, doc_id: Hashable) -> None:
+        for token in self._document_tokens.pop(doc_id, ()):
+            postings = self._postings[token]
+            del postings[doc_id]
+            if not postings:
+                del self._postings[token]
+                del self._vocabulary[bisect.bisect_left(self._vocabulary, token)]
+        self.documents.pop(doc_id, None)
+
+    def _expand(self, term: str) -> Iterable[str]:
+        """Every indexed token that starts with `term`, including `term` itself."""
+        position = bisect.bisect_left(self._vocabulary, term)
+        while position < len(self._vocabulary) and self._vocabulary[position].startswith(term):
+            yield self._vocabulary[position]
+            position += 1
+
+    def search(self, query: str, limit: int) -> List[Any]:
+        """The best `limit` documents matching every term of `query`, best first."""
+        scores: Optional[Dict[Hashable, float]] = None
+        total = len(self.documents)
+        for term in dict.fromkeys(tokenize(query)):
+            term_scores: Dict[Hashable, float] = {}
+            for token in self._expand(term):
+                postings = self._postings[token]
+                weight = math.log(1 + total / len(postings)) * (1.0 if token == term else PREFIX_MATCH_WEIGHT)
+                for doc_id, field_weight in postings.items():
+                    score = field_weight * weight
+                    if score > term_scores.get(doc_id, 0.0):
+                        term_scores[doc_id] = score
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {doc_id: score + term_scores[doc_id] for doc_id, score in scores.items() if doc_id in term_scores}
+            if not scores:
+                return []
+        if not scores:
+            return []
+        best = heapq.nlargest(limit, scores.items(), key=lambda entry: entry[1])
+        return [self.documents[doc_id] for doc_id, _ in best]
+
+    def stats(self) -> Dict[str, int]:
+        return {"documents": len(self.documents), "tokens": len(self._vocabulary)}
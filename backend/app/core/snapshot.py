@@ -0,0 +1,73 @@
+# banjos_restaurant\app\core\snapshot.py
+import gzip
+from dataclasses import dataclass
+from typing import Optional, Set
+from fastapi import Request, Response
+from app.core.http_cache import encoded_etag
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; clients then get gzip or the plain body
+    brotli = None
+
+# Below this size compression costs more than it saves
+MIN_COMPRESS_BYTES = 512
+
+@dataclass(frozen=True)
+class JSONSnapshot:
+    """A JSON payload encoded once, with precompressed copies, served byte-for-byte."""
+    body: bytes
+    gzip_body: Optional[bytes] = None
+    brotli_body: Optional[bytes] = None
+
+    @classmethod
+    def build(cls, body: bytes) -> "JSONSnapshot":
+        """Compress `body` up front; CPU-heavy, so call it off the event loop."""
+        if len(body) < MIN_COMPRESS_BYTES:
+            return cls(body=body)
+        return cls(
+            body=body,
+            # mtime=0 keeps the gzip bytes identical for identical content
+            gzip_body=gzip.compress(body, compresslevel=9, mtime=0),
+            brotli_body=brotli.compress(body, quality=11) if brotli else None,
+        )
+
+    def response(self, request: Request, etag: Optional[str] = None, cache_control: Optional[str] = None) -> Response:
+        """Serve the best encoding the client accepts, without re-encoding anything.
+
+        `etag` is the tag of the plain body; compressed bodies get it with an
+        encoding suffix, as their bytes differ.
+        """
+        accepted = _accepted_encodings(request.headers.get("accept-encoding", ""))
+        headers = {"Vary": "Accept-Encoding"}
+        body, encoding = self.body, None
+        if self.brotli_body is not None and "br" in accepted:
+            body, encoding = self.brotli_body, "br"
+        elif self.gzip_body is not None and ("gzip" in accepted or "*" in accepted):
+            body, encoding = self.gzip_body, "gzip"
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        if etag:
+            headers["ETag"] = encoded_etag(etag, encoding) if encoding else etag
+        if cache_control:
+            headers["Cache-Control"] = cache_control
+        return Response(content=body, media_type="application/json", headers=headers)
+
+def _accepted_encodings(header: str) -> Set[str]:
+    """Content codings from an Accept-Encoding header, minus any with q=0."""
+    accepted = set()
+    for part in header.split(","):
+        coding, _, params = part.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        name, _, value = params.strip().partition("=")
+        if name.strip().lower() == "q":
+            try:
+                quality = float(value)
+            except ValueError:
+                quality = 0.0
+        if quality > 0:
+            accepted.add(coding)
+    return accepted
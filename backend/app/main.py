@@ -1,13 +1,24 @@
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
+from app.core.cache import cache_bus, cache_stats
+from app.core.config import CAS_IMAGES_DIR
 from app.core.database import dynamodb  # Import DynamoDB client
+from app.core.passwords import password_hasher
+from app.services.user_service import ensure_user_lookup_markers
+from app.services.job_applications_service import ensure_job_application_index
+from app.services.menu_service import menu_search
+from app.services.branches_service import branch_hours, branch_locations
+from app.utils.email import outbox, precompile_templates
+from app.utils.image_variants import image_variants
 from app.api.routes import (
-    branches,menu,categories,franchise,online_order_link,gallery_cat,image,testimonial,user,job_positions,job_applications
+    branches,menu,categories,franchise,online_order_link,gallery_cat,image,testimonial,user,job_positions,job_applications,email_outbox
 )
 #  categories, menu, franchise, job_positions, job_applications,gallery_cat, image, online_order_link, testimonial
 # Initialize FastAPI
-app = FastAPI(title="Banjo's Restaurant API")
+# orjson encodes responses (datetimes included) natively, several times faster than stdlib json
+app = FastAPI(title="Banjo's Restaurant API", default_response_class=ORJSONResponse)
 # CORS Configuration
 app.add_middleware(
     CORSMiddleware,
@@ -17,10 +28,21 @@ app.add_middleware(
     allow_headers=["*"],  # Allow all headers
 )
 
+class ImmutableStaticFiles(StaticFiles):
+    """Static files whose content never changes under a given path."""
+
+    def file_response(self, *args, **kwargs):
+        response = super().file_response(*args, **kwargs)
+        response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        return response
+
+# Content-addressed images can be cached forever; mounted first so it takes precedence
+app.mount(f"/{CAS_IMAGES_DIR}", ImmutableStaticFiles(directory=CAS_IMAGES_DIR), name="cas_images")
 # Serve static files (e.g., images)
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
 # Include routers
+app.include_router(branches.live_router, prefix="/branches", tags=["Branches"])
 app.include_router(branches.router, prefix="/branches", tags=["Branches"])
 app.include_router(categories.router, prefix="/categories", tags=["Categories"])
 app.include_router(menu.router, prefix="/menu", tags=["Menu"])
@@ -32,6 +54,7 @@ app.include_router(image.router, prefix="/images", tags=["Image"])
 app.include_router(online_order_link.router, prefix="/api/online-order-links", tags=["Online Order Links"])
 app.include_router(testimonial.router, prefix="/testimonial", tags=["Testimonial"])
 app.include_router(user.router, prefix="/users", tags=["Users"])
+app.include_router(email_outbox.router, prefix="/email-outbox", tags=["Email Outbox"])
 
 
 # Lifecycle events for database connection
@@ -40,14 +63,60 @@ async def startup_db():
     """Initialize DynamoDB connection on application startup."""
     # DynamoDB client is initialized in the `dynamodb.py` file, so no explicit connection is needed.
     print("DynamoDB client initialized!")
+    print(f"Precompiled {precompile_templates()} email templates")
+    await outbox.start()
+    await cache_bus.start()
+    image_variants.start()
+    # Users created before the email/mobile lookup markers existed need them to log in.
+    try:
+        created = await ensure_user_lookup_markers()
+        if created:
+            print(f"Backfilled {created} user lookup markers")
+    except Exception as e:
+        print(f"Error backfilling user lookup markers: {e}")
+    try:
+        indexed = await ensure_job_application_index()
+        if indexed:
+            print(f"Indexed {indexed} existing job applications")
+    except Exception as e:
+        print(f"Error backfilling the job application index: {e}")
+    try:
+        print(f"Indexed {await menu_search.rebuild()} menu items for search")
+    except Exception as e:
+        print(f"Error building the menu search index: {e}")
+    try:
+        print(f"Indexed {await branch_locations.rebuild()} branch locations")
+    except Exception as e:
+        print(f"Error building the branch location index: {e}")
+    try:
+        print(f"Indexed {await branch_hours.rebuild()} branch opening hours")
+    except Exception as e:
+        print(f"Error building the branch opening hours index: {e}")
 
 @app.on_event("shutdown")
 async def shutdown_db():
     """Clean up resources on application shutdown."""
-    # DynamoDB client does not require explicit closing, but you can add cleanup logic if needed.
+    # Release the DynamoDB executor threads and their pooled HTTP connections.
+    await outbox.stop()
+    await cache_bus.stop()
+    dynamodb.close()
+    password_hasher.close()
+    image_variants.close()
     print("Application shutting down...")
 
 # Root endpoint
 @app.get("/")
 def home():
-    return {"message": "Welcome to Banjo's Restaurant API"}
\ No newline at end of file
+    return {"message": "Welcome to Banjo's Restaurant API"}
+
+@app.get("/metrics")
+def metrics():
+    """Expose runtime counters for the worker that serves the request."""
+    return {
+        "password_hashing": password_hasher.stats(),
+        "email_outbox": outbox.stats(),
+        "caches": cache_stats(),
+        "menu_search": menu_search.stats(),
+        "branch_locations": branch_locations.stats(),
+        "branch_hours": branch_hours.stats(),
+    }
@@ -1,6 +1,6 @@
 # banjos_restaurant\app\models\branches.py
 from pydantic import BaseModel, EmailStr
-from typing import Optional
+from typing import Optional, Dict, List, Tuple
 
 class BranchModel(BaseModel):
     id: Optional[str] = None  # Make id optional
@@ -22,6 +22,9 @@ class BranchModel(BaseModel):
     parking_availability: bool = False
     wifi_availability: bool = False
     image_url: Optional[str] = None
+    image_variants: Dict[str, str] = {}
+    # Weekly (start, end) minutes since Monday 00:00 parsed from opening_hours; None if unparseable
+    opening_intervals: Optional[List[Tuple[int, int]]] = None
 
     class Config:
         from_attributes = True
\ No newline at end of file
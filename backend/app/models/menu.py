@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional
+from typing import Optional, Dict
 
 class MenuModel(BaseModel):
     id: str = Field(..., alias="_id")  # Convert MongoDB _id to id
@@ -10,6 +10,7 @@ class MenuModel(BaseModel):
     price: float
     parcel_price: Optional[float] = None
     image_url: Optional[str] = None  # URL to the uploaded image
+    image_variants: Dict[str, str] = {}  # Resized/WebP variant name -> URL
     is_available: bool = True
     is_veg: bool = True
     created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -1,6 +1,6 @@
 # banjos_restaurant\app\schemas\branches.py
 from pydantic import BaseModel, EmailStr
-from typing import Optional
+from typing import Optional, Dict
 
 class BranchCreate(BaseModel):
     name: str
@@ -42,6 +42,10 @@ class BranchResponse(BaseModel):
     parking_availability: bool
     wifi_availability: bool
     image_url: Optional[str] = None
+    image_variants: Dict[str, str] = {}
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class NearbyBranchResponse(BranchResponse):
+    distance_km: float
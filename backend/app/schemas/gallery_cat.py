@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional
+from typing import Optional, Dict
 
 class GalleryCreate(BaseModel):
     """Schema for creating a gallery category."""
@@ -16,6 +16,7 @@ class GalleryCategoryResponse(BaseModel):
     id: str
     name: str
     image_url: str
+    image_variants: Dict[str, str] = {}
     created_at: datetime
 
     class Config:
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional
+from typing import Optional, Dict
 
 class ImageCreate(BaseModel):
     """Schema for creating an image."""
@@ -23,6 +23,7 @@ class ImageResponse(BaseModel):
     description: Optional[str] = None
     category_id: str
     file_path: str
+    image_variants: Dict[str, str] = {}
     created_at: datetime
 
     class Config:
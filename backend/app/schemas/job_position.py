@@ -1,7 +1,7 @@
 # banjos_restaurant\app\schemas\job_position.py
 from pydantic import BaseModel, Field, validator
 from datetime import datetime
-from typing import Optional
+from typing import Optional, Dict
 
 class JobPositionBase(BaseModel):
     title: str
@@ -12,6 +12,7 @@ class JobPositionBase(BaseModel):
     job_type: str
     status: str = Field(default="active", pattern="^(active|inactive)$")
     image_url: Optional[str] = None
+    image_variants: Dict[str, str] = {}
 
     @validator("min_salary", "max_salary")
     def validate_salary(cls, value):
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional
+from typing import Optional, Dict, List, Literal
 
 class MenuCreate(BaseModel):
     name: str
@@ -20,6 +20,25 @@ class MenuUpdate(BaseModel):
     is_available: Optional[bool] = None
     is_veg: Optional[bool] = None
 
+class MenuBulkOperation(BaseModel):
+    """One row of a bulk menu request.
+
+    `create` needs name, description, category_name and price; `update` needs
+    `id` and the fields to change; `availability` needs `id` and `is_available`.
+    """
+    action: Literal["create", "update", "availability"]
+    id: Optional[str] = None
+    name: Optional[str] = None
+    description: Optional[str] = None
+    category_name: Optional[str] = None
+    price: Optional[float] = Field(None, ge=0)
+    parcel_price: Optional[float] = Field(None, ge=0)
+    is_available: Optional[bool] = None
+    is_veg: Optional[bool] = None
+
+    class Config:
+        extra = "forbid"  # A misspelt CSV column must not be silently ignored
+
 class MenuResponse(BaseModel):
     id: str
     name: str
@@ -28,10 +47,16 @@ class MenuResponse(BaseModel):
     price: float
     parcel_price: Optional[float] = None
     image_url: Optional[str] = None
+    image_variants: Dict[str, str] = {}
     is_available: bool
     is_veg: bool
     created_at: datetime
     updated_at: datetime
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class MenuBulkResult(BaseModel):
+    created: int
+    updated: int
+    items: List[MenuResponse]  # In request order
@@ -1,63 +1,64 @@
 # banjos_restaurant\app\services\branches_service.py
-import os
 import uuid
-from typing import Optional
+from datetime import datetime
+from typing import Any, Dict, Optional, List
+from zoneinfo import ZoneInfo
+from botocore.exceptions import ClientError
 from fastapi import UploadFile, HTTPException  # Import HTTPException
+from app.core.cache import branches_cache, cache_bus, LiveIndex
+from app.core.codec import ItemCodec
+from app.core.config import BRANCH_TIMEZONE, CACHE_TTL_SECONDS
 from app.core.database import dynamodb
+from app.core.geo import GeoGridIndex
+from app.core.opening_hours import (
+    WeeklyIntervalIndex, intervals_attribute, minute_of_week, parse_intervals, parse_opening_hours
+)
 from app.models.branches import BranchModel
+from app.services.image_store_service import store_image, release_image
 
-# Ensure static/images directory exists
-os.makedirs("static/images", exist_ok=True)
+# Branches <-> DynamoDB items, compiled from the model
+branch_codec = ItemCodec(BranchModel, "Branches", custom={"opening_intervals": (intervals_attribute, parse_intervals)})
 
-async def save_image(file: UploadFile) -> str:
-    """Save an uploaded image and return the file path."""
-    file_path = f"static/images/{file.filename}"
-    with open(file_path, "wb") as buffer:
-        buffer.write(await file.read())
-    return f"/{file_path}"
+def _branch_from_item(item: Dict[str, Any]) -> BranchModel:
+    """Convert a DynamoDB branch item to a BranchModel."""
+    fields = branch_codec.fields(item)
+    if "opening_intervals" not in item:
+        # Branches saved before hours were parsed on write
+        fields["opening_intervals"] = parse_opening_hours(fields["opening_hours"])
+    return BranchModel.model_validate(fields)
 
 async def create_branch(branch_data: dict, image: Optional[UploadFile] = None) -> BranchModel:
     """Create a new branch with an optional image."""
     try:
         if image:
-            branch_data["image_url"] = await save_image(image)
+            stored = await store_image(image)
+            branch_data["image_url"] = stored.url
+            branch_data["image_variants"] = stored.variants
 
         # Generate a unique ID for the branch
         branch_id = str(uuid.uuid4())
         branch_data["id"] = branch_id
+        branch_data["opening_intervals"] = parse_opening_hours(branch_data.get("opening_hours"))
 
         # Insert into DynamoDB
-        item = {
-            "Home": {"S": "Branches"},  # Partition key (must match your DynamoDB table)
-            "1": {"S": branch_id},      # Sort key (must match your DynamoDB table)
-            "name": {"S": branch_data.get("name", "")},
-            "latitude": {"N": str(branch_data.get("latitude", 0.0))},
-            "longitude": {"N": str(branch_data.get("longitude", 0.0))},
-            "address": {"S": branch_data.get("address", "")},
-            "city": {"S": branch_data.get("city", "")},
-            "state": {"S": branch_data.get("state", "")},
-            "country": {"S": branch_data.get("country", "")},
-            "zipcode": {"S": branch_data.get("zipcode", "")},
-            "phone_number": {"S": branch_data.get("phone_number", "")},
-            "email": {"S": branch_data.get("email", "")},
-            "opening_hours": {"S": branch_data.get("opening_hours", "")},
-            "manager_name": {"S": branch_data.get("manager_name", "")},
-            "branch_opening_date": {"S": branch_data.get("branch_opening_date", "")},
-            "branch_status": {"S": branch_data.get("branch_status", "open")},
-            "seating_capacity": {"N": str(branch_data.get("seating_capacity", 0))},
-            "parking_availability": {"BOOL": branch_data.get("parking_availability", False)},
-            "wifi_availability": {"BOOL": branch_data.get("wifi_availability", False)},
-            "image_url": {"S": branch_data.get("image_url", "")}
-        }
+        item = branch_codec.encode(branch_data)
 
         await dynamodb.put_item(item)
-        return BranchModel(**branch_data)
+        await cache_bus.publish("branches")
+        branch = BranchModel(**branch_data)
+        branch_locations.upsert(branch)
+        branch_hours.upsert(branch)
+        return branch
 
     except Exception as e:
         print(f"Error creating branch: {e}")
         raise HTTPException(status_code=500, detail="Failed to create branch")
 
 async def get_branch(branch_id: str) -> Optional[BranchModel]:
+    """Retrieve a branch by ID, served from the branches cache while fresh."""
+    return await branches_cache.get_or_load(("id", branch_id), lambda: _load_branch(branch_id))
+
+async def _load_branch(branch_id: str) -> Optional[BranchModel]:
     """Retrieve a branch by ID."""
     try:
         key = {
@@ -66,29 +67,7 @@ async def get_branch(branch_id: str) -> Optional[BranchModel]:
         }
         item = await dynamodb.get_item(key)
         if item:
-            # Convert DynamoDB item to BranchModel
-            branch_data = {
-                "id": item.get("1", {}).get("S", ""),  # Use the sort key as the id
-                "name": item.get("name", {}).get("S", ""),
-                "latitude": float(item.get("latitude", {}).get("N", "0")),
-                "longitude": float(item.get("longitude", {}).get("N", "0")),
-                "address": item.get("address", {}).get("S", ""),
-                "city": item.get("city", {}).get("S", ""),
-                "state": item.get("state", {}).get("S", ""),
-                "country": item.get("country", {}).get("S", ""),
-                "zipcode": item.get("zipcode", {}).get("S", ""),
-                "phone_number": item.get("phone_number", {}).get("S", ""),
-                "email": item.get("email", {}).get("S", ""),
-                "opening_hours": item.get("opening_hours", {}).get("S", ""),
-                "manager_name": item.get("manager_name", {}).get("S", ""),
-                "branch_opening_date": item.get("branch_opening_date", {}).get("S", ""),
-                "branch_status": item.get("branch_status", {}).get("S", "open"),
-                "seating_capacity": int(item.get("seating_capacity", {}).get("N", "0")),
-                "parking_availability": item.get("parking_availability", {}).get("BOOL", False),
-                "wifi_availability": item.get("wifi_availability", {}).get("BOOL", False),
-                "image_url": item.get("image_url", {}).get("S", "")
-            }
-            return BranchModel(**branch_data)
+            return _branch_from_item(item)
         else:
             raise HTTPException(status_code=404, detail="Branch not found")
     except Exception as e:
@@ -96,50 +75,79 @@ async def get_branch(branch_id: str) -> Optional[BranchModel]:
         raise HTTPException(status_code=500, detail="Failed to retrieve branch")
 
 async def get_all_branches() -> list[BranchModel]:
+    """Retrieve all branches, served from the branches cache while fresh."""
+    return await branches_cache.get_or_load("all", _load_all_branches)
+
+async def _load_all_branches() -> list[BranchModel]:
     """Retrieve all branches."""
     try:
-        items = await dynamodb.scan()
-        branches = []
-        for item in items:
-            if item.get("Home", {}).get("S") == "Branches":  # Filter by partition key
-                branch_data = {
-                    "id": item.get("1", {}).get("S", ""),  # Use the sort key as the id
-                    "name": item.get("name", {}).get("S", ""),
-                    "latitude": float(item.get("latitude", {}).get("N", "0")),
-                    "longitude": float(item.get("longitude", {}).get("N", "0")),
-                    "address": item.get("address", {}).get("S", ""),
-                    "city": item.get("city", {}).get("S", ""),
-                    "state": item.get("state", {}).get("S", ""),
-                    "country": item.get("country", {}).get("S", ""),
-                    "zipcode": item.get("zipcode", {}).get("S", ""),
-                    "phone_number": item.get("phone_number", {}).get("S", ""),
-                    "email": item.get("email", {}).get("S", ""),
-                    "opening_hours": item.get("opening_hours", {}).get("S", ""),
-                    "manager_name": item.get("manager_name", {}).get("S", ""),
-                    "branch_opening_date": item.get("branch_opening_date", {}).get("S", ""),
-                    "branch_status": item.get("branch_status", {}).get("S", "open"),
-                    "seating_capacity": int(item.get("seating_capacity", {}).get("N", "0")),
-                    "parking_availability": item.get("parking_availability", {}).get("BOOL", False),
-                    "wifi_availability": item.get("wifi_availability", {}).get("BOOL", False),
-                    "image_url": item.get("image_url", {}).get("S", "")
-                }
-                branches.append(BranchModel(**branch_data))
-        return branches
+        items = await dynamodb.query_partition("Branches")
+        return [_branch_from_item(item) for item in items]
     except Exception as e:
         print(f"Error retrieving branches: {e}")
         raise HTTPException(status_code=500, detail="Failed to retrieve branches")
 
+# Branch locations bucketed on a lat/lng grid, for nearest-branch queries
+branch_locations = LiveIndex(factory=GeoGridIndex, loader=get_all_branches, ttl=CACHE_TTL_SECONDS)
+cache_bus.subscribe("branches", branch_locations.mark_stale)
+
+def _is_open(branch: BranchModel) -> bool:
+    return (branch.branch_status or "").lower() == "open"
+
+async def get_nearby_branches(latitude: float, longitude: float, radius_km: float, limit: int) -> List[dict]:
+    """The nearest open branches within `radius_km`, nearest first, with their distance."""
+    try:
+        index = await branch_locations.current()
+        nearby = index.nearest(latitude, longitude, radius_km, limit, predicate=_is_open)
+        return [{**branch.model_dump(), "distance_km": round(distance, 3)} for distance, branch in nearby]
+    except Exception as e:
+        print(f"Error finding nearby branches: {e}")
+        raise HTTPException(status_code=500, detail="Failed to find nearby branches")
+
+# Branch opening intervals bucketed by hour of the week, for "open now" queries
+branch_hours = LiveIndex(factory=WeeklyIntervalIndex, loader=get_all_branches, ttl=CACHE_TTL_SECONDS)
+cache_bus.subscribe("branches", branch_hours.mark_stale)
+
+_branch_timezone = ZoneInfo(BRANCH_TIMEZONE)
+
+async def get_open_branches(at: Optional[datetime] = None) -> List[BranchModel]:
+    """Open branches whose opening hours cover `at` (default: now), by name.
+
+    Opening hours are read in BRANCH_TIMEZONE; a naive `at` is taken to be
+    in that timezone already.
+    """
+    try:
+        if at is None:
+            local = datetime.now(_branch_timezone)
+        elif at.tzinfo is None:
+            local = at
+        else:
+            local = at.astimezone(_branch_timezone)
+        index = await branch_hours.current()
+        branches = [branch for branch in index.open_at(minute_of_week(local)) if _is_open(branch)]
+        return sorted(branches, key=lambda branch: branch.name)
+    except Exception as e:
+        print(f"Error finding open branches: {e}")
+        raise HTTPException(status_code=500, detail="Failed to find open branches")
+
 async def update_branch(branch_id: str, branch_data: dict, image: Optional[UploadFile] = None) -> Optional[BranchModel]:
     """Update a branch."""
     try:
-        if image:
-            branch_data["image_url"] = await save_image(image)
-
         key = {
             "Home": {"S": "Branches"},  # Partition key
             "1": {"S": branch_id}       # Sort key
         }
 
+        old_image_url = None
+        if image:
+            existing = await dynamodb.get_item(key)
+            if not existing:
+                raise HTTPException(status_code=404, detail="Branch not found")
+            old_image_url = existing.get("image_url", {}).get("S")
+            stored = await store_image(image)
+            branch_data["image_url"] = stored.url
+            branch_data["image_variants"] = stored.variants
+
         update_expression = "SET "
         expression_attribute_names = {}
         expression_attribute_values = {}
@@ -148,24 +156,45 @@ async def update_branch(branch_id: str, branch_data: dict, image: Optional[Uploa
             if value is not None:  # Only update fields that are provided
                 expression_attribute_names[f"#{field}"] = field
                 update_expression += f"#{field} = :{field}, "
-                
-                # Handle different data types appropriately
-                if field in ["latitude", "longitude", "seating_capacity"]:
-                    expression_attribute_values[f":{field}"] = {"N": str(value)}
-                elif field in ["parking_availability", "wifi_availability"]:
-                    expression_attribute_values[f":{field}"] = {"BOOL": bool(value)}
-                else:
-                    expression_attribute_values[f":{field}"] = {"S": str(value)}
+                expression_attribute_values[f":{field}"] = branch_codec.attribute(field, value)
+
+        if branch_data.get("opening_hours") is not None:
+            # Re-parse with the text, so the stored intervals never describe older hours
+            expression_attribute_names["#opening_intervals"] = "opening_intervals"
+            expression_attribute_values[":opening_intervals"] = branch_codec.attribute(
+                "opening_intervals", parse_opening_hours(branch_data["opening_hours"])
+            )
+            update_expression += "#opening_intervals = :opening_intervals, "
 
         update_expression = update_expression.rstrip(", ")
 
-        await dynamodb.update_item(
-            key=key,
-            update_expression=update_expression,
-            expression_attribute_names=expression_attribute_names,
-            expression_attribute_values=expression_attribute_values
-        )
-        return await get_branch(branch_id)
+        # Only update an existing item; otherwise the update would create a stub
+        expression_attribute_names["#pk"] = "Home"
+        try:
+            response = await dynamodb.update_item(
+                key=key,
+                update_expression=update_expression,
+                expression_attribute_names=expression_attribute_names,
+                expression_attribute_values=expression_attribute_values,
+                condition_expression="attribute_exists(#pk)",
+                return_values="ALL_NEW"
+            )
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") != "ConditionalCheckFailedException":
+                raise
+            if image:
+                # Nothing will reference the image stored for this update
+                await release_image(stored.url)
+            raise HTTPException(status_code=404, detail="Branch not found")
+        await cache_bus.publish("branches")
+        if old_image_url:
+            await release_image(old_image_url)
+        branch = _branch_from_item(response["Attributes"])
+        branch_locations.upsert(branch)
+        branch_hours.upsert(branch)
+        return branch
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error updating branch: {e}")
         raise HTTPException(status_code=500, detail="Failed to update branch")
@@ -177,7 +206,12 @@ async def delete_branch(branch_id: str) -> bool:
             "Home": {"S": "Branches"},  # Partition key
             "1": {"S": branch_id}       # Sort key
         }
-        response = await dynamodb.delete_item(key)
+        response = await dynamodb.delete_item(key, return_values="ALL_OLD")
+        await cache_bus.publish("branches")
+        branch_locations.remove(branch_id)
+        branch_hours.remove(branch_id)
+        deleted = response.get("Attributes", {})
+        await release_image(deleted.get("image_url", {}).get("S"))
         return True
     except Exception as e:
         print(f"Error deleting branch: {e}")
@@ -41,24 +41,23 @@ async def apply_for_job(application_data: dict) -> JobApplicationModel:
 async def get_all_applications() -> list[JobApplicationModel]:
     """Retrieve all job applications."""
     try:
-        items = await dynamodb.scan()
+        items = await dynamodb.query_partition("JobApplications")
         applications = []
         for item in items:
-            if item.get("Home", {}).get("S") == "JobApplications":  # Filter by partition key
-                application_data = {
-                    "id": item.get("1", {}).get("S", ""),  # Use the sort key as the id
-                    "branch_id": item.get("branch_id", {}).get("S", ""),
-                    "job_title": item.get("job_title", {}).get("S", ""),
-                    "applicant_name": item.get("applicant_name", {}).get("S", ""),
-                    "applicant_email": item.get("applicant_email", {}).get("S", ""),
-                    "applicant_phone": item.get("applicant_phone", {}).get("S", ""),
-                    "resume_url": item.get("resume_url", {}).get("S", ""),
-                    "cover_letter": item.get("cover_letter", {}).get("S", ""),
-                    "application_status": item.get("application_status", {}).get("S", "pending"),
-                    "created_at": item.get("created_at", {}).get("S", ""),
-                    "updated_at": item.get("updated_at", {}).get("S", "")
-                }
-                applications.append(JobApplicationModel(**application_data))
+            application_data = {
+                "id": item.get("1", {}).get("S", ""),  # Use the sort key as the id
+                "branch_id": item.get("branch_id", {}).get("S", ""),
+                "job_title": item.get("job_title", {}).get("S", ""),
+                "applicant_name": item.get("applicant_name", {}).get("S", ""),
+                "applicant_email": item.get("applicant_email", {}).get("S", ""),
+                "applicant_phone": item.get("applicant_phone", {}).get("S", ""),
+                "resume_url": item.get("resume_url", {}).get("S", ""),
+                "cover_letter": item.get("cover_letter", {}).get("S", ""),
+                "application_status": item.get("application_status", {}).get("S", "pending"),
+                "created_at": item.get("created_at", {}).get("S", ""),
+                "updated_at": item.get("updated_at", {}).get("S", "")
+            }
+            applications.append(JobApplicationModel(**application_data))
         return applications
     except Exception as e:
         print(f"Error retrieving job applications: {e}")
@@ -2,10 +2,19 @@
 import os
 import uuid
 from typing import Optional, List
+from botocore.exceptions import ClientError
 from fastapi import HTTPException
+from app.core.cache import categories_cache, cache_bus
 from app.core.database import dynamodb
 from app.models.categories import CategoryModel
 
+def _category_from_item(item: dict) -> CategoryModel:
+    """Convert a DynamoDB category item to a CategoryModel."""
+    return CategoryModel(
+        id=item.get("1", {}).get("S", ""),  # Use the sort key as the id
+        name=item.get("name", {}).get("S", ""),
+    )
+
 async def create_category(category_data: dict) -> CategoryModel:
     """Create a new category."""
     try:
@@ -21,6 +30,7 @@ async def create_category(category_data: dict) -> CategoryModel:
         }
 
         await dynamodb.put_item(item)
+        await cache_bus.publish("categories")
         return CategoryModel(**category_data)
 
     except Exception as e:
@@ -28,6 +38,10 @@ async def create_category(category_data: dict) -> CategoryModel:
         raise HTTPException(status_code=500, detail="Failed to create category")
 
 async def get_category(category_id: str) -> Optional[CategoryModel]:
+    """Retrieve a category by ID, served from the categories cache while fresh."""
+    return await categories_cache.get_or_load(("id", category_id), lambda: _load_category(category_id))
+
+async def _load_category(category_id: str) -> Optional[CategoryModel]:
     """Retrieve a category by ID."""
     try:
         key = {
@@ -36,12 +50,7 @@ async def get_category(category_id: str) -> Optional[CategoryModel]:
         }
         item = await dynamodb.get_item(key)
         if item:
-            # Convert DynamoDB item to CategoryModel
-            category_data = {
-                "id": item.get("1", {}).get("S", ""),  # Use the sort key as the id
-                "name": item.get("name", {}).get("S", ""),
-            }
-            return CategoryModel(**category_data)
+            return _category_from_item(item)
         else:
             raise HTTPException(status_code=404, detail="Category not found")
     except Exception as e:
@@ -49,17 +58,16 @@ async def get_category(category_id: str) -> Optional[CategoryModel]:
         raise HTTPException(status_code=500, detail="Failed to retrieve category")
 
 async def get_all_categories() -> List[CategoryModel]:
+    """Retrieve all categories, served from the categories cache while fresh."""
+    return await categories_cache.get_or_load("all", _load_all_categories)
+
+async def _load_all_categories() -> List[CategoryModel]:
     """Retrieve all categories."""
     try:
-        items = await dynamodb.scan()
+        items = await dynamodb.query_partition("Categories")
         categories = []
         for item in items:
-            if item.get("Home", {}).get("S") == "Categories":  # Filter by partition key
-                category_data = {
-                    "id": item.get("1", {}).get("S", ""),  # Use the sort key as the id
-                    "name": item.get("name", {}).get("S", ""),
-                }
-                categories.append(CategoryModel(**category_data))
+            categories.append(_category_from_item(item))
         return categories
     except Exception as e:
         print(f"Error retrieving categories: {e}")
@@ -85,13 +93,25 @@ async def update_category(category_id: str, category_data: dict) -> Optional[Cat
 
         update_expression = update_expression.rstrip(", ")
 
-        await dynamodb.update_item(
-            key=key,
-            update_expression=update_expression,
-            expression_attribute_names=expression_attribute_names,
-            expression_attribute_values=expression_attribute_values
-        )
-        return await get_category(category_id)
+        # Only update an existing item; otherwise the update would create a stub
+        expression_attribute_names["#pk"] = "Home"
+        try:
+            response = await dynamodb.update_item(
+                key=key,
+                update_expression=update_expression,
+                expression_attribute_names=expression_attribute_names,
+                expression_attribute_values=expression_attribute_values,
+                condition_expression="attribute_exists(#pk)",
+                return_values="ALL_NEW"
+            )
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") != "ConditionalCheckFailedException":
+                raise
+            raise HTTPException(status_code=404, detail="Category not found")
+        await cache_bus.publish("categories")
+        return _category_from_item(response["Attributes"])
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error updating category: {e}")
         raise HTTPException(status_code=500, detail="Failed to update category")
@@ -104,6 +124,7 @@ async def delete_category(category_id: str) -> bool:
             "1": {"S": category_id}       # Sort key
         }
         response = await dynamodb.delete_item(key)
+        await cache_bus.publish("categories")
         return True
     except Exception as e:
         print(f"Error deleting category: {e}")
@@ -1,10 +1,16 @@
 import uuid
+from botocore.exceptions import ClientError
 from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from app.core.codec import ItemCodec
+from app.core.config import EXPORT_PAGE_SIZE
 from app.core.database import dynamodb
+from app.core.pagination import Page, PageParams, fetch_page
 from app.models.franchise import FranchiseRequestCreate, FranchiseRequestResponse
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional
 from app.utils.email import send_email
+from app.utils.export import export_response
 
 async def create_franchise_request(request_data: FranchiseRequestCreate) -> FranchiseRequestResponse:
     """Create a new franchise request."""
@@ -62,34 +68,41 @@ async def create_franchise_request(request_data: FranchiseRequestCreate) -> Fran
         raise HTTPException(status_code=500, detail="Failed to create franchise request")
 
 
-async def get_all_requests() -> List[FranchiseRequestResponse]:
-    """Retrieve all franchise requests."""
+# Franchise requests <-> DynamoDB items
+request_codec = ItemCodec(FranchiseRequestResponse, "FranchiseRequests")
+
+def _request_data(item: dict) -> dict:
+    """The fields of a franchise request, as stored in a raw DynamoDB item."""
+    return request_codec.fields(item)
+
+def _request_from_item(item: dict) -> FranchiseRequestResponse:
+    """Build a franchise request response from a raw DynamoDB item."""
+    return request_codec.decode(item)
+
+async def get_requests_page(params: PageParams) -> Page[FranchiseRequestResponse]:
+    """Retrieve one page of franchise requests."""
     try:
-        items = await dynamodb.scan()
-        requests = []
-        for item in items:
-            if item.get("Home", {}).get("S") == "FranchiseRequests":  # Filter by partition key
-                request_data = {
-                    "id": item.get("1", {}).get("S", ""),
-                    "user_name": item.get("user_name", {}).get("S", ""),
-                    "user_email": item.get("user_email", {}).get("S", ""),
-                    "user_phone": item.get("user_phone", {}).get("S", ""),
-                    "requested_city": item.get("requested_city", {}).get("S", ""),
-                    "requested_state": item.get("requested_state", {}).get("S", ""),
-                    "requested_country": item.get("requested_country", {}).get("S", ""),
-                    "investment_budget": float(item.get("investment_budget", {}).get("N", "0")),
-                    "experience_in_food_business": item.get("experience_in_food_business", {}).get("S", ""),
-                    "additional_details": item.get("additional_details", {}).get("S", ""),
-                    "request_status": item.get("request_status", {}).get("S", "pending"),
-                    "created_at": datetime.fromisoformat(item.get("created_at", {}).get("S", "")),
-                    "updated_at": datetime.fromisoformat(item.get("updated_at", {}).get("S", "")),
-                }
-                requests.append(FranchiseRequestResponse(**request_data))
-        return requests
+        return await fetch_page("FranchiseRequests", params, _request_from_item)
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error retrieving franchise requests: {e}")
         raise HTTPException(status_code=500, detail="Failed to retrieve franchise requests")
 
+async def export_requests(export_format: str) -> StreamingResponse:
+    """Stream every franchise request as NDJSON or CSV, one DynamoDB page at a time."""
+    try:
+        return await export_response(
+            dynamodb.query_pages("FranchiseRequests", page_size=EXPORT_PAGE_SIZE),
+            _request_data,
+            list(FranchiseRequestResponse.model_fields),
+            export_format,
+            "franchise-requests"
+        )
+    except Exception as e:
+        print(f"Error exporting franchise requests: {e}")
+        raise HTTPException(status_code=500, detail="Failed to export franchise requests")
+
 async def get_request_by_id(request_id: str) -> Optional[FranchiseRequestResponse]:
     """Retrieve a franchise request by ID."""
     try:
@@ -99,24 +112,11 @@ async def get_request_by_id(request_id: str) -> Optional[FranchiseRequestRespons
         }
         item = await dynamodb.get_item(key)
         if item:
-            request_data = {
-                "id": item.get("1", {}).get("S", ""),
-                "user_name": item.get("user_name", {}).get("S", ""),
-                "user_email": item.get("user_email", {}).get("S", ""),
-                "user_phone": item.get("user_phone", {}).get("S", ""),
-                "requested_city": item.get("requested_city", {}).get("S", ""),
-                "requested_state": item.get("requested_state", {}).get("S", ""),
-                "requested_country": item.get("requested_country", {}).get("S", ""),
-                "investment_budget": float(item.get("investment_budget", {}).get("N", "0")),
-                "experience_in_food_business": item.get("experience_in_food_business", {}).get("S", ""),
-                "additional_details": item.get("additional_details", {}).get("S", ""),
-                "request_status": item.get("request_status", {}).get("S", "pending"),
-                "created_at": datetime.fromisoformat(item.get("created_at", {}).get("S", "")),
-                "updated_at": datetime.fromisoformat(item.get("updated_at", {}).get("S", "")),
-            }
-            return FranchiseRequestResponse(**request_data)
+            return request_codec.decode(item)
         else:
             raise HTTPException(status_code=404, detail="Franchise request not found")
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error retrieving franchise request: {e}")
         raise HTTPException(status_code=500, detail="Failed to retrieve franchise request")
@@ -124,11 +124,6 @@ async def get_request_by_id(request_id: str) -> Optional[FranchiseRequestRespons
 async def update_request_status(request_id: str, status: str) -> Optional[FranchiseRequestResponse]:
     """Update a franchise request status."""
     try:
-        # First get the current request to get user details
-        current_request = await get_request_by_id(request_id)
-        if not current_request:
-            raise HTTPException(status_code=404, detail="Franchise request not found")
-
         key = {
             "Home": {"S": "FranchiseRequests"},
             "1": {"S": request_id}
@@ -136,6 +131,7 @@ async def update_request_status(request_id: str, status: str) -> Optional[Franch
 
         update_expression = "SET #request_status = :status, #updated_at = :updated_at"
         expression_attribute_names = {
+            "#pk": "Home",
             "#request_status": "request_status",
             "#updated_at": "updated_at"
         }
@@ -144,31 +140,42 @@ async def update_request_status(request_id: str, status: str) -> Optional[Franch
             ":updated_at": {"S": datetime.utcnow().isoformat()}
         }
 
-        await dynamodb.update_item(
-            key=key,
-            update_expression=update_expression,
-            expression_attribute_names=expression_attribute_names,
-            expression_attribute_values=expression_attribute_values
-        )
+        # The updated request carries the user details for the email, so no read is needed first
+        try:
+            response = await dynamodb.update_item(
+                key=key,
+                update_expression=update_expression,
+                expression_attribute_names=expression_attribute_names,
+                expression_attribute_values=expression_attribute_values,
+                condition_expression="attribute_exists(#pk)",
+                return_values="ALL_NEW"
+            )
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") == "ConditionalCheckFailedException":
+                raise HTTPException(status_code=404, detail="Franchise request not found")
+            raise
+        updated_request = _request_from_item(response["Attributes"])
         
         # Send status update email
         email_context = {
-            "user_name": current_request.user_name,
+            "user_name": updated_request.user_name,
             "request_id": request_id,
-            "requested_city": current_request.requested_city,
-            "requested_state": current_request.requested_state or "",
-            "requested_country": current_request.requested_country,
+            "requested_city": updated_request.requested_city,
+            "requested_state": updated_request.requested_state or "",
+            "requested_country": updated_request.requested_country,
             "request_status": status
         }
         
         send_email(
-            recipient=current_request.user_email,
+            recipient=updated_request.user_email,
             subject=f"Your Banjo's Franchise Request Status Update: {status.capitalize()}",
             template_name="franchise_status_updated.html",
             context=email_context
         )
 
-        return await get_request_by_id(request_id)
+        return updated_request
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error updating franchise request: {e}")
         raise HTTPException(status_code=500, detail="Failed to update franchise request")
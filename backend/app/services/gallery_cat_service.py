@@ -1,33 +1,23 @@
-from typing import List, Optional
+from typing import Optional
+from botocore.exceptions import ClientError
 from fastapi import HTTPException, UploadFile
+from app.core.cache import cache_bus
 from app.core.database import dynamodb
+from app.core.pagination import Page, PageParams, fetch_page
 from app.schemas.gallery_cat import GalleryCategoryResponse
+from app.services.image_store_service import store_image, release_image, variants_attribute, parse_variants
 from datetime import datetime
 import uuid
-import os
 from pathlib import Path
 
-# Ensure static/images directory exists
-os.makedirs("static/images/gallery", exist_ok=True)
-
-async def save_image(file: UploadFile) -> str:
-    """Save an uploaded image and return the file path."""
-    # Generate unique filename to prevent collisions
-    file_ext = os.path.splitext(file.filename)[1]
-    unique_filename = f"{uuid.uuid4()}{file_ext}"
-    file_path = f"static/images/gallery/{unique_filename}"
-    
-    with open(file_path, "wb") as buffer:
-        buffer.write(await file.read())
-    
-    return f"/{file_path}"
-
 async def create_gallery_category(category_data: dict, image: Optional[UploadFile] = None) -> GalleryCategoryResponse:
     """Create a new gallery category with optional image."""
     try:
         # Save image if provided
         if image:
-            category_data["image_url"] = await save_image(image)
+            stored = await store_image(image)
+            category_data["image_url"] = stored.url
+            category_data["image_variants"] = stored.variants
         else:
             category_data["image_url"] = ""
 
@@ -42,10 +32,12 @@ async def create_gallery_category(category_data: dict, image: Optional[UploadFil
             "1": {"S": category_id},
             "name": {"S": category_data["name"]},
             "image_url": {"S": category_data["image_url"]},
+            "image_variants": variants_attribute(category_data.get("image_variants")),
             "created_at": {"S": category_data["created_at"]}
         }
 
         await dynamodb.put_item(item)
+        await cache_bus.publish("gallery_categories")
         return GalleryCategoryResponse(**category_data)
     except Exception as e:
         print(f"Error creating gallery category: {e}")
@@ -60,33 +52,28 @@ async def get_gallery_category(category_id: str) -> Optional[GalleryCategoryResp
         }
         item = await dynamodb.get_item(key)
         if item:
-            category_data = {
-                "id": item.get("1", {}).get("S", ""),
-                "name": item.get("name", {}).get("S", ""),
-                "image_url": item.get("image_url", {}).get("S", ""),
-                "created_at": item.get("created_at", {}).get("S", "")
-            }
-            return GalleryCategoryResponse(**category_data)
+            return _category_from_item(item)
         return None
     except Exception as e:
         print(f"Error retrieving gallery category: {e}")
         raise HTTPException(status_code=500, detail="Failed to retrieve gallery category")
 
-async def get_all_gallery_categories() -> List[GalleryCategoryResponse]:
-    """Retrieve all gallery categories."""
+def _category_from_item(item: dict) -> GalleryCategoryResponse:
+    """Build a gallery category response from a raw DynamoDB item."""
+    return GalleryCategoryResponse(
+        id=item.get("1", {}).get("S", ""),
+        name=item.get("name", {}).get("S", ""),
+        image_url=item.get("image_url", {}).get("S", ""),
+        image_variants=parse_variants(item.get("image_variants")),
+        created_at=item.get("created_at", {}).get("S", "")
+    )
+
+async def get_gallery_categories_page(params: PageParams) -> Page[GalleryCategoryResponse]:
+    """Retrieve one page of gallery categories."""
     try:
-        items = await dynamodb.scan()
-        categories = []
-        for item in items:
-            if item.get("Home", {}).get("S") == "GalleryCategories":
-                category_data = {
-                    "id": item.get("1", {}).get("S", ""),
-                    "name": item.get("name", {}).get("S", ""),
-                    "image_url": item.get("image_url", {}).get("S", ""),
-                    "created_at": item.get("created_at", {}).get("S", "")
-                }
-                categories.append(GalleryCategoryResponse(**category_data))
-        return categories
+        return await fetch_page("GalleryCategories", params, _category_from_item)
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error retrieving gallery categories: {e}")
         raise HTTPException(status_code=500, detail="Failed to retrieve gallery categories")
@@ -94,15 +81,22 @@ async def get_all_gallery_categories() -> List[GalleryCategoryResponse]:
 async def update_gallery_category(category_id: str, category_data: dict, image: Optional[UploadFile] = None) -> Optional[GalleryCategoryResponse]:
     """Update a gallery category by ID."""
     try:
-        # Save new image if provided
-        if image:
-            category_data["image_url"] = await save_image(image)
-
         key = {
             "Home": {"S": "GalleryCategories"},
             "1": {"S": category_id}
         }
 
+        # Save new image if provided
+        old_image_url = None
+        if image:
+            existing = await dynamodb.get_item(key)
+            if not existing:
+                raise HTTPException(status_code=404, detail="Gallery category not found")
+            old_image_url = existing.get("image_url", {}).get("S")
+            stored = await store_image(image)
+            category_data["image_url"] = stored.url
+            category_data["image_variants"] = stored.variants
+
         update_expression = "SET "
         expression_attribute_names = {}
         expression_attribute_values = {}
@@ -111,17 +105,37 @@ async def update_gallery_category(category_id: str, category_data: dict, image:
             if value is not None:
                 expression_attribute_names[f"#{field}"] = field
                 update_expression += f"#{field} = :{field}, "
-                expression_attribute_values[f":{field}"] = {"S": str(value)}
+                if field == "image_variants":
+                    expression_attribute_values[f":{field}"] = variants_attribute(value)
+                else:
+                    expression_attribute_values[f":{field}"] = {"S": str(value)}
 
         update_expression = update_expression.rstrip(", ")
 
-        await dynamodb.update_item(
-            key=key,
-            update_expression=update_expression,
-            expression_attribute_names=expression_attribute_names,
-            expression_attribute_values=expression_attribute_values
-        )
-        return await get_gallery_category(category_id)
+        # Only update an existing item; otherwise the update would create a stub
+        expression_attribute_names["#pk"] = "Home"
+        try:
+            response = await dynamodb.update_item(
+                key=key,
+                update_expression=update_expression,
+                expression_attribute_names=expression_attribute_names,
+                expression_attribute_values=expression_attribute_values,
+                condition_expression="attribute_exists(#pk)",
+                return_values="ALL_NEW"
+            )
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") != "ConditionalCheckFailedException":
+                raise
+            if image:
+                # Nothing will reference the image stored for this update
+                await release_image(stored.url)
+            raise HTTPException(status_code=404, detail="Gallery category not found")
+        await cache_bus.publish("gallery_categories")
+        if old_image_url:
+            await release_image(old_image_url)
+        return _category_from_item(response["Attributes"])
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error updating gallery category: {e}")
         raise HTTPException(status_code=500, detail="Failed to update gallery category")
@@ -133,7 +147,10 @@ async def delete_gallery_category(category_id: str) -> bool:
             "Home": {"S": "GalleryCategories"},
             "1": {"S": category_id}
         }
-        await dynamodb.delete_item(key)
+        response = await dynamodb.delete_item(key, return_values="ALL_OLD")
+        await cache_bus.publish("gallery_categories")
+        deleted = response.get("Attributes", {})
+        await release_image(deleted.get("image_url", {}).get("S"))
         return True
     except Exception as e:
         print(f"Error deleting gallery category: {e}")
@@ -1,23 +1,26 @@
-from typing import List, Optional
+from typing import Optional
+from botocore.exceptions import ClientError
 from fastapi import HTTPException, UploadFile
+from app.core.cache import cache_bus
 from app.core.database import dynamodb
+from app.core.pagination import Page, PageParams, fetch_page
 from app.schemas.image import ImageResponse
+from app.services.image_store_service import store_image, release_image, variants_attribute, parse_variants
 from datetime import datetime
-import os
 import uuid
 
 async def create_image(image_data: dict, file: UploadFile) -> ImageResponse:
     """Create a new image."""
     try:
-        # Save the file to the static/images directory
-        file_path = f"static/images/{file.filename}"
-        with open(file_path, "wb") as buffer:
-            buffer.write(await file.read())
+        # Store the file in the content-addressed image store
+        stored = await store_image(file)
+        file_path = stored.url.lstrip("/")
 
         # Generate a unique ID for the image
         image_id = str(uuid.uuid4())
         image_data["id"] = image_id
         image_data["file_path"] = file_path
+        image_data["image_variants"] = stored.variants
         image_data["created_at"] = datetime.utcnow().isoformat()
 
         # Ensure description is not None
@@ -32,10 +35,12 @@ async def create_image(image_data: dict, file: UploadFile) -> ImageResponse:
             "description": {"S": image_data["description"]},  # Ensure this is a string
             "category_id": {"S": image_data["category_id"]},
             "file_path": {"S": image_data["file_path"]},
+            "image_variants": variants_attribute(image_data["image_variants"]),
             "created_at": {"S": image_data["created_at"]}
         }
 
         await dynamodb.put_item(item)
+        await cache_bus.publish("images")
         return ImageResponse(**image_data)
     except Exception as e:
         print(f"Error creating image: {e}")
@@ -50,37 +55,30 @@ async def get_image(image_id: str) -> Optional[ImageResponse]:
         }
         item = await dynamodb.get_item(key)
         if item:
-            image_data = {
-                "id": item.get("1", {}).get("S", ""),
-                "name": item.get("name", {}).get("S", ""),
-                "description": item.get("description", {}).get("S", ""),
-                "category_id": item.get("category_id", {}).get("S", ""),
-                "file_path": item.get("file_path", {}).get("S", ""),
-                "created_at": item.get("created_at", {}).get("S", "")
-            }
-            return ImageResponse(**image_data)
+            return _image_from_item(item)
         return None
     except Exception as e:
         print(f"Error retrieving image: {e}")
         raise HTTPException(status_code=500, detail="Failed to retrieve image")
 
-async def get_all_images() -> List[ImageResponse]:
-    """Retrieve all images."""
+def _image_from_item(item: dict) -> ImageResponse:
+    """Build an image response from a raw DynamoDB item."""
+    return ImageResponse(
+        id=item.get("1", {}).get("S", ""),
+        name=item.get("name", {}).get("S", ""),
+        description=item.get("description", {}).get("S", ""),
+        category_id=item.get("category_id", {}).get("S", ""),
+        file_path=item.get("file_path", {}).get("S", ""),
+        image_variants=parse_variants(item.get("image_variants")),
+        created_at=item.get("created_at", {}).get("S", "")
+    )
+
+async def get_images_page(params: PageParams) -> Page[ImageResponse]:
+    """Retrieve one page of images."""
     try:
-        items = await dynamodb.scan()
-        images = []
-        for item in items:
-            if item.get("Home", {}).get("S") == "Images":  # Filter by partition key
-                image_data = {
-                    "id": item.get("1", {}).get("S", ""),
-                    "name": item.get("name", {}).get("S", ""),
-                    "description": item.get("description", {}).get("S", ""),
-                    "category_id": item.get("category_id", {}).get("S", ""),
-                    "file_path": item.get("file_path", {}).get("S", ""),
-                    "created_at": item.get("created_at", {}).get("S", "")
-                }
-                images.append(ImageResponse(**image_data))
-        return images
+        return await fetch_page("Images", params, _image_from_item)
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error retrieving images: {e}")
         raise HTTPException(status_code=500, detail="Failed to retrieve images")
@@ -88,22 +86,26 @@ async def get_all_images() -> List[ImageResponse]:
 async def update_image(image_id: str, image_data: dict, file: Optional[UploadFile] = None) -> Optional[ImageResponse]:
     """Update an image by ID."""
     try:
+        key = {
+            "Home": {"S": "Images"},  # Partition key
+            "1": {"S": image_id}      # Sort key
+        }
+
+        old_file_path = None
         if file:
-            # Save the new file to the static/images directory
-            file_path = f"static/images/{file.filename}"
-            with open(file_path, "wb") as buffer:
-                buffer.write(await file.read())
-            image_data["file_path"] = file_path
+            existing = await dynamodb.get_item(key)
+            if not existing:
+                raise HTTPException(status_code=404, detail="Image not found")
+            old_file_path = existing.get("file_path", {}).get("S")
+            # Store the new file in the content-addressed image store
+            stored = await store_image(file)
+            image_data["file_path"] = stored.url.lstrip("/")
+            image_data["image_variants"] = stored.variants
 
         # Ensure description is not None
         if image_data.get("description") is None:
             image_data["description"] = ""
 
-        key = {
-            "Home": {"S": "Images"},  # Partition key
-            "1": {"S": image_id}      # Sort key
-        }
-
         update_expression = "SET "
         expression_attribute_names = {}
         expression_attribute_values = {}
@@ -112,17 +114,37 @@ async def update_image(image_id: str, image_data: dict, file: Optional[UploadFil
             if value is not None:  # Only update fields that are provided
                 expression_attribute_names[f"#{field}"] = field
                 update_expression += f"#{field} = :{field}, "
-                expression_attribute_values[f":{field}"] = {"S": str(value)}
+                if field == "image_variants":
+                    expression_attribute_values[f":{field}"] = variants_attribute(value)
+                else:
+                    expression_attribute_values[f":{field}"] = {"S": str(value)}
 
         update_expression = update_expression.rstrip(", ")
 
-        await dynamodb.update_item(
-            key=key,
-            update_expression=update_expression,
-            expression_attribute_names=expression_attribute_names,
-            expression_attribute_values=expression_attribute_values
-        )
-        return await get_image(image_id)
+        # Only update an existing item; otherwise the update would create a stub
+        expression_attribute_names["#pk"] = "Home"
+        try:
+            response = await dynamodb.update_item(
+                key=key,
+                update_expression=update_expression,
+                expression_attribute_names=expression_attribute_names,
+                expression_attribute_values=expression_attribute_values,
+                condition_expression="attribute_exists(#pk)",
+                return_values="ALL_NEW"
+            )
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") != "ConditionalCheckFailedException":
+                raise
+            if file:
+                # Nothing will reference the image stored for this update
+                await release_image(stored.url)
+            raise HTTPException(status_code=404, detail="Image not found")
+        await cache_bus.publish("images")
+        if old_file_path:
+            await release_image(old_file_path)
+        return _image_from_item(response["Attributes"])
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error updating image: {e}")
         raise HTTPException(status_code=500, detail="Failed to update image")
@@ -134,7 +156,10 @@ async def delete_image(image_id: str) -> bool:
             "Home": {"S": "Images"},  # Partition key
             "1": {"S": image_id}      # Sort key
         }
-        await dynamodb.delete_item(key)
+        response = await dynamodb.delete_item(key, return_values="ALL_OLD")
+        await cache_bus.publish("images")
+        deleted = response.get("Attributes", {})
+        await release_image(deleted.get("file_path", {}).get("S"))
         return True
     except Exception as e:
         print(f"Error deleting image: {e}")
@@ -0,0 +1,165 @@
+# banjos_restaurant\app\services\image_store_service.py
+import asyncio
+import os
+import re
+import uuid
+from dataclasses import dataclass, field
+from typing import Optional, Dict, List, Tuple
+from botocore.exceptions import ClientError
+from fastapi import UploadFile
+from app.core.config import CAS_IMAGES_DIR
+from app.core.database import dynamodb
+from app.utils.image_variants import image_variants, variant_files
+from app.utils.uploads import stream_to_temp
+
+# Every stored image lives at a path derived from its SHA-256, so identical uploads
+# share one file and a path's content never changes. Each blob has a reference
+# count in DynamoDB; the file is removed when the last record lets go of it.
+BLOB_PARTITION = "ImageBlobs"
+CAS_URL_PREFIX = f"/{CAS_IMAGES_DIR}/"
+
+@dataclass
+class StoredImage:
+    """A stored image's URL and the URLs of its resized/WebP variants."""
+    url: str
+    variants: Dict[str, str] = field(default_factory=dict)
+
+def variants_attribute(variants: Optional[Dict[str, str]]) -> dict:
+    """DynamoDB map attribute for a variant name -> URL mapping."""
+    return {"M": {name: {"S": url} for name, url in (variants or {}).items()}}
+
+def parse_variants(attribute: Optional[dict]) -> Dict[str, str]:
+    """Read a variant map attribute back into a name -> URL mapping."""
+    return {name: value.get("S", "") for name, value in (attribute or {}).get("M", {}).items()}
+
+def _extension(filename: Optional[str]) -> str:
+    ext = os.path.splitext(filename or "")[1].lower()
+    return ext if re.fullmatch(r"\.[a-z0-9]{1,10}", ext) else ""
+
+def _blob_key(blob_id: str) -> dict:
+    return {"Home": {"S": BLOB_PARTITION}, "1": {"S": blob_id}}
+
+def _blob_path(blob_id: str) -> str:
+    return f"{CAS_IMAGES_DIR}/{blob_id[:2]}/{blob_id}"
+
+def _place(temp_path: str, final_path: str) -> None:
+    os.makedirs(os.path.dirname(final_path), exist_ok=True)
+    # Identical content, so replacing an existing copy is harmless and atomic
+    os.replace(temp_path, final_path)
+
+def _set_aside(paths: List[str]) -> List[Tuple[str, str]]:
+    """Move files out of the way under a unique name; returns (original, moved) pairs."""
+    token = uuid.uuid4().hex
+    moved = []
+    for path in paths:
+        aside = os.path.join(os.path.dirname(path), f".released-{token}-{os.path.basename(path)}")
+        try:
+            os.replace(path, aside)
+        except FileNotFoundError:
+            continue
+        moved.append((path, aside))
+    return moved
+
+def _finish_release(moved: List[Tuple[str, str]], deleted: bool) -> None:
+    """Drop the set-aside files once the blob is gone, or put them back if it was taken again."""
+    for path, aside in moved:
+        if deleted:
+            os.remove(aside)
+        else:
+            # Same content as any copy a concurrent upload placed meanwhile
+            os.replace(aside, path)
+
+def is_content_addressed(url: Optional[str]) -> bool:
+    return bool(url) and f"/{url.lstrip('/')}".startswith(CAS_URL_PREFIX)
+
+async def store_image(file: UploadFile, variants: bool = True) -> StoredImage:
+    """Store an uploaded image by content hash, take a reference to it and render its variants.
+
+    Variants are rendered once per blob; later uploads of the same content
+    reuse the ones recorded on the blob. Callers that never serve variants
+    pass `variants=False` and skip the rendering.
+    """
+    temp = await stream_to_temp(file, CAS_IMAGES_DIR)
+    blob_id = f"{temp.sha256}{_extension(file.filename)}"
+    final_path = _blob_path(blob_id)
+    try:
+        # Count the reference before the file lands; a release racing this one puts back
+        # whatever it set aside once its conditional delete fails (see release_image)
+        response = await dynamodb.update_item(
+            key=_blob_key(blob_id),
+            update_expression="ADD ref_count :one SET #path = :path, #size = :size",
+            expression_attribute_names={"#path": "path", "#size": "size"},
+            expression_attribute_values={
+                ":one": {"N": "1"},
+                ":path": {"S": final_path},
+                ":size": {"N": str(temp.size)},
+            },
+            return_values="ALL_NEW"
+        )
+        await asyncio.to_thread(_place, temp.path, final_path)
+    except BaseException:
+        if os.path.exists(temp.path):
+            await asyncio.to_thread(os.remove, temp.path)
+        raise
+
+    if not variants:
+        return StoredImage(url=f"/{final_path}")
+
+    blob = response.get("Attributes", {})
+    if "variants" in blob:
+        recorded = parse_variants(blob["variants"])
+        # A release interrupted after setting files aside leaves the record without them
+        if all(os.path.exists(path.lstrip("/")) for path in recorded.values()):
+            return StoredImage(url=f"/{final_path}", variants=recorded)
+
+    rendered = {name: f"/{path}" for name, path in (await image_variants.generate(final_path)).items()}
+    if rendered:
+        await dynamodb.update_item(
+            key=_blob_key(blob_id),
+            update_expression="SET variants = :variants",
+            expression_attribute_names=None,
+            expression_attribute_values={":variants": variants_attribute(rendered)}
+        )
+    return StoredImage(url=f"/{final_path}", variants=rendered)
+
+async def release_image(url: Optional[str]) -> None:
+    """Drop one reference to a stored image, deleting the file with the last one.
+
+    URLs outside the content-addressed store are ignored. Failures are logged
+    rather than raised, since the owning record has already been changed.
+
+    The files are set aside before the blob item is deleted, and the delete
+    only succeeds while nothing references the blob. If an upload of the same
+    content takes a reference in between, the delete fails and the files are
+    put back, so a live blob never ends up without its file.
+    """
+    if not is_content_addressed(url):
+        return
+    blob_id = os.path.basename(url)
+    try:
+        response = await dynamodb.update_item(
+            key=_blob_key(blob_id),
+            update_expression="ADD ref_count :minus_one",
+            expression_attribute_names=None,
+            expression_attribute_values={":minus_one": {"N": "-1"}},
+            return_values="UPDATED_NEW"
+        )
+        if int(response.get("Attributes", {}).get("ref_count", {}).get("N", "0")) > 0:
+            return  # Still referenced elsewhere
+        final_path = _blob_path(blob_id)
+        moved = await asyncio.to_thread(_set_aside, [final_path, *variant_files(final_path)])
+        deleted = False
+        try:
+            await dynamodb.delete_item(
+                _blob_key(blob_id),
+                condition_expression="ref_count <= :zero",
+                expression_attribute_values={":zero": {"N": "0"}}
+            )
+            deleted = True
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") != "ConditionalCheckFailedException":
+                raise
+        finally:
+            await asyncio.to_thread(_finish_release, moved, deleted)
+    except Exception as e:
+        print(f"Error releasing image {url}: {e}")
@@ -1,26 +1,103 @@
+import asyncio
 import os
 import uuid
-from typing import Optional, List
+from typing import Optional, List, Dict, Any
 from fastapi import HTTPException, UploadFile, status
+from fastapi.responses import StreamingResponse
+from botocore.exceptions import ClientError
+from app.core.codec import ItemCodec
 from app.core.database import dynamodb
+from app.core.config import EXPORT_PAGE_SIZE
+from app.core.pagination import Page, PageParams, fetch_page
 from app.schemas.job_applications import (
     JobApplicationCreate, 
     JobApplicationResponse, 
     ALLOWED_STATUSES,
     ApplicationStatus
 )
-from datetime import datetime
+from datetime import datetime, timezone
 from app.utils.email import send_email
+from app.utils.uploads import save_upload
+from app.utils.export import export_response
 
 os.makedirs("static/resumes", exist_ok=True)
 
+# Index items: a full copy of each application under a key sorted by creation time, one
+# per normalized title and one per position, plus a catalog of distinct titles. They are
+# written in the same transaction as the application, so filters query them directly.
+TITLE_INDEX_PARTITION = "JobApplicationsByTitle"
+POSITION_INDEX_PARTITION = "JobApplicationsByPosition"
+TITLE_CATALOG_PARTITION = "JobApplicationTitles"
+INDEX_BACKFILL_KEY = {"Home": {"S": "IndexBackfills"}, "1": {"S": "JobApplications"}}
+
+def normalize_title(title: str) -> str:
+    """Lowercase, single-spaced and free of the `#` key separator."""
+    return " ".join(title.replace("#", " ").lower().split())
+
+def _index_time(value: datetime) -> str:
+    """A filter bound in the same naive-UTC ISO format as stored `created_at` values."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.isoformat()
+
+def _index_items(item: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """The title and position index items for an application item."""
+    application_id = item["1"]["S"]
+    created_at = item.get("created_at", {}).get("S", "")
+    title = normalize_title(item.get("job_position_title", {}).get("S", ""))
+    position_id = item.get("job_position_id", {}).get("S", "")
+    copy = {**item, "application_id": {"S": application_id}, "title_key": {"S": title}}
+    return [
+        {**copy, "Home": {"S": TITLE_INDEX_PARTITION}, "1": {"S": f"{title}#{created_at}#{application_id}"}},
+        {**copy, "Home": {"S": POSITION_INDEX_PARTITION}, "1": {"S": f"{position_id}#{created_at}#{application_id}"}},
+    ]
+
+def _index_key(index_item: Dict[str, Any]) -> Dict[str, Any]:
+    return {"Home": index_item["Home"], "1": index_item["1"]}
+
+def _catalog_update(item: Dict[str, Any], delta: int) -> Dict[str, Any]:
+    """Count an application in or out of its title's catalog entry."""
+    title = normalize_title(item.get("job_position_title", {}).get("S", ""))
+    return {"Update": {
+        "Key": {"Home": {"S": TITLE_CATALOG_PARTITION}, "1": {"S": title}},
+        "UpdateExpression": "ADD #count :delta",
+        "ExpressionAttributeNames": {"#count": "count"},
+        "ExpressionAttributeValues": {":delta": {"N": str(delta)}},
+    }}
+
+def _is_cancelled(error: ClientError) -> bool:
+    return error.response.get("Error", {}).get("Code") in ("TransactionCanceledException", "ConditionalCheckFailedException")
+
+async def ensure_job_application_index() -> int:
+    """Index applications created before the index existed; runs once per table."""
+    if await dynamodb.get_item(INDEX_BACKFILL_KEY):
+        return 0
+    indexed = 0
+    async for page in dynamodb.query_pages("JobApplications"):
+        for item in page:
+            title_item, position_item = _index_items(item)
+            try:
+                await dynamodb.transact_write([
+                    {"Put": {
+                        "Item": title_item,
+                        "ConditionExpression": "attribute_not_exists(#pk)",
+                        "ExpressionAttributeNames": {"#pk": "Home"},
+                    }},
+                    {"Put": {"Item": position_item}},
+                    _catalog_update(item, 1),
+                ])
+                indexed += 1
+            except ClientError as e:
+                if not _is_cancelled(e):
+                    raise
+    await dynamodb.put_item({**INDEX_BACKFILL_KEY, "completed_at": {"S": datetime.utcnow().isoformat()}})
+    return indexed
+
 async def save_resume(file: UploadFile) -> str:
     """Save an uploaded resume and return the file path."""
     unique_filename = f"{uuid.uuid4()}_{file.filename}"
-    file_path = f"static/resumes/{unique_filename}"
-    with open(file_path, "wb") as buffer:
-        buffer.write(await file.read())
-    return f"/{file_path}"
+    stored = await save_upload(file, "static/resumes", unique_filename)
+    return stored.url
 
 async def create_job_application(
     application_data: JobApplicationCreate, 
@@ -54,7 +131,11 @@ async def create_job_application(
             "updated_at": {"S": updated_at},
         }
 
-        await dynamodb.put_item(item)
+        await dynamodb.transact_write(
+            [{"Put": {"Item": item}}]
+            + [{"Put": {"Item": index_item}} for index_item in _index_items(item)]
+            + [_catalog_update(item, 1)]
+        )
 
         email_context = {
             'applicant_name': application_data.full_name,
@@ -83,41 +164,50 @@ async def create_job_application(
             detail=f"Failed to create job application: {str(e)}"
         )
 
-async def get_all_job_applications() -> List[JobApplicationResponse]:
-    """Retrieve all job applications."""
+# Job applications <-> DynamoDB items
+application_codec = ItemCodec(JobApplicationResponse, "JobApplications")
+
+def _application_data(item: dict) -> dict:
+    """The fields of a job application, as stored in a raw DynamoDB item."""
+    return application_codec.fields(item)
+
+def _application_from_item(item: dict) -> JobApplicationResponse:
+    """Build a job application response from a raw DynamoDB item."""
+    application_data = _application_data(item)
     try:
-        items = await dynamodb.scan()
-        applications = []
-        for item in items:
-            if item.get("Home", {}).get("S") == "JobApplications":
-                application_data = {
-                    "id": item.get("1", {}).get("S", ""),
-                    "full_name": item.get("full_name", {}).get("S", ""),
-                    "email": item.get("email", {}).get("S", ""),
-                    "phone": item.get("phone", {}).get("S", ""),
-                    "address": item.get("address", {}).get("S", ""),
-                    "job_position_id": item.get("job_position_id", {}).get("S", ""),
-                    "job_position_title": item.get("job_position_title", {}).get("S", ""),
-                    "experience": item.get("experience", {}).get("S", ""),
-                    "skills": item.get("skills", {}).get("S", ""),
-                    "cover_letter": item.get("cover_letter", {}).get("S", ""),
-                    "resume_url": item.get("resume_url", {}).get("S", ""),
-                    "status": item.get("status", {}).get("S", ApplicationStatus.PENDING.value),
-                    "created_at": item.get("created_at", {}).get("S", ""),
-                    "updated_at": item.get("updated_at", {}).get("S", ""),
-                }
-                try:
-                    applications.append(JobApplicationResponse(**application_data))
-                except ValueError as e:
-                    application_data['status'] = ApplicationStatus.PENDING.value
-                    applications.append(JobApplicationResponse(**application_data))
-        return applications
+        return JobApplicationResponse(**application_data)
+    except ValueError as e:
+        application_data['status'] = ApplicationStatus.PENDING.value
+        return JobApplicationResponse(**application_data)
+
+async def get_job_applications_page(params: PageParams) -> Page[JobApplicationResponse]:
+    """Retrieve one page of job applications."""
+    try:
+        return await fetch_page("JobApplications", params, _application_from_item)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to retrieve job applications: {str(e)}"
         )
 
+async def export_job_applications(export_format: str) -> StreamingResponse:
+    """Stream every job application as NDJSON or CSV, one DynamoDB page at a time."""
+    try:
+        return await export_response(
+            dynamodb.query_pages("JobApplications", page_size=EXPORT_PAGE_SIZE),
+            _application_data,
+            list(JobApplicationResponse.model_fields),
+            export_format,
+            "job-applications"
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to export job applications: {str(e)}"
+        )
+
 async def get_job_application_by_id(application_id: str) -> Optional[JobApplicationResponse]:
     """Retrieve a job application by ID."""
     try:
@@ -128,30 +218,7 @@ async def get_job_application_by_id(application_id: str) -> Optional[JobApplicat
         item = await dynamodb.get_item(key)
         if not item:
             return None
-            
-        application_data = {
-            "id": item.get("1", {}).get("S", ""),
-            "full_name": item.get("full_name", {}).get("S", ""),
-            "email": item.get("email", {}).get("S", ""),
-            "phone": item.get("phone", {}).get("S", ""),
-            "address": item.get("address", {}).get("S", ""),
-            "job_position_id": item.get("job_position_id", {}).get("S", ""),
-            "job_position_title": item.get("job_position_title", {}).get("S", ""),
-            "experience": item.get("experience", {}).get("S", ""),
-            "skills": item.get("skills", {}).get("S", ""),
-            "cover_letter": item.get("cover_letter", {}).get("S", ""),
-            "resume_url": item.get("resume_url", {}).get("S", ""),
-            "status": item.get("status", {}).get("S", ApplicationStatus.PENDING.value),
-            "created_at": item.get("created_at", {}).get("S", ""),
-            "updated_at": item.get("updated_at", {}).get("S", ""),
-        }
-        
-        try:
-            return JobApplicationResponse(**application_data)
-        except ValueError as e:
-            application_data['status'] = ApplicationStatus.PENDING.value
-            return JobApplicationResponse(**application_data)
-            
+        return _application_from_item(item)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -164,14 +231,14 @@ async def update_job_application_status(
 ) -> Optional[JobApplicationResponse]:
     """Update the status of a job application."""
     try:
-        application = await get_job_application_by_id(application_id)
-        if not application:
-            return None
-
         key = {
             "Home": {"S": "JobApplications"},
             "1": {"S": application_id}
         }
+        item = await dynamodb.get_item(key)
+        if not item:
+            return None
+        application = _application_from_item(item)
 
         updated_at = datetime.utcnow().isoformat()
 
@@ -185,11 +252,16 @@ async def update_job_application_status(
             ":updated_at": {"S": updated_at}
         }
 
-        await dynamodb.update_item(
-            key=key,
-            update_expression=update_expression,
-            expression_attribute_names=expression_attribute_names,
-            expression_attribute_values=expression_attribute_values
+        # Index copies are rewritten whole, which also repairs any that are missing
+        updated_item = {**item, "status": {"S": new_status}, "updated_at": {"S": updated_at}}
+        await dynamodb.transact_write(
+            [{"Update": {
+                "Key": key,
+                "UpdateExpression": update_expression,
+                "ExpressionAttributeNames": expression_attribute_names,
+                "ExpressionAttributeValues": expression_attribute_values,
+            }}]
+            + [{"Put": {"Item": index_item}} for index_item in _index_items(updated_item)]
         )
 
         email_context = {
@@ -222,7 +294,23 @@ async def delete_job_application(application_id: str) -> bool:
             "Home": {"S": "JobApplications"},
             "1": {"S": application_id}
         }
-        await dynamodb.delete_item(key)
+        item = await dynamodb.get_item(key)
+        if not item:
+            return True
+        try:
+            # The condition keeps a concurrent delete from counting the title out twice
+            await dynamodb.transact_write(
+                [{"Delete": {
+                    "Key": key,
+                    "ConditionExpression": "attribute_exists(#pk)",
+                    "ExpressionAttributeNames": {"#pk": "Home"},
+                }}]
+                + [{"Delete": {"Key": _index_key(index_item)}} for index_item in _index_items(item)]
+                + [_catalog_update(item, -1)]
+            )
+        except ClientError as e:
+            if not _is_cancelled(e):
+                raise
         return True
     except Exception as e:
         raise HTTPException(
@@ -230,19 +318,82 @@ async def delete_job_application(application_id: str) -> bool:
             detail=f"Failed to delete job application: {str(e)}"
         )
 
-async def filter_job_applications_by_title(job_title: str) -> List[JobApplicationResponse]:
-    """Filter job applications by job title."""
+async def _matching_titles(job_title: str, match: str) -> List[str]:
+    """Catalogued titles that contain, or start with, `job_title`."""
+    needle = normalize_title(job_title)
+    catalog = await dynamodb.query_partition(
+        TITLE_CATALOG_PARTITION,
+        sort_key_prefix=needle if match == "prefix" else None
+    )
+    return [
+        item["1"]["S"] for item in catalog
+        if int(item.get("count", {}).get("N", "0")) > 0 and needle in item["1"]["S"]
+    ]
+
+async def filter_job_applications(
+    job_title: Optional[str] = None,
+    job_position_id: Optional[str] = None,
+    match: str = "substring",
+    status_filter: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+) -> List[JobApplicationResponse]:
+    """Filter job applications through the title and position indexes, newest first.
+
+    Titles are matched against the title catalog, then each matching title
+    (or the position) is read with its creation-time range in the key
+    condition and the status as a server-side filter.
+    """
+    job_title = (job_title or "").strip()
+    if not job_title and not job_position_id:
+        return []
+    if status_filter:
+        canonical = [s for s in ALLOWED_STATUSES if s.lower() == status_filter.lower()]
+        if not canonical:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid status. Allowed statuses: {ALLOWED_STATUSES}"
+            )
+        status_filter = canonical[0]
     try:
-        if not job_title.strip():
-            return []
-            
-        all_applications = await get_all_job_applications()
-        return [
-            app for app in all_applications 
-            if job_title.lower() in app.job_position_title.lower()
+        lower = _index_time(created_from) if created_from else ""
+        # "#" sorts below the "." and digits that may follow, so the upper bound is inclusive
+        upper = f"{_index_time(created_to)}#\uffff" if created_to else "\uffff"
+
+        filters, names, values = [], {}, {}
+        if status_filter:
+            filters.append("#status = :status")
+            names["#status"] = "status"
+            values[":status"] = {"S": status_filter}
+        if job_position_id:
+            partition, prefixes = POSITION_INDEX_PARTITION, [job_position_id]
+            if job_title:
+                filters.append(
+                    "begins_with(#title_key, :title)" if match == "prefix" else "contains(#title_key, :title)"
+                )
+                names["#title_key"] = "title_key"
+                values[":title"] = {"S": normalize_title(job_title)}
+        else:
+            partition, prefixes = TITLE_INDEX_PARTITION, await _matching_titles(job_title, match)
+
+        results = await asyncio.gather(*(
+            dynamodb.query_partition(
+                partition,
+                filter_expression=" AND ".join(filters) or None,
+                expression_attribute_names=names or None,
+                expression_attribute_values=values or None,
+                sort_key_range=(f"{prefix}#{lower}", f"{prefix}#{upper}")
+            )
+            for prefix in prefixes
+        ))
+        applications = [
+            _application_from_item({**item, "1": item["application_id"]})
+            for items in results for item in items
         ]
+        applications.sort(key=lambda application: application.created_at, reverse=True)
+        return applications
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to filter job applications: {str(e)}"
-        )
\ No newline at end of file
+        )
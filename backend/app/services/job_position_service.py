@@ -1,28 +1,35 @@
-import os
 import uuid
 from typing import Optional, List
 from fastapi import HTTPException, UploadFile
 from app.core.database import dynamodb
 from app.schemas.job_position import JobPositionCreate, JobPositionResponse
+from app.services.image_store_service import store_image, release_image, variants_attribute, parse_variants
 from datetime import datetime
 
-# Ensure static/images directory exists
-os.makedirs("static/images", exist_ok=True)
-
-async def save_image(file: UploadFile) -> str:
-    """Save an uploaded image and return the file path."""
-    file_extension = os.path.splitext(file.filename)[1]
-    file_name = f"{uuid.uuid4()}{file_extension}"
-    file_path = f"static/images/{file_name}"
-    with open(file_path, "wb") as buffer:
-        buffer.write(await file.read())
-    return f"/{file_path}"
+def _job_position_from_item(item: dict) -> dict:
+    """The fields of a job position, as stored in a raw DynamoDB item."""
+    return {
+        "id": item.get("1", {}).get("S", ""),
+        "title": item.get("title", {}).get("S", ""),
+        "description": item.get("description", {}).get("S", ""),
+        "min_salary": float(item.get("min_salary", {}).get("N", "0")),
+        "max_salary": float(item.get("max_salary", {}).get("N", "0")),
+        "branch_name": item.get("branch_name", {}).get("S", ""),
+        "job_type": item.get("job_type", {}).get("S", ""),
+        "status": item.get("status", {}).get("S", "active"),
+        "image_url": item.get("image_url", {}).get("S", ""),
+        "image_variants": parse_variants(item.get("image_variants")),
+        "created_at": item.get("created_at", {}).get("S", ""),
+        "updated_at": item.get("updated_at", {}).get("S", ""),
+    }
 
 async def create_job_position(job_data: dict, image: Optional[UploadFile] = None) -> JobPositionResponse:
     """Create a new job position."""
     try:
         if image:
-            job_data["image_url"] = await save_image(image)
+            stored = await store_image(image)
+            job_data["image_url"] = stored.url
+            job_data["image_variants"] = stored.variants
 
         # Generate a unique ID for the job position
         job_id = str(uuid.uuid4())
@@ -42,6 +49,7 @@ async def create_job_position(job_data: dict, image: Optional[UploadFile] = None
             "job_type": {"S": job_data.get("job_type", "")},
             "status": {"S": job_data.get("status", "active")},
             "image_url": {"S": job_data.get("image_url", "")},
+            "image_variants": variants_attribute(job_data.get("image_variants")),
             "created_at": {"S": job_data["created_at"]},
             "updated_at": {"S": job_data["updated_at"]},
         }
@@ -56,23 +64,10 @@ async def create_job_position(job_data: dict, image: Optional[UploadFile] = None
 async def get_all_job_positions() -> List[JobPositionResponse]:
     """Retrieve all job positions."""
     try:
-        items = await dynamodb.scan()
+        items = await dynamodb.query_partition("JobPositions")
         jobs = []
         for item in items:
-            if item.get("Home", {}).get("S") == "JobPositions":
-                jobs.append({
-                    "id": item.get("1", {}).get("S", ""),
-                    "title": item.get("title", {}).get("S", ""),
-                    "description": item.get("description", {}).get("S", ""),
-                    "min_salary": float(item.get("min_salary", {}).get("N", "0")),
-                    "max_salary": float(item.get("max_salary", {}).get("N", "0")),
-                    "branch_name": item.get("branch_name", {}).get("S", ""),
-                    "job_type": item.get("job_type", {}).get("S", ""),
-                    "status": item.get("status", {}).get("S", "active"),
-                    "image_url": item.get("image_url", {}).get("S", ""),
-                    "created_at": item.get("created_at", {}).get("S", ""),
-                    "updated_at": item.get("updated_at", {}).get("S", ""),
-                })
+            jobs.append(_job_position_from_item(item))
         return jobs
     except Exception as e:
         print(f"Error retrieving job positions: {e}")
@@ -87,19 +82,7 @@ async def get_job_position_by_id(job_id: str) -> Optional[JobPositionResponse]:
         }
         item = await dynamodb.get_item(key)
         if item:
-            return {
-                "id": item.get("1", {}).get("S", ""),
-                "title": item.get("title", {}).get("S", ""),
-                "description": item.get("description", {}).get("S", ""),
-                "min_salary": float(item.get("min_salary", {}).get("N", "0")),
-                "max_salary": float(item.get("max_salary", {}).get("N", "0")),
-                "branch_name": item.get("branch_name", {}).get("S", ""),
-                "job_type": item.get("job_type", {}).get("S", ""),
-                "status": item.get("status", {}).get("S", "active"),
-                "image_url": item.get("image_url", {}).get("S", ""),
-                "created_at": item.get("created_at", {}).get("S", ""),
-                "updated_at": item.get("updated_at", {}).get("S", ""),
-            }
+            return _job_position_from_item(item)
         else:
             raise HTTPException(status_code=404, detail="Job position not found")
     except Exception as e:
@@ -115,8 +98,12 @@ async def update_job_position(job_id: str, job_data: dict, image: Optional[Uploa
             raise HTTPException(status_code=404, detail="Job position not found")
 
         # Handle image update
+        old_image_url = None
         if image:
-            job_data["image_url"] = await save_image(image)
+            old_image_url = existing_job.get("image_url")
+            stored = await store_image(image)
+            job_data["image_url"] = stored.url
+            job_data["image_variants"] = stored.variants
         elif "image_url" not in job_data and existing_job.get("image_url"):
             # Keep existing image if no new image provided
             job_data["image_url"] = existing_job["image_url"]
@@ -129,7 +116,8 @@ async def update_job_position(job_id: str, job_data: dict, image: Optional[Uploa
         update_expression = "SET title = :title, description = :description, " \
                            "min_salary = :min_salary, max_salary = :max_salary, " \
                            "branch_name = :branch_name, job_type = :job_type, " \
-                           "#st = :status, image_url = :image_url, updated_at = :updated_at"
+                           "#st = :status, image_url = :image_url, image_variants = :image_variants, " \
+                           "updated_at = :updated_at"
         
         expression_attribute_values = {
             ":title": {"S": job_data.get("title", existing_job.get("title", ""))},
@@ -140,6 +128,7 @@ async def update_job_position(job_id: str, job_data: dict, image: Optional[Uploa
             ":job_type": {"S": job_data.get("job_type", existing_job.get("job_type", ""))},
             ":status": {"S": job_data.get("status", existing_job.get("status", "active"))},
             ":image_url": {"S": job_data.get("image_url", existing_job.get("image_url", ""))},
+            ":image_variants": variants_attribute(job_data.get("image_variants", existing_job.get("image_variants"))),
             ":updated_at": {"S": datetime.utcnow().isoformat()}
         }
 
@@ -147,14 +136,17 @@ async def update_job_position(job_id: str, job_data: dict, image: Optional[Uploa
             "#st": "status"
         }
 
-        await dynamodb.update_item(
+        response = await dynamodb.update_item(
             key=key,
             update_expression=update_expression,
             expression_attribute_values=expression_attribute_values,
-            expression_attribute_names=expression_attribute_names
+            expression_attribute_names=expression_attribute_names,
+            return_values="ALL_NEW"
         )
+        if old_image_url:
+            await release_image(old_image_url)
 
-        return await get_job_position_by_id(job_id)
+        return _job_position_from_item(response["Attributes"])
     except Exception as e:
         print(f"Error updating job position: {e}")
         raise HTTPException(status_code=500, detail="Failed to update job position")
@@ -166,7 +158,9 @@ async def delete_job_position(job_id: str) -> bool:
             "Home": {"S": "JobPositions"},
             "1": {"S": job_id}
         }
-        await dynamodb.delete_item(key)
+        response = await dynamodb.delete_item(key, return_values="ALL_OLD")
+        deleted = response.get("Attributes", {})
+        await release_image(deleted.get("image_url", {}).get("S"))
         return True
     except Exception as e:
         print(f"Error deleting job position: {e}")
@@ -1,27 +1,34 @@
 # banjos_restaurant\app\services\menu_service.py
-import os
+import asyncio
+import csv
+import io
 import uuid
 from typing import Optional, List
+from botocore.exceptions import ClientError
 from fastapi import UploadFile, HTTPException
-from app.core.database import dynamodb
+import orjson
+from pydantic import TypeAdapter, ValidationError
+from app.core.cache import menu_cache, cache_bus, LiveIndex
+from app.core.codec import ItemCodec
+from app.core.config import CACHE_TTL_SECONDS, MENU_BULK_MAX_ROWS
+from app.core.database import dynamodb, TRANSACT_WRITE_MAX_ITEMS
+from app.core.search import InvertedIndex
+from app.core.snapshot import JSONSnapshot
 from app.models.menu import MenuModel
+from app.schemas.menu import MenuBulkOperation, MenuResponse
+from app.services.image_store_service import store_image, release_image
 from datetime import datetime
 
-# Ensure the static/images directory exists
-os.makedirs("static/images", exist_ok=True)
-
-async def save_image(file: UploadFile) -> str:
-    """Save an uploaded image to the static/images folder and return the file path."""
-    file_path = f"static/images/{file.filename}"
-    with open(file_path, "wb") as buffer:
-        buffer.write(await file.read())
-    return f"/static/images/{file.filename}"
+# Menu items <-> DynamoDB items, compiled from the model
+menu_codec = ItemCodec(MenuModel, "Menu")
 
 async def create_menu_item(menu_data: dict, image: Optional[UploadFile] = None) -> MenuModel:
     """Create a new menu item."""
     try:
         if image:
-            menu_data["image_url"] = await save_image(image)
+            stored = await store_image(image)
+            menu_data["image_url"] = stored.url
+            menu_data["image_variants"] = stored.variants
 
         # Generate a unique ID for the menu item
         menu_id = str(uuid.uuid4())
@@ -30,29 +37,23 @@ async def create_menu_item(menu_data: dict, image: Optional[UploadFile] = None)
         menu_data["updated_at"] = datetime.utcnow().isoformat()
 
         # Insert into DynamoDB
-        item = {
-            "Home": {"S": "Menu"},  # Partition key (must match your DynamoDB table)
-            "1": {"S": menu_id},    # Sort key (must match your DynamoDB table)
-            "name": {"S": menu_data.get("name", "")},
-            "description": {"S": menu_data.get("description", "")},
-            "category_name": {"S": menu_data.get("category_name", "")},
-            "price": {"N": str(menu_data.get("price", 0.0))},
-            "parcel_price": {"N": str(menu_data.get("parcel_price", 0.0))} if menu_data.get("parcel_price") is not None else {"NULL": True},
-            "image_url": {"S": menu_data.get("image_url", "")},
-            "is_available": {"BOOL": menu_data.get("is_available", True)},
-            "is_veg": {"BOOL": menu_data.get("is_veg", True)},
-            "created_at": {"S": menu_data.get("created_at", "")},
-            "updated_at": {"S": menu_data.get("updated_at", "")},
-        }
+        item = menu_codec.encode(menu_data)
 
         await dynamodb.put_item(item)
-        return MenuModel(**menu_data)
+        await cache_bus.publish("menu")
+        menu_item = MenuModel(**menu_data)
+        menu_search.upsert(menu_item)
+        return menu_item
 
     except Exception as e:
         print(f"Error creating menu item: {e}")
         raise HTTPException(status_code=500, detail="Failed to create menu item")
 
 async def get_menu_item(menu_id: str) -> Optional[MenuModel]:
+    """Retrieve a menu item by ID, served from the menu cache while fresh."""
+    return await menu_cache.get_or_load(("id", menu_id), lambda: _load_menu_item(menu_id))
+
+async def _load_menu_item(menu_id: str) -> Optional[MenuModel]:
     """Retrieve a menu item by ID."""
     try:
         key = {
@@ -61,21 +62,7 @@ async def get_menu_item(menu_id: str) -> Optional[MenuModel]:
         }
         item = await dynamodb.get_item(key)
         if item:
-            # Convert DynamoDB item to MenuModel
-            menu_data = {
-                "id": item.get("1", {}).get("S", ""),
-                "name": item.get("name", {}).get("S", ""),
-                "description": item.get("description", {}).get("S", ""),
-                "category_name": item.get("category_name", {}).get("S", ""),
-                "price": float(item.get("price", {}).get("N", "0")),
-                "parcel_price": float(item.get("parcel_price", {}).get("N", "0")) if "N" in item.get("parcel_price", {}) else None,
-                "image_url": item.get("image_url", {}).get("S", ""),
-                "is_available": item.get("is_available", {}).get("BOOL", True),
-                "is_veg": item.get("is_veg", {}).get("BOOL", True),
-                "created_at": item.get("created_at", {}).get("S", ""),
-                "updated_at": item.get("updated_at", {}).get("S", ""),
-            }
-            return MenuModel(**menu_data)
+            return menu_codec.decode(item)
         else:
             raise HTTPException(status_code=404, detail="Menu item not found")
     except Exception as e:
@@ -83,53 +70,61 @@ async def get_menu_item(menu_id: str) -> Optional[MenuModel]:
         raise HTTPException(status_code=500, detail="Failed to retrieve menu item")
 
 async def get_all_menu_items() -> List[MenuModel]:
+    """Retrieve all menu items, served from the menu cache while fresh."""
+    return await menu_cache.get_or_load("all", _load_all_menu_items)
+
+async def _load_all_menu_items() -> List[MenuModel]:
     """Retrieve all menu items."""
     try:
-        items = await dynamodb.scan()
-        menu_items = []
-        for item in items:
-            if item.get("Home", {}).get("S") == "Menu":  # Filter by partition key
-                menu_data = {
-                    "id": item.get("1", {}).get("S", ""),
-                    "name": item.get("name", {}).get("S", ""),
-                    "description": item.get("description", {}).get("S", ""),
-                    "category_name": item.get("category_name", {}).get("S", ""),
-                    "price": float(item.get("price", {}).get("N", "0")),
-                    "parcel_price": float(item.get("parcel_price", {}).get("N", "0")) if "N" in item.get("parcel_price", {}) else None,
-                    "image_url": item.get("image_url", {}).get("S", ""),
-                    "is_available": item.get("is_available", {}).get("BOOL", True),
-                    "is_veg": item.get("is_veg", {}).get("BOOL", True),
-                    "created_at": item.get("created_at", {}).get("S", ""),
-                    "updated_at": item.get("updated_at", {}).get("S", ""),
-                }
-                menu_items.append(MenuModel(**menu_data))
-        return menu_items
+        items = await dynamodb.query_partition("Menu")
+        return menu_codec.decode_many(items)
     except Exception as e:
         print(f"Error retrieving menu items: {e}")
         raise HTTPException(status_code=500, detail="Failed to retrieve menu items")
 
+# Encodes the menu exactly as the `List[MenuResponse]` response model would
+_menu_list_adapter = TypeAdapter(List[MenuResponse])
+
+async def get_menu_snapshot() -> JSONSnapshot:
+    """The full menu, pre-encoded as `GET /menu` returns it and rebuilt only after a write."""
+    return await menu_cache.get_or_load("snapshot", _build_menu_snapshot)
+
+async def _build_menu_snapshot() -> JSONSnapshot:
+    items = await get_all_menu_items()
+    body = _menu_list_adapter.dump_json(_menu_list_adapter.validate_python(items, from_attributes=True))
+    return await asyncio.to_thread(JSONSnapshot.build, body)
+
+# Name matches rank above category matches, which rank above description matches
+menu_search = LiveIndex(
+    factory=lambda: InvertedIndex({"name": 3.0, "category_name": 2.0, "description": 1.0}),
+    loader=get_all_menu_items,
+    ttl=CACHE_TTL_SECONDS
+)
+cache_bus.subscribe("menu", menu_search.mark_stale)
+
+async def search_menu_items(query: str, limit: int) -> List[MenuModel]:
+    """Rank menu items against `query` from the in-memory search index."""
+    try:
+        index = await menu_search.current()
+        return index.search(query, limit)
+    except Exception as e:
+        print(f"Error searching menu items: {e}")
+        raise HTTPException(status_code=500, detail="Failed to search menu items")
+
 async def get_menu_items_by_category(category_name: str) -> List[MenuModel]:
+    """Retrieve menu items by category name, served from the menu cache while fresh."""
+    return await menu_cache.get_or_load(("category", category_name), lambda: _load_menu_items_by_category(category_name))
+
+async def _load_menu_items_by_category(category_name: str) -> List[MenuModel]:
     """Retrieve menu items by category name."""
     try:
-        items = await dynamodb.scan()
-        menu_items = []
-        for item in items:
-            if item.get("Home", {}).get("S") == "Menu" and item.get("category_name", {}).get("S") == category_name:
-                menu_data = {
-                    "id": item.get("1", {}).get("S", ""),
-                    "name": item.get("name", {}).get("S", ""),
-                    "description": item.get("description", {}).get("S", ""),
-                    "category_name": item.get("category_name", {}).get("S", ""),
-                    "price": float(item.get("price", {}).get("N", "0")),
-                    "parcel_price": float(item.get("parcel_price", {}).get("N", "0")) if "N" in item.get("parcel_price", {}) else None,
-                    "image_url": item.get("image_url", {}).get("S", ""),
-                    "is_available": item.get("is_available", {}).get("BOOL", True),
-                    "is_veg": item.get("is_veg", {}).get("BOOL", True),
-                    "created_at": item.get("created_at", {}).get("S", ""),
-                    "updated_at": item.get("updated_at", {}).get("S", ""),
-                }
-                menu_items.append(MenuModel(**menu_data))
-        return menu_items
+        items = await dynamodb.query_partition(
+            "Menu",
+            filter_expression="#category_name = :category_name",
+            expression_attribute_names={"#category_name": "category_name"},
+            expression_attribute_values={":category_name": {"S": category_name}}
+        )
+        return menu_codec.decode_many(items)
     except Exception as e:
         print(f"Error retrieving menu items by category: {e}")
         raise HTTPException(status_code=500, detail="Failed to retrieve menu items by category")
@@ -137,14 +132,21 @@ async def get_menu_items_by_category(category_name: str) -> List[MenuModel]:
 async def update_menu_item(menu_id: str, menu_data: dict, image: Optional[UploadFile] = None) -> Optional[MenuModel]:
     """Update a menu item."""
     try:
-        if image:
-            menu_data["image_url"] = await save_image(image)
-
         key = {
             "Home": {"S": "Menu"},  # Partition key
             "1": {"S": menu_id}      # Sort key
         }
 
+        old_image_url = None
+        if image:
+            existing = await dynamodb.get_item(key)
+            if not existing:
+                raise HTTPException(status_code=404, detail="Menu item not found")
+            old_image_url = existing.get("image_url", {}).get("S")
+            stored = await store_image(image)
+            menu_data["image_url"] = stored.url
+            menu_data["image_variants"] = stored.variants
+
         update_expression = "SET "
         expression_attribute_names = {}
         expression_attribute_values = {}
@@ -157,26 +159,37 @@ async def update_menu_item(menu_id: str, menu_data: dict, image: Optional[Upload
         for field, value in menu_data.items():
             if value is not None:  # Only update fields that are provided
                 expression_attribute_names[f"#{field}"] = field
-                
-                # Handle different data types
-                if field in ['price', 'parcel_price']:
-                    expression_attribute_values[f":{field}"] = {"N": str(value)}
-                elif field in ['is_available', 'is_veg']:
-                    expression_attribute_values[f":{field}"] = {"BOOL": value}
-                else:
-                    expression_attribute_values[f":{field}"] = {"S": str(value)}
-                
+                expression_attribute_values[f":{field}"] = menu_codec.attribute(field, value)
                 update_expression += f"#{field} = :{field}, "
 
         update_expression = update_expression.rstrip(", ")
 
-        await dynamodb.update_item(
-            key=key,
-            update_expression=update_expression,
-            expression_attribute_names=expression_attribute_names,
-            expression_attribute_values=expression_attribute_values
-        )
-        return await get_menu_item(menu_id)
+        # Only update an existing item; otherwise the update would create a stub
+        expression_attribute_names["#pk"] = "Home"
+        try:
+            response = await dynamodb.update_item(
+                key=key,
+                update_expression=update_expression,
+                expression_attribute_names=expression_attribute_names,
+                expression_attribute_values=expression_attribute_values,
+                condition_expression="attribute_exists(#pk)",
+                return_values="ALL_NEW"
+            )
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") != "ConditionalCheckFailedException":
+                raise
+            if image:
+                # Nothing will reference the image stored for this update
+                await release_image(stored.url)
+            raise HTTPException(status_code=404, detail="Menu item not found")
+        await cache_bus.publish("menu")
+        if old_image_url:
+            await release_image(old_image_url)
+        menu_item = menu_codec.decode(response["Attributes"])
+        menu_search.upsert(menu_item)
+        return menu_item
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error updating menu item: {e}")
         raise HTTPException(status_code=500, detail="Failed to update menu item")
@@ -188,8 +201,175 @@ async def delete_menu_item(menu_id: str) -> bool:
             "Home": {"S": "Menu"},  # Partition key
             "1": {"S": menu_id}      # Sort key
         }
-        response = await dynamodb.delete_item(key)
+        response = await dynamodb.delete_item(key, return_values="ALL_OLD")
+        await cache_bus.publish("menu")
+        menu_search.remove(menu_id)
+        deleted = response.get("Attributes", {})
+        await release_image(deleted.get("image_url", {}).get("S"))
         return True
     except Exception as e:
         print(f"Error deleting menu item: {e}")
-        raise HTTPException(status_code=500, detail="Failed to delete menu item")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Failed to delete menu item")
+
+# Fields each bulk action must provide
+_BULK_REQUIRED_FIELDS = {
+    "create": ("name", "description", "category_name", "price"),
+    "update": ("id",),
+    "availability": ("id", "is_available"),
+}
+
+def parse_bulk_rows(body: bytes, content_type: str) -> List[dict]:
+    """The rows of a bulk request: a JSON array of operations, or CSV with a header row."""
+    try:
+        if content_type.split(";")[0].strip().lower() == "text/csv":
+            reader = csv.DictReader(io.StringIO(body.decode("utf-8-sig")))
+            # Empty cells leave a field unset
+            return [
+                {field.strip(): value for field, value in row.items() if field and value not in (None, "")}
+                for row in reader
+            ]
+        rows = orjson.loads(body)
+    except (ValueError, csv.Error) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid bulk payload: {e}")
+    if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+        raise HTTPException(status_code=400, detail="Invalid bulk payload: expected a JSON array of objects")
+    return rows
+
+def _bulk_error(row: int, error: ValidationError) -> dict:
+    messages = [f"{'.'.join(str(part) for part in issue['loc']) or 'row'}: {issue['msg']}" for issue in error.errors()]
+    return {"row": row, "error": "; ".join(messages)}
+
+def _bulk_update(item: dict, changes: dict, now: str) -> dict:
+    """A transactional update that sets `changes` only if `item` is still as it was read."""
+    names = {"#pk": "Home", "#updated_at": "updated_at"}
+    values = {":updated_at": {"S": now}}
+    assignments = ["#updated_at = :updated_at"]
+    for field, value in changes.items():
+        names[f"#{field}"] = field
+        values[f":{field}"] = menu_codec.attribute(field, value)
+        assignments.append(f"#{field} = :{field}")
+    if "updated_at" in item:
+        values[":seen_updated_at"] = item["updated_at"]
+        condition = "#updated_at = :seen_updated_at"
+    else:
+        # Items written before timestamps were kept only count as unchanged while they still have none
+        condition = "attribute_exists(#pk) AND attribute_not_exists(#updated_at)"
+    return {"Update": {
+        "Key": {"Home": item["Home"], "1": item["1"]},
+        "UpdateExpression": "SET " + ", ".join(assignments),
+        "ConditionExpression": condition,
+        "ExpressionAttributeNames": names,
+        "ExpressionAttributeValues": values,
+    }}
+
+async def bulk_write_menu_items(rows: List[dict]) -> dict:
+    """Create, update and toggle the availability of many menu items at once.
+
+    Every row is validated, and every targeted item read in one batch, before
+    anything is written; any problem fails the whole request with a 422 that
+    lists each bad row (numbered from 1).
+
+    Update and availability rows are then written as transactions of up to
+    100 conditional updates that set only the changed fields, and only if
+    the item is unchanged since it was read. If another write got there
+    first, the request fails with a 409 that names the changed rows and
+    every row that was not applied; rows it does not list were written.
+    New items are put in batches once every update has gone through. The
+    menu caches are invalidated once for the batch.
+    """
+    if not rows:
+        raise HTTPException(status_code=422, detail="No operations given")
+    if len(rows) > MENU_BULK_MAX_ROWS:
+        raise HTTPException(status_code=422, detail=f"At most {MENU_BULK_MAX_ROWS} operations per request")
+
+    errors = []
+    operations = []
+    for row, data in enumerate(rows, start=1):
+        try:
+            operation = MenuBulkOperation.model_validate(data)
+        except ValidationError as e:
+            errors.append(_bulk_error(row, e))
+            continue
+        changes = operation.model_dump(exclude={"action", "id"}, exclude_none=True)
+        missing = [field for field in _BULK_REQUIRED_FIELDS[operation.action] if getattr(operation, field) is None]
+        if missing:
+            errors.append({"row": row, "error": f"Missing {', '.join(missing)}"})
+        elif operation.action == "create" and operation.id:
+            errors.append({"row": row, "error": "New menu items get a generated id"})
+        elif operation.action == "update" and not changes:
+            errors.append({"row": row, "error": "Nothing to update"})
+        elif operation.action == "availability" and changes.keys() != {"is_available"}:
+            errors.append({"row": row, "error": "Availability rows only set is_available"})
+        else:
+            operations.append((row, operation, changes))
+
+    target_ids = {operation.id for _, operation, _ in operations if operation.action != "create"}
+    try:
+        existing = {
+            item["1"]["S"]: item
+            for item in await dynamodb.batch_get([{"Home": {"S": "Menu"}, "1": {"S": menu_id}} for menu_id in target_ids])
+        }
+    except Exception as e:
+        print(f"Error reading menu items for bulk write: {e}")
+        raise HTTPException(status_code=500, detail="Failed to read menu items")
+    seen = set()
+    for row, operation, _ in operations:
+        if operation.action == "create":
+            continue
+        if operation.id not in existing:
+            errors.append({"row": row, "error": f"Menu item {operation.id} not found"})
+        elif operation.id in seen:
+            errors.append({"row": row, "error": f"Menu item {operation.id} appears in more than one row"})
+        seen.add(operation.id)
+    if errors:
+        raise HTTPException(status_code=422, detail=sorted(errors, key=lambda error: error["row"]))
+
+    now = datetime.utcnow().isoformat()
+    created_items = []
+    updates = []
+    for row, operation, changes in operations:
+        if operation.action == "create":
+            created_items.append(menu_codec.encode({**changes, "id": str(uuid.uuid4()), "created_at": now, "updated_at": now}))
+        else:
+            updates.append((row, existing[operation.id], changes))
+    update_chunks = [updates[start:start + TRANSACT_WRITE_MAX_ITEMS] for start in range(0, len(updates), TRANSACT_WRITE_MAX_ITEMS)]
+
+    try:
+        for index, chunk in enumerate(update_chunks):
+            try:
+                await dynamodb.transact_write([_bulk_update(item, changes, now) for _, item, changes in chunk])
+            except ClientError as e:
+                if e.response.get("Error", {}).get("Code") != "TransactionCanceledException":
+                    raise
+                # The chunk was cancelled as a whole, and nothing after it was attempted
+                reasons = e.response.get("CancellationReasons", [])
+                conflicts = []
+                for position, (row, item, _) in enumerate(chunk):
+                    changed = position < len(reasons) and reasons[position].get("Code") == "ConditionalCheckFailed"
+                    error = f"Menu item {item['1']['S']} changed since it was read" if changed else "Not applied"
+                    conflicts.append({"row": row, "error": error})
+                conflicts += [{"row": row, "error": "Not applied"} for later in update_chunks[index + 1:] for row, _, _ in later]
+                conflicts += [{"row": row, "error": "Not applied"} for row, operation, _ in operations if operation.action == "create"]
+                raise HTTPException(status_code=409, detail=sorted(conflicts, key=lambda conflict: conflict["row"]))
+        await dynamodb.batch_write(puts=created_items)
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error writing menu items in bulk: {e}")
+        raise HTTPException(status_code=500, detail="Failed to write menu items")
+    finally:
+        # Once for the whole batch, and even after a failure, since some chunks may have landed
+        await cache_bus.publish("menu")
+
+    items = list(created_items)
+    for _, item, changes in updates:
+        items.append({
+            **item,
+            **{field: menu_codec.attribute(field, value) for field, value in changes.items()},
+            "updated_at": {"S": now},
+        })
+    menu_items = menu_codec.decode_many(items)
+    for menu_item in menu_items:
+        menu_search.upsert(menu_item)
+    created = sum(1 for _, operation, _ in operations if operation.action == "create")
+    return {"created": created, "updated": len(items) - created, "items": menu_items}
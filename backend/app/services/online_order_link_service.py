@@ -1,6 +1,8 @@
 import uuid
+from app.core.cache import cache_bus
 from app.core.database import dynamodb
 from app.schemas.online_order_link import OnlineOrderLinkCreate, OnlineOrderLinkUpdate
+from app.services.image_store_service import release_image
 from fastapi import HTTPException
 
 class OnlineOrderLinkService:
@@ -9,18 +11,17 @@ class OnlineOrderLinkService:
     async def get_all_links():
         """Retrieve all online order links."""
         try:
-            items = await dynamodb.scan()
+            items = await dynamodb.query_partition("OnlineOrderLinks")
             links = []
             for item in items:
-                if item.get("Home", {}).get("S") == "OnlineOrderLinks":  # Filter by partition key
-                    link_data = {
-                        "id": item.get("1", {}).get("S", ""),  # Use the sort key as the id
-                        "platform": item.get("platform", {}).get("S", ""),
-                        "url": item.get("url", {}).get("S", ""),
-                        "logo": item.get("logo", {}).get("S", ""),
-                        "branch_id": item.get("branch_id", {}).get("S", "")
-                    }
-                    links.append(link_data)
+                link_data = {
+                    "id": item.get("1", {}).get("S", ""),  # Use the sort key as the id
+                    "platform": item.get("platform", {}).get("S", ""),
+                    "url": item.get("url", {}).get("S", ""),
+                    "logo": item.get("logo", {}).get("S", ""),
+                    "branch_id": item.get("branch_id", {}).get("S", "")
+                }
+                links.append(link_data)
             return links
         except Exception as e:
             print(f"Error retrieving links: {e}")
@@ -44,6 +45,7 @@ class OnlineOrderLinkService:
             }
 
             await dynamodb.put_item(item)
+            await cache_bus.publish("online_order_links")
             return link_id
         except Exception as e:
             print(f"Error creating link: {e}")
@@ -94,12 +96,18 @@ class OnlineOrderLinkService:
 
             update_expression = update_expression.rstrip(", ")
 
-            await dynamodb.update_item(
+            # The previous values of the changed fields come back with the write, old logo included
+            response = await dynamodb.update_item(
                 key=key,
                 update_expression=update_expression,
                 expression_attribute_names=expression_attribute_names,
-                expression_attribute_values=expression_attribute_values
+                expression_attribute_values=expression_attribute_values,
+                return_values="UPDATED_OLD"
             )
+            await cache_bus.publish("online_order_links")
+            old_logo = response.get("Attributes", {}).get("logo", {}).get("S")
+            if update_data.logo and old_logo:
+                await release_image(old_logo)
         except Exception as e:
             print(f"Error updating link: {e}")
             raise HTTPException(status_code=500, detail="Failed to update link")
@@ -112,7 +120,10 @@ class OnlineOrderLinkService:
                 "Home": {"S": "OnlineOrderLinks"},  # Partition key
                 "1": {"S": link_id}                # Sort key
             }
-            await dynamodb.delete_item(key)
+            response = await dynamodb.delete_item(key, return_values="ALL_OLD")
+            await cache_bus.publish("online_order_links")
+            deleted = response.get("Attributes", {})
+            await release_image(deleted.get("logo", {}).get("S"))
         except Exception as e:
             print(f"Error deleting link: {e}")
             raise HTTPException(status_code=500, detail="Failed to delete link")
\ No newline at end of file
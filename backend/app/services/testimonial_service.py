@@ -1,10 +1,15 @@
+from app.core.cache import cache_bus
+from app.core.codec import ItemCodec
 from app.core.database import dynamodb
+from app.core.pagination import Page, PageParams, fetch_page
 from app.models.testimonial import Testimonial
 from app.utils.email import send_email
 from datetime import datetime
 from fastapi import HTTPException
 import uuid
 
+testimonial_codec = ItemCodec(Testimonial, "Testimonials")
+
 async def create_testimonial(testimonial_data: dict):
     """Create a new testimonial."""
     try:
@@ -31,6 +36,7 @@ async def create_testimonial(testimonial_data: dict):
             item["image"] = {"S": testimonial_data["image"]}
 
         await dynamodb.put_item(item)
+        await cache_bus.publish("testimonials")
 
         # Send confirmation email to the user
         send_email(
@@ -54,43 +60,22 @@ async def get_testimonial(testimonial_id: str):
         }
         item = await dynamodb.get_item(key)
         if item:
-            testimonial_data = {
-                "id": item.get("1", {}).get("S", ""),
-                "name": item.get("name", {}).get("S", ""),
-                "email": item.get("email", {}).get("S", ""),
-                "description": item.get("description", {}).get("S", ""),
-                "rating": int(item.get("rating", {}).get("N", "0")),
-                "status": item.get("status", {}).get("S", ""),
-                "created_at": item.get("created_at", {}).get("S", "")
-            }
-            if "image" in item:
-                testimonial_data["image"] = item.get("image", {}).get("S", "")
-            return testimonial_data
+            return _testimonial_from_item(item)
         return None
     except Exception as e:
         print(f"Error retrieving testimonial: {e}")
         raise HTTPException(status_code=500, detail="Failed to retrieve testimonial")
 
-async def get_all_testimonials():
-    """Retrieve all testimonials."""
+def _testimonial_from_item(item: dict) -> dict:
+    """Build a testimonial dict from a raw DynamoDB item."""
+    return testimonial_codec.fields(item)
+
+async def get_testimonials_page(params: PageParams) -> Page[dict]:
+    """Retrieve one page of testimonials."""
     try:
-        items = await dynamodb.scan()
-        testimonials = []
-        for item in items:
-            if item.get("Home", {}).get("S") == "Testimonials":  # Filter by partition key
-                testimonial_data = {
-                    "id": item.get("1", {}).get("S", ""),
-                    "name": item.get("name", {}).get("S", ""),
-                    "email": item.get("email", {}).get("S", ""),
-                    "description": item.get("description", {}).get("S", ""),
-                    "rating": int(item.get("rating", {}).get("N", "0")),
-                    "status": item.get("status", {}).get("S", ""),
-                    "created_at": item.get("created_at", {}).get("S", "")
-                }
-                if "image" in item:
-                    testimonial_data["image"] = item.get("image", {}).get("S", "")
-                testimonials.append(testimonial_data)
-        return testimonials
+        return await fetch_page("Testimonials", params, _testimonial_from_item)
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error retrieving testimonials: {e}")
         raise HTTPException(status_code=500, detail="Failed to retrieve testimonials")
@@ -113,6 +98,7 @@ async def update_testimonial_status(testimonial_id: str, status: str):
             expression_attribute_names=expression_attribute_names,
             expression_attribute_values=expression_attribute_values
         )
+        await cache_bus.publish("testimonials")
     except Exception as e:
         print(f"Error updating testimonial status: {e}")
         raise HTTPException(status_code=500, detail="Failed to update testimonial status")
@@ -125,6 +111,7 @@ async def delete_testimonial(testimonial_id: str):
             "1": {"S": testimonial_id}
         }
         await dynamodb.delete_item(key)
+        await cache_bus.publish("testimonials")
     except Exception as e:
         print(f"Error deleting testimonial: {e}")
         raise HTTPException(status_code=500, detail="Failed to delete testimonial")
\ No newline at end of file
@@ -1,21 +1,113 @@
 # banjos_restaurant\app\services\user_service.py
 import uuid
 from datetime import datetime, timedelta
-from typing import Optional, List, Dict, Any
+from typing import Optional, Dict, Any
 from fastapi import HTTPException, status, Depends
-from passlib.context import CryptContext
+from botocore.exceptions import ClientError
+from app.core.codec import ItemCodec
 from app.core.database import dynamodb
+from app.core.pagination import Page, PageParams, fetch_page
+from app.core.passwords import password_hasher
 from app.models.user import UserModel, UserRole, UserCreate, UserUpdate
 from app.core.auth import create_access_token, create_refresh_token, create_csrf_token
 from app.core.config import ACCESS_TOKEN_EXPIRE_MINUTES, REFRESH_TOKEN_EXPIRE_DAYS
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Users <-> DynamoDB items; the password hash and timestamps stay out of the model
+user_codec = ItemCodec(UserModel, "Users")
+_user_from_item = user_codec.decode
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+async def get_password_hash(password: str) -> str:
+    return await password_hasher.hash(password)
 
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+# Uniqueness markers: one item per email / mobile number pointing at the owning user,
+# written in the same transaction as the user so concurrent registrations cannot race.
+EMAIL_MARKER_PARTITION = "UserEmails"
+MOBILE_MARKER_PARTITION = "UserMobiles"
+MARKER_NOT_EXISTS = "attribute_not_exists(#pk)"
+MARKER_BACKFILL_KEY = {"Home": {"S": "IndexBackfills"}, "1": {"S": "UserLookupMarkers"}}
+
+def _email_marker_key(email: str) -> Dict[str, Any]:
+    return {"Home": {"S": EMAIL_MARKER_PARTITION}, "1": {"S": email.strip().lower()}}
+
+def _mobile_marker_key(mobile_number: str) -> Dict[str, Any]:
+    return {"Home": {"S": MOBILE_MARKER_PARTITION}, "1": {"S": mobile_number.strip()}}
+
+def _put_marker(marker_key: Dict[str, Any], user_id: str) -> Dict[str, Any]:
+    return {
+        "Put": {
+            "Item": {**marker_key, "user_id": {"S": user_id}},
+            "ConditionExpression": MARKER_NOT_EXISTS,
+            "ExpressionAttributeNames": {"#pk": "Home"}
+        }
+    }
+
+def _delete_marker(marker_key: Dict[str, Any], user_id: str) -> Dict[str, Any]:
+    return {
+        "Delete": {
+            "Key": marker_key,
+            "ConditionExpression": "attribute_not_exists(user_id) OR user_id = :uid",
+            "ExpressionAttributeValues": {":uid": {"S": user_id}}
+        }
+    }
+
+def _raise_if_conflict(error: ClientError, conflicts: Dict[int, str]) -> None:
+    """Translate a cancelled marker transaction into a 400 naming the taken field."""
+    if error.response.get("Error", {}).get("Code") != "TransactionCanceledException":
+        return
+    reasons = error.response.get("CancellationReasons", [])
+    for index, detail in conflicts.items():
+        if index < len(reasons) and reasons[index].get("Code") == "ConditionalCheckFailed":
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
+async def _put_user_with_markers(item: Dict[str, Any]) -> None:
+    """Insert a user item together with its email and mobile-number markers."""
+    user_id = item["1"]["S"]
+    try:
+        await dynamodb.transact_write([
+            {"Put": {"Item": item}},
+            _put_marker(_email_marker_key(item["email"]["S"]), user_id),
+            _put_marker(_mobile_marker_key(item["mobile_number"]["S"]), user_id),
+        ])
+    except ClientError as e:
+        _raise_if_conflict(e, {
+            1: "Email already registered",
+            2: "Mobile number already registered",
+        })
+        raise
+
+async def _get_user_item_by_email(email: str) -> Optional[Dict[str, Any]]:
+    """Resolve a user item through its email marker: two key lookups, no scan."""
+    marker = await dynamodb.get_item(_email_marker_key(email))
+    if not marker:
+        return None
+    return await dynamodb.get_item({
+        "Home": {"S": "Users"},
+        "1": {"S": marker.get("user_id", {}).get("S", "")}
+    })
+
+async def ensure_user_lookup_markers() -> int:
+    """Backfill email/mobile markers for users created before markers existed; runs once per table."""
+    if await dynamodb.get_item(MARKER_BACKFILL_KEY):
+        return 0
+    created = 0
+    for item in await dynamodb.query_partition("Users"):
+        user_id = item.get("1", {}).get("S", "")
+        for marker_key in (
+            _email_marker_key(item.get("email", {}).get("S", "")),
+            _mobile_marker_key(item.get("mobile_number", {}).get("S", "")),
+        ):
+            try:
+                await dynamodb.put_item(
+                    {**marker_key, "user_id": {"S": user_id}},
+                    condition_expression=MARKER_NOT_EXISTS,
+                    expression_attribute_names={"#pk": "Home"}
+                )
+                created += 1
+            except ClientError as e:
+                if e.response.get("Error", {}).get("Code") != "ConditionalCheckFailedException":
+                    raise
+    await dynamodb.put_item({**MARKER_BACKFILL_KEY, "completed_at": {"S": datetime.utcnow().isoformat()}})
+    return created
 
 async def create_user(user_data: Dict[str, Any], current_user: UserModel) -> UserModel:
     if current_user.role not in [UserRole.ADMIN, UserRole.SUPERADMIN]:
@@ -25,23 +117,8 @@ async def create_user(user_data: Dict[str, Any], current_user: UserModel) -> Use
         )
 
     try:
-        # Check if email or mobile number already exists
-        items = await dynamodb.scan()
-        for item in items:
-            if item.get("Home", {}).get("S") == "Users":
-                if item.get("email", {}).get("S") == user_data["email"]:
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail="Email already registered"
-                    )
-                if item.get("mobile_number", {}).get("S") == user_data["mobile_number"]:
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail="Mobile number already registered"
-                    )
-
         user_id = str(uuid.uuid4())
-        hashed_password = get_password_hash(user_data["password"])
+        hashed_password = await get_password_hash(user_data["password"])
 
         item = {
             "Home": {"S": "Users"},
@@ -56,7 +133,8 @@ async def create_user(user_data: Dict[str, Any], current_user: UserModel) -> Use
             "updated_at": {"S": datetime.utcnow().isoformat()}
         }
 
-        await dynamodb.put_item(item)
+        # Fails with a 400 if the email or mobile number is already taken
+        await _put_user_with_markers(item)
         
         return UserModel(
             id=user_id,
@@ -67,34 +145,44 @@ async def create_user(user_data: Dict[str, Any], current_user: UserModel) -> Use
             disabled=False
         )
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error creating user: {str(e)}"
         )
 
+async def _rehash_password(user_id: str, new_hash: str) -> None:
+    """Store a hash re-computed at login after the bcrypt cost changed."""
+    try:
+        await dynamodb.update_item(
+            key={"Home": {"S": "Users"}, "1": {"S": user_id}},
+            update_expression="SET #pw = :pw",
+            expression_attribute_names={"#pw": "password"},
+            expression_attribute_values={":pw": {"S": new_hash}}
+        )
+    except Exception as e:
+        # The old hash still verifies, so a failed rehash must not fail the login
+        print(f"Error rehashing password: {e}")
+
 async def authenticate_user(email: str, password: str) -> Optional[UserModel]:
     try:
-        items = await dynamodb.scan()
-        for item in items:
-            if item.get("Home", {}).get("S") == "Users":
-                if item.get("email", {}).get("S") == email:
-                    user_data = {
-                        "id": item.get("1", {}).get("S", ""),
-                        "username": item.get("username", {}).get("S", ""),
-                        "email": item.get("email", {}).get("S", ""),
-                        "mobile_number": item.get("mobile_number", {}).get("S", ""),
-                        "password": item.get("password", {}).get("S", ""),
-                        "role": item.get("role", {}).get("S", ""),
-                        "disabled": item.get("disabled", {}).get("BOOL", False)
-                    }
-                    if verify_password(password, user_data["password"]):
-                        return UserModel(**user_data)
-                    break
+        item = await _get_user_item_by_email(email)
+        if item:
+            password_hash = item.get("password", {}).get("S", "")
+            verified, new_hash = await password_hasher.verify_and_update(password, password_hash)
+            if verified:
+                user = _user_from_item(item)
+                if new_hash:
+                    await _rehash_password(user.id, new_hash)
+                return user
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password"
         )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -111,14 +199,20 @@ async def get_user_by_id(user_id: str) -> Optional[UserModel]:
         if not item:
             return None
         
-        return UserModel(
-            id=item.get("1", {}).get("S", ""),
-            username=item.get("username", {}).get("S", ""),
-            email=item.get("email", {}).get("S", ""),
-            mobile_number=item.get("mobile_number", {}).get("S", ""),
-            role=item.get("role", {}).get("S", ""),
-            disabled=item.get("disabled", {}).get("BOOL", False)
+        return _user_from_item(item)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error getting user: {str(e)}"
         )
+
+async def get_user_by_email(email: str) -> Optional[UserModel]:
+    try:
+        item = await _get_user_item_by_email(email)
+        if not item:
+            return None
+
+        return _user_from_item(item)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -147,6 +241,9 @@ async def update_user(
         update_expression = "SET "
         expression_attribute_names = {}
         expression_attribute_values = {}
+        # Marker swaps committed in the same transaction as the user update
+        marker_operations = []
+        marker_conflicts = {}
 
         if "username" in update_data:
             update_expression += "#un = :un, "
@@ -154,33 +251,25 @@ async def update_user(
             expression_attribute_values[":un"] = {"S": update_data["username"]}
 
         if "email" in update_data:
-            # Check if new email is already taken
-            items = await dynamodb.scan()
-            for item in items:
-                if item.get("Home", {}).get("S") == "Users":
-                    if item.get("email", {}).get("S") == update_data["email"] and item.get("1", {}).get("S") != user_id:
-                        raise HTTPException(
-                            status_code=status.HTTP_400_BAD_REQUEST,
-                            detail="Email already in use by another user"
-                        )
+            # Claim the new email marker; the transaction fails if another user holds it
+            if _email_marker_key(update_data["email"]) != _email_marker_key(user.email):
+                marker_conflicts[len(marker_operations)] = "Email already in use by another user"
+                marker_operations.append(_put_marker(_email_marker_key(update_data["email"]), user_id))
+                marker_operations.append(_delete_marker(_email_marker_key(user.email), user_id))
             update_expression += "email = :em, "
             expression_attribute_values[":em"] = {"S": update_data["email"]}
 
         if "mobile_number" in update_data:
-            # Check if new mobile number is already taken
-            items = await dynamodb.scan()
-            for item in items:
-                if item.get("Home", {}).get("S") == "Users":
-                    if item.get("mobile_number", {}).get("S") == update_data["mobile_number"] and item.get("1", {}).get("S") != user_id:
-                        raise HTTPException(
-                            status_code=status.HTTP_400_BAD_REQUEST,
-                            detail="Mobile number already in use by another user"
-                        )
+            # Claim the new mobile number marker; the transaction fails if another user holds it
+            if _mobile_marker_key(update_data["mobile_number"]) != _mobile_marker_key(user.mobile_number):
+                marker_conflicts[len(marker_operations)] = "Mobile number already in use by another user"
+                marker_operations.append(_put_marker(_mobile_marker_key(update_data["mobile_number"]), user_id))
+                marker_operations.append(_delete_marker(_mobile_marker_key(user.mobile_number), user_id))
             update_expression += "mobile_number = :mn, "
             expression_attribute_values[":mn"] = {"S": update_data["mobile_number"]}
 
         if "password" in update_data:
-            hashed_password = get_password_hash(update_data["password"])
+            hashed_password = await get_password_hash(update_data["password"])
             update_expression += "password = :pw, "
             expression_attribute_values[":pw"] = {"S": hashed_password}
 
@@ -192,14 +281,34 @@ async def update_user(
             "1": {"S": user_id}
         }
 
-        await dynamodb.update_item(
+        if marker_operations:
+            update_operation = {
+                "Update": {
+                    "Key": key,
+                    "UpdateExpression": update_expression,
+                    "ExpressionAttributeValues": expression_attribute_values
+                }
+            }
+            if expression_attribute_names:
+                update_operation["Update"]["ExpressionAttributeNames"] = expression_attribute_names
+            try:
+                await dynamodb.transact_write(marker_operations + [update_operation])
+            except ClientError as e:
+                _raise_if_conflict(e, marker_conflicts)
+                raise
+            # Transactions return no attributes; the user read above plus these changes is the new state
+            return user.model_copy(update={
+                field: update_data[field] for field in ("username", "email", "mobile_number") if field in update_data
+            })
+
+        response = await dynamodb.update_item(
             key=key,
             update_expression=update_expression,
             expression_attribute_names=expression_attribute_names,
-            expression_attribute_values=expression_attribute_values
+            expression_attribute_values=expression_attribute_values,
+            return_values="ALL_NEW"
         )
-
-        return await get_user_by_id(user_id)
+        return _user_from_item(response["Attributes"])
     except HTTPException:
         raise
     except Exception as e:
@@ -227,7 +336,17 @@ async def delete_user(user_id: str, current_user: UserModel) -> bool:
                 detail="User not found"
             )
 
-        await dynamodb.delete_item(key)
+        try:
+            await dynamodb.transact_write([
+                {"Delete": {"Key": key}},
+                _delete_marker(_email_marker_key(item.get("email", {}).get("S", "")), user_id),
+                _delete_marker(_mobile_marker_key(item.get("mobile_number", {}).get("S", "")), user_id),
+            ])
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") != "TransactionCanceledException":
+                raise
+            # A marker is owned by another user (legacy duplicate); leave it and drop the user only
+            await dynamodb.delete_item(key)
         return True
     except HTTPException:
         raise
@@ -239,11 +358,8 @@ async def delete_user(user_id: str, current_user: UserModel) -> bool:
 
 async def is_database_empty() -> bool:
     try:
-        items = await dynamodb.scan()
-        for item in items:
-            if item.get("Home", {}).get("S") == "Users":
-                return False
-        return True
+        items = await dynamodb.query_partition("Users", limit=1)
+        return not items
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -259,7 +375,7 @@ async def bootstrap_admin(user_data: Dict[str, Any]) -> UserModel:
 
     try:
         user_id = str(uuid.uuid4())
-        hashed_password = get_password_hash(user_data["password"])
+        hashed_password = await get_password_hash(user_data["password"])
 
         item = {
             "Home": {"S": "Users"},
@@ -274,7 +390,7 @@ async def bootstrap_admin(user_data: Dict[str, Any]) -> UserModel:
             "updated_at": {"S": datetime.utcnow().isoformat()}
         }
 
-        await dynamodb.put_item(item)
+        await _put_user_with_markers(item)
         
         return UserModel(
             id=user_id,
@@ -290,23 +406,12 @@ async def bootstrap_admin(user_data: Dict[str, Any]) -> UserModel:
             detail=f"Error bootstrapping admin: {str(e)}"
         )
 
-async def get_all_users_from_db() -> List[UserModel]:
+
+async def get_users_page(params: PageParams) -> Page[UserModel]:
     try:
-        items = await dynamodb.scan()
-        users = []
-        
-        for item in items:
-            if item.get("Home", {}).get("S") == "Users":
-                users.append(UserModel(
-                    id=item.get("1", {}).get("S", ""),
-                    username=item.get("username", {}).get("S", ""),
-                    email=item.get("email", {}).get("S", ""),
-                    mobile_number=item.get("mobile_number", {}).get("S", ""),
-                    role=item.get("role", {}).get("S", ""),
-                    disabled=item.get("disabled", {}).get("BOOL", False)
-                ))
-        
-        return users
+        return await fetch_page("Users", params, _user_from_item)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
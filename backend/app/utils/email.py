@@ -1,27 +1,239 @@
 # banjos_restaurant\app\utils\email.py
-from jinja2 import Environment, FileSystemLoader
+from jinja2 import Environment, FileSystemLoader, FileSystemBytecodeCache
 import os
+import asyncio
+import random
 import smtplib
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Iterable
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from dotenv import load_dotenv
+from app.core.config import (
+    IS_PRODUCTION,
+    EMAIL_TEMPLATE_CACHE_DIR,
+    EMAIL_SMTP_HOST,
+    EMAIL_SMTP_PORT,
+    EMAIL_SMTP_STARTTLS,
+    EMAIL_SMTP_AUTH,
+    EMAIL_SMTP_TIMEOUT,
+    EMAIL_OUTBOX_WORKERS,
+    EMAIL_MAX_ATTEMPTS,
+    EMAIL_RETRY_BASE_SECONDS,
+    EMAIL_OUTBOX_HISTORY,
+)
 
 load_dotenv()
 
-env = Environment(loader=FileSystemLoader('app/templates/emails'))
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "templates", "emails")
 
-def send_email(recipient: str, subject: str, template_name: str, context: dict = None) -> None:
-    """Send email using a template with given context"""
+if EMAIL_TEMPLATE_CACHE_DIR:
+    os.makedirs(EMAIL_TEMPLATE_CACHE_DIR, exist_ok=True)
+
+# Compiled templates are kept in memory and their bytecode on disk; production skips
+# the per-render mtime check since templates only change on deploy.
+env = Environment(
+    loader=FileSystemLoader(TEMPLATES_DIR),
+    bytecode_cache=FileSystemBytecodeCache(EMAIL_TEMPLATE_CACHE_DIR),
+    auto_reload=not IS_PRODUCTION,
+)
+
+def precompile_templates() -> int:
+    """Compile every email template up front so the first send pays nothing."""
+    names = env.list_templates(extensions=["html"])
+    for name in names:
+        env.get_template(name)
+    return len(names)
+
+def render_template(template_name: str, context: dict = None) -> str:
+    return env.get_template(template_name).render(**(context or {}))
+
+def render_batch(template_name: str, contexts: Iterable[dict]) -> List[str]:
+    """Render one template for many contexts, resolving the template once."""
+    template = env.get_template(template_name)
+    return [template.render(**(context or {})) for context in contexts]
+
+class SMTPConnection:
+    """A reusable SMTP session that reconnects lazily when the server drops it."""
+
+    def __init__(self):
+        self._server: Optional[smtplib.SMTP] = None
+
+    def _connect(self, sender: str, password: Optional[str]) -> smtplib.SMTP:
+        server = smtplib.SMTP(EMAIL_SMTP_HOST, EMAIL_SMTP_PORT, timeout=EMAIL_SMTP_TIMEOUT)
+        if EMAIL_SMTP_STARTTLS:
+            server.starttls()
+        if EMAIL_SMTP_AUTH:
+            server.login(sender, password)
+        return server
+
+    def send(self, sender: str, password: Optional[str], recipient: str, message: str) -> None:
+        if self._server is None:
+            self._server = self._connect(sender, password)
+        try:
+            self._server.sendmail(sender, recipient, message)
+        except smtplib.SMTPServerDisconnected:
+            # Idle sessions get dropped by the server; reconnect once and resend
+            self._server = self._connect(sender, password)
+            self._server.sendmail(sender, recipient, message)
+
+    def close(self) -> None:
+        if self._server is None:
+            return
+        try:
+            self._server.quit()
+        except Exception:
+            pass
+        self._server = None
+
+class EmailOutbox:
+    """Queue outgoing mail and deliver it from background workers.
+
+    Each worker keeps its own SMTP session open between messages. Failed
+    deliveries are retried with exponential backoff and jitter; the state of
+    recent messages is kept in a bounded history for inspection.
+    """
+
+    def __init__(self, workers: int, max_attempts: int, retry_base_seconds: float, history: int):
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self.history = history
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._retries: set = set()
+        self._messages: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._counts = {"queued": 0, "sent": 0, "retried": 0, "failed": 0}
+
+    def enqueue(self, sender: str, password: Optional[str], recipient: str, subject: str, message: str) -> str:
+        """Queue a rendered message and return its id without waiting for delivery."""
+        record = {
+            "id": str(uuid.uuid4()),
+            "recipient": recipient,
+            "subject": subject,
+            "status": "queued",
+            "attempts": 0,
+            "last_error": None,
+            "queued_at": datetime.utcnow().isoformat(),
+            "sent_at": None,
+        }
+        self._remember(record)
+        self._counts["queued"] += 1
+        self._ensure_started()
+        self._queue.put_nowait((record, sender, password, message))
+        return record["id"]
+
+    def status(self, message_id: str) -> Optional[Dict[str, Any]]:
+        record = self._messages.get(message_id)
+        return dict(record) if record else None
+
+    def messages(self, status: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """The most recent messages in the history, newest first, optionally only those in `status`."""
+        found = []
+        for record in reversed(self._messages.values()):
+            if status is None or record["status"] == status:
+                found.append(dict(record))
+                if len(found) >= limit:
+                    break
+        return found
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": len(self._tasks),
+            "pending": self._queue.qsize() if self._queue else 0,
+            "scheduled_retries": len(self._retries),
+            **self._counts,
+        }
+
+    async def start(self) -> None:
+        self._ensure_started()
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Give queued mail a bounded chance to go out, then stop the workers."""
+        if self._queue is not None:
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout)
+            except asyncio.TimeoutError:
+                print(f"Email outbox stopped with {self._queue.qsize()} undelivered messages")
+        for task in list(self._retries) + self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, *self._retries, return_exceptions=True)
+        self._tasks = []
+        self._retries = set()
+        self._queue = None
+
+    def _ensure_started(self) -> None:
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    def _remember(self, record: Dict[str, Any]) -> None:
+        self._messages[record["id"]] = record
+        while len(self._messages) > self.history:
+            self._messages.popitem(last=False)
+
+    async def _worker(self) -> None:
+        connection = SMTPConnection()
+        try:
+            while True:
+                record, sender, password, message = await self._queue.get()
+                record["status"] = "sending"
+                record["attempts"] += 1
+                try:
+                    await asyncio.to_thread(connection.send, sender, password, record["recipient"], message)
+                    record["status"] = "sent"
+                    record["sent_at"] = datetime.utcnow().isoformat()
+                    record["last_error"] = None
+                    self._counts["sent"] += 1
+                    print(f"Email {record['id']} sent to {record['recipient']}")
+                except Exception as e:
+                    await asyncio.to_thread(connection.close)
+                    record["last_error"] = str(e)
+                    if record["attempts"] < self.max_attempts:
+                        record["status"] = "retrying"
+                        self._counts["retried"] += 1
+                        self._schedule_retry(record, sender, password, message)
+                    else:
+                        record["status"] = "failed"
+                        self._counts["failed"] += 1
+                        print(f"Error sending email {record['id']} to {record['recipient']}: {e}")
+                finally:
+                    self._queue.task_done()
+        finally:
+            await asyncio.to_thread(connection.close)
+
+    def _schedule_retry(self, record: Dict[str, Any], sender: str, password: Optional[str], message: str) -> None:
+        delay = self.retry_base_seconds * 2 ** (record["attempts"] - 1)
+        delay *= random.uniform(0.5, 1.5)
+
+        async def requeue():
+            await asyncio.sleep(delay)
+            self._queue.put_nowait((record, sender, password, message))
+
+        task = asyncio.create_task(requeue())
+        self._retries.add(task)
+        task.add_done_callback(self._retries.discard)
+
+# Create a global email outbox instance
+outbox = EmailOutbox(EMAIL_OUTBOX_WORKERS, EMAIL_MAX_ATTEMPTS, EMAIL_RETRY_BASE_SECONDS, EMAIL_OUTBOX_HISTORY)
+
+def send_email(recipient: str, subject: str, template_name: str, context: dict = None) -> Optional[str]:
+    """Render an email template and queue it for background delivery.
+
+    Returns the outbox message id, or None if the message could not be queued.
+    """
     sender = os.getenv("EMAIL_SENDER")
     password = os.getenv("EMAIL_PASSWORD")
 
-    if not sender or not password:
+    if not sender or (EMAIL_SMTP_AUTH and not password):
         print("Error: Email sender or password missing")
-        return
+        return None
 
     # Render the template
-    template = env.get_template(template_name)
-    body = template.render(**(context or {}))
+    body = render_template(template_name, context)
 
     # Create message
     msg = MIMEMultipart()
@@ -31,10 +243,19 @@ def send_email(recipient: str, subject: str, template_name: str, context: dict =
     msg.attach(MIMEText(body, "html"))
 
     try:
-        with smtplib.SMTP("smtp.gmail.com", 587) as server:
-            server.starttls()
-            server.login(sender, password)
-            server.sendmail(sender, recipient, msg.as_string())
-        print(f"Email sent to {recipient}")
-    except Exception as e:
-        print(f"Error sending email: {e}")
\ No newline at end of file
+        asyncio.get_running_loop()
+    except RuntimeError:
+        # No event loop (e.g. a script): deliver inline instead of queueing
+        connection = SMTPConnection()
+        try:
+            connection.send(sender, password, recipient, msg.as_string())
+            print(f"Email sent to {recipient}")
+        except Exception as e:
+            print(f"Error sending email: {e}")
+        finally:
+            connection.close()
+        return None
+
+    message_id = outbox.enqueue(sender, password, recipient, subject, msg.as_string())
+    print(f"Queued email {message_id} to {recipient}")
+    return message_id
@@ -0,0 +1,73 @@
+# banjos_restaurant\app\utils\export.py
+import csv
+import io
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List
+import orjson
+from fastapi.responses import StreamingResponse
+
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+# Spreadsheet apps evaluate cells starting with these; applicant text must never run as a formula
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+def _csv_cell(value: Any) -> Any:
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        return f"'{value}"
+    return value
+
+def _csv_chunk(rows: Iterable[Dict[str, Any]], fields: List[str], header: bool) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(fields)
+    writer.writerows([_csv_cell(row.get(field)) for field in fields] for row in rows)
+    return buffer.getvalue().encode("utf-8")
+
+def _ndjson_chunk(rows: Iterable[Dict[str, Any]], fields: List[str]) -> bytes:
+    return b"".join(
+        orjson.dumps({field: row.get(field) for field in fields}, option=orjson.OPT_APPEND_NEWLINE)
+        for row in rows
+    )
+
+async def export_response(
+    pages: AsyncIterator[List[Dict[str, Any]]],
+    to_row: Callable[[Dict[str, Any]], Dict[str, Any]],
+    fields: List[str],
+    export_format: str,
+    filename: str,
+) -> StreamingResponse:
+    """Stream pages of raw DynamoDB items as NDJSON or CSV, one chunk per page.
+
+    The first page is read before the response starts, so a failing query
+    still gets an error status; later failures cut the stream short.
+    """
+    try:
+        first_page = await pages.__anext__()
+    except StopAsyncIteration:
+        first_page = []
+
+    async def chunks():
+        page = first_page
+        header = True
+        try:
+            while True:
+                rows = [to_row(item) for item in page]
+                if export_format == "csv":
+                    yield _csv_chunk(rows, fields, header)
+                    header = False
+                else:
+                    yield _ndjson_chunk(rows, fields)
+                page = await pages.__anext__()
+        except StopAsyncIteration:
+            return
+        except Exception as e:
+            print(f"Error streaming {filename} export: {e}")
+            raise
+        finally:
+            await pages.aclose()
+
+    return StreamingResponse(
+        chunks(),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{export_format}"'}
+    )
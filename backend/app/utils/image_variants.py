@@ -0,0 +1,107 @@
+# banjos_restaurant\app\utils\image_variants.py
+import asyncio
+import glob
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+from app.core.config import IMAGE_VARIANT_WORKERS
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow is optional; without it uploads simply get no variants
+    Image = None
+    ImageOps = None
+
+# Longest edge, in pixels, of each generated variant
+VARIANT_SIZES = {"thumb": 200, "medium": 640, "large": 1280}
+JPEG_QUALITY = 85
+WEBP_QUALITY = 80
+
+def _save(image, path: str, image_format: str, **options) -> None:
+    # Render under a temporary name so a concurrent duplicate upload never sees a partial file
+    temp_path = f"{path}.{os.getpid()}.part"
+    image.save(temp_path, image_format, **options)
+    os.replace(temp_path, path)
+
+def render_variants(source_path: str) -> Dict[str, str]:
+    """Render every size of `source_path` in its fallback format and as WebP.
+
+    Runs inside a worker process. Variants sit next to the source as
+    `<source>.<size>.<ext>`; returns a mapping such as
+    `{"thumb": path, "thumb_webp": path, ...}`.
+    """
+    with Image.open(source_path) as opened:
+        image = ImageOps.exif_transpose(opened)
+        has_alpha = image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info)
+        image = image.convert("RGBA" if has_alpha else "RGB")
+
+    # Transparent images stay PNG; everything else falls back to progressive JPEG
+    fallback_ext, fallback_format, fallback_options = (
+        (".png", "PNG", {"optimize": True}) if has_alpha
+        else (".jpg", "JPEG", {"quality": JPEG_QUALITY, "optimize": True, "progressive": True})
+    )
+    variants = {}
+    for name, size in VARIANT_SIZES.items():
+        resized = image.copy()
+        resized.thumbnail((size, size), Image.LANCZOS)
+        fallback_path = f"{source_path}.{name}{fallback_ext}"
+        _save(resized, fallback_path, fallback_format, **fallback_options)
+        webp_path = f"{source_path}.{name}.webp"
+        _save(resized, webp_path, "WEBP", quality=WEBP_QUALITY, method=4)
+        variants[name] = fallback_path
+        variants[f"{name}_webp"] = webp_path
+    return variants
+
+def variant_files(source_path: str) -> List[str]:
+    """Every variant file rendered for `source_path`."""
+    return [
+        path for path in glob.glob(f"{glob.escape(source_path)}.*")
+        if not path.endswith(".part")
+    ]
+
+class ImageVariantGenerator:
+    """Render image variants on a process pool, off the event loop.
+
+    Resizing and encoding are CPU-bound and hold the GIL, so they run in
+    separate processes. The pool is created at startup, and its processes
+    come from a fork server (or are spawned): forking the running server,
+    with its thread pools mid-flight, could copy a held lock into a child.
+    """
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def available(self) -> bool:
+        return Image is not None
+
+    def start(self) -> None:
+        if self._executor is None and self.available:
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context(method)
+            )
+
+    async def generate(self, source_path: str) -> Dict[str, str]:
+        """Render variants for an image on disk; returns {} if they cannot be made."""
+        if not self.available:
+            return {}
+        # Scripts that never ran the app startup get the pool on first use
+        self.start()
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._executor, render_variants, source_path)
+        except Exception as e:
+            print(f"Error generating image variants for {source_path}: {e}")
+            return {}
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+# Create a global image variant generator instance
+image_variants = ImageVariantGenerator(IMAGE_VARIANT_WORKERS)
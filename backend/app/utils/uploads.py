@@ -0,0 +1,74 @@
+# banjos_restaurant\app\utils\uploads.py
+import asyncio
+import hashlib
+import os
+import uuid
+from dataclasses import dataclass
+from fastapi import UploadFile, HTTPException, status
+from app.core.config import MAX_UPLOAD_BYTES, UPLOAD_CHUNK_SIZE
+
+@dataclass
+class StoredUpload:
+    """Where an upload landed on disk, with its size and SHA-256 checksum."""
+    path: str
+    size: int
+    sha256: str
+
+    @property
+    def url(self) -> str:
+        return f"/{self.path}"
+
+def _write_chunk(handle, digest, chunk: bytes) -> None:
+    digest.update(chunk)
+    handle.write(chunk)
+
+def _discard(handle, path: str) -> None:
+    handle.close()
+    if os.path.exists(path):
+        os.remove(path)
+
+async def stream_to_temp(file: UploadFile, directory: str, max_bytes: int = MAX_UPLOAD_BYTES) -> StoredUpload:
+    """Stream an upload into a temporary file inside `directory`.
+
+    The upload is read in fixed-size chunks; hashing and disk writes run off
+    the event loop, and the upload is rejected with a 413 as soon as it
+    exceeds `max_bytes`. The caller moves the returned temp file into place.
+    """
+    os.makedirs(directory, exist_ok=True)
+    temp_path = f"{directory}/.{uuid.uuid4().hex}.part"
+    digest = hashlib.sha256()
+    size = 0
+    handle = await asyncio.to_thread(open, temp_path, "wb")
+    try:
+        while True:
+            chunk = await file.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > max_bytes:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=f"Upload exceeds the {max_bytes // (1024 * 1024)} MB limit"
+                )
+            await asyncio.to_thread(_write_chunk, handle, digest, chunk)
+        await asyncio.to_thread(handle.close)
+    except BaseException:
+        await asyncio.to_thread(_discard, handle, temp_path)
+        raise
+    return StoredUpload(path=temp_path, size=size, sha256=digest.hexdigest())
+
+async def save_upload(file: UploadFile, directory: str, filename: str, max_bytes: int = MAX_UPLOAD_BYTES) -> StoredUpload:
+    """Stream an upload to `directory/filename` and return where it was stored.
+
+    The file only appears under its final name once fully written, so readers
+    never see a partial upload.
+    """
+    temp = await stream_to_temp(file, directory, max_bytes)
+    # Never let a client-supplied filename escape the target directory
+    final_path = f"{directory}/{os.path.basename(filename)}"
+    try:
+        await asyncio.to_thread(os.replace, temp.path, final_path)
+    except BaseException:
+        await asyncio.to_thread(os.remove, temp.path)
+        raise
+    return StoredUpload(path=final_path, size=temp.size, sha256=temp.sha256)
@@ -0,0 +1,149 @@
+# banjos_restaurant\benchmarks\bench_serialization.py
+"""Compare response serialization paths for the largest list endpoints.
+
+For each endpoint this times what FastAPI does after the handler returns:
+validation and serialization by the response model (identical on both
+paths), then rendering with the stdlib-backed JSONResponse (the old default)
+or ORJSONResponse (the current default). Job applications are timed as the
+paginated envelope the route returns, at most one full page. For the menu
+it also times building the pre-encoded snapshot, which goes straight from
+models to bytes.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_serialization --rows 500 --repeat 50
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from datetime import datetime
+from typing import Callable, List
+import orjson
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from pydantic import TypeAdapter
+from app.core.config import PAGE_MAX_LIMIT
+from app.core.pagination import Page, encode_cursor
+from app.models.branches import BranchModel
+from app.models.menu import MenuModel
+from app.schemas.branches import BranchResponse
+from app.schemas.job_applications import JobApplicationResponse
+from app.schemas.menu import MenuResponse
+
+def sample_menu(rows: int) -> List[MenuModel]:
+    now = datetime.utcnow()
+    return [
+        MenuModel(
+            id=str(uuid.uuid4()),
+            name=f"Dish {i}",
+            description="Slow-cooked, served with house chutney and a side salad. " * 2,
+            category_name=f"Category {i % 12}",
+            price=149.0 + i,
+            parcel_price=159.0 + i,
+            image_url=f"/static/images/cas/ab/{uuid.uuid4().hex}.jpg",
+            image_variants={"thumb": "/t.jpg", "thumb_webp": "/t.webp", "medium": "/m.jpg", "medium_webp": "/m.webp"},
+            created_at=now,
+            updated_at=now,
+        )
+        for i in range(rows)
+    ]
+
+def sample_branches(rows: int) -> List[BranchModel]:
+    return [
+        BranchModel(
+            id=str(uuid.uuid4()),
+            name=f"Branch {i}",
+            latitude=18.5 + i / 1000,
+            longitude=73.8 + i / 1000,
+            address=f"{i} Main Road",
+            city="Pune",
+            state="MH",
+            country="India",
+            zipcode="411001",
+            phone_number="+91 98765 43210",
+            email="branch@example.com",
+            opening_hours="Mon-Sun 10:00-23:00",
+            seating_capacity=80,
+        )
+        for i in range(rows)
+    ]
+
+def sample_job_applications(rows: int) -> Page[JobApplicationResponse]:
+    """One full page, as the paginated listing returns it; no page is larger than PAGE_MAX_LIMIT."""
+    rows = min(rows, PAGE_MAX_LIMIT)
+    now = datetime.utcnow().isoformat()
+    applications = [
+        JobApplicationResponse(**{
+            "id": str(uuid.uuid4()),
+            "full_name": f"Applicant {i}",
+            "email": f"applicant{i}@example.com",
+            "phone": "9876543210",
+            "address": "Pune",
+            "job_position_id": str(uuid.uuid4()),
+            "job_position_title": "Line Cook",
+            "experience": "3 years",
+            "skills": "Tandoor, grill, prep",
+            "cover_letter": "I would love to join the team. " * 10,
+            "resume_url": f"/static/resumes/{uuid.uuid4()}.pdf",
+            "status": "Pending",
+            "created_at": now,
+            "updated_at": now,
+        })
+        for i in range(rows)
+    ]
+    last_key = {"Home": {"S": "JobApplications"}, "1": {"S": applications[-1].id}} if applications else None
+    return Page[JobApplicationResponse](
+        items=applications,
+        next_cursor=encode_cursor("JobApplications", last_key),
+        limit=rows,
+    )
+
+def orjson_equal(left: bytes, right: bytes) -> bool:
+    """Both renderers must produce the same document."""
+    return orjson.loads(left) == orjson.loads(right)
+
+def best_of(repeat: int, func: Callable[[], object]) -> float:
+    """Best wall time of `repeat` runs, in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=500, help="items per list response")
+    parser.add_argument("--repeat", type=int, default=30, help="runs per measurement (best is reported)")
+    args = parser.parse_args()
+
+    endpoints = [
+        ("GET /menu", List[MenuResponse], sample_menu(args.rows)),
+        ("GET /branches", List[BranchResponse], sample_branches(args.rows)),
+        ("GET /job-applications", Page[JobApplicationResponse], sample_job_applications(args.rows)),
+    ]
+    loop = asyncio.new_event_loop()
+    print(f"{args.rows} rows per response, best of {args.repeat} runs (ms)\n")
+    print(f"{'endpoint':<24}{'response model':>16}{'json render':>13}{'orjson render':>15}{'speedup':>9}")
+    for name, response_type, content in endpoints:
+        # Validation and serialization by the response model are the same on both paths
+        field = create_model_field(name="Response", type_=response_type, mode="serialization")
+        serialize = lambda: loop.run_until_complete(serialize_response(field=field, response_content=content))
+        model = best_of(args.repeat, serialize)
+        serialized = serialize()
+        stdlib = best_of(args.repeat, lambda: JSONResponse(serialized).body)
+        fast = best_of(args.repeat, lambda: ORJSONResponse(serialized).body)
+        assert orjson_equal(JSONResponse(serialized).body, ORJSONResponse(serialized).body)
+        print(f"{name:<24}{model:>16.2f}{stdlib:>13.2f}{fast:>15.2f}{stdlib / fast:>8.1f}x")
+    loop.close()
+
+    # The menu snapshot validates once and dumps straight to bytes; steady-state requests reuse them
+    adapter = TypeAdapter(List[MenuResponse])
+    menu = endpoints[0][2]
+    snapshot = best_of(args.repeat, lambda: adapter.dump_json(adapter.validate_python(menu, from_attributes=True)))
+    print(f"\nGET /menu snapshot build (model -> bytes): {snapshot:.2f} ms, paid once per menu change")
+
+if __name__ == "__main__":
+    main()
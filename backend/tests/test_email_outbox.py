@@ -0,0 +1,150 @@
+# banjos_restaurant\tests\test_email_outbox.py
+import asyncio
+import socket
+import pytest
+from aiosmtpd import controller as aiosmtpd_controller
+from app.utils import email
+from app.utils.email import EmailOutbox
+
+SENDER = "outbox@example.com"
+
+# Kept for polling, so tests that patch asyncio.sleep only see the outbox's own sleeps
+_poll_sleep = asyncio.sleep
+
+class RecordingHandler:
+    """Accepts every message and counts the SMTP sessions it was delivered over."""
+
+    def __init__(self):
+        self.sessions = 0
+        self.recipients = []
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        self.sessions += 1
+        session.host_name = hostname
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        self.recipients.extend(envelope.rcpt_tos)
+        return "250 OK"
+
+def _free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+@pytest.fixture
+def smtp_port(monkeypatch):
+    """Point the outbox at plain SMTP on localhost, without TLS or login."""
+    port = _free_port()
+    monkeypatch.setattr(email, "EMAIL_SMTP_HOST", "127.0.0.1")
+    monkeypatch.setattr(email, "EMAIL_SMTP_PORT", port)
+    monkeypatch.setattr(email, "EMAIL_SMTP_STARTTLS", False)
+    monkeypatch.setattr(email, "EMAIL_SMTP_AUTH", False)
+    monkeypatch.setattr(email, "EMAIL_SMTP_TIMEOUT", 5.0)
+    return port
+
+@pytest.fixture
+def smtp_server(smtp_port):
+    handler = RecordingHandler()
+    controller = aiosmtpd_controller.Controller(handler, hostname="127.0.0.1", port=smtp_port)
+    controller.start()
+    yield controller
+    controller.stop()
+
+def _message(recipient: str) -> str:
+    return f"From: {SENDER}\r\nTo: {recipient}\r\nSubject: Hello\r\n\r\nHello"
+
+def _enqueue(outbox: EmailOutbox, recipient: str) -> str:
+    return outbox.enqueue(SENDER, None, recipient, "Hello", _message(recipient))
+
+async def _settled(outbox: EmailOutbox, message_ids, timeout: float = 10.0):
+    """Wait until every message is sent or has failed for good."""
+    async def poll():
+        while any(outbox.status(message_id)["status"] not in ("sent", "failed") for message_id in message_ids):
+            await _poll_sleep(0.01)
+    await asyncio.wait_for(poll(), timeout)
+    return [outbox.status(message_id) for message_id in message_ids]
+
+def test_enqueue_returns_before_delivery(smtp_server):
+    async def scenario():
+        outbox = EmailOutbox(workers=1, max_attempts=1, retry_base_seconds=0.01, history=10)
+        message_id = _enqueue(outbox, "first@example.com")
+        # Nothing has been delivered until the event loop runs the worker
+        assert outbox.status(message_id)["status"] == "queued"
+        assert smtp_server.handler.recipients == []
+        [record] = await _settled(outbox, [message_id])
+        await outbox.stop()
+        return record
+
+    record = asyncio.run(scenario())
+    assert record["status"] == "sent"
+    assert record["attempts"] == 1
+    assert smtp_server.handler.recipients == ["first@example.com"]
+
+def test_messages_share_one_connection(smtp_server):
+    async def scenario():
+        outbox = EmailOutbox(workers=1, max_attempts=1, retry_base_seconds=0.01, history=10)
+        message_ids = [_enqueue(outbox, f"user{number}@example.com") for number in range(5)]
+        records = await _settled(outbox, message_ids)
+        await outbox.stop()
+        return records, outbox.stats()
+
+    records, stats = asyncio.run(scenario())
+    assert [record["status"] for record in records] == ["sent"] * 5
+    assert stats["sent"] == 5
+    assert smtp_server.handler.sessions == 1
+
+def test_reconnects_after_the_server_drops(smtp_port):
+    handler = RecordingHandler()
+
+    async def scenario():
+        outbox = EmailOutbox(workers=1, max_attempts=1, retry_base_seconds=0.01, history=10)
+        controller = aiosmtpd_controller.Controller(handler, hostname="127.0.0.1", port=smtp_port)
+        controller.start()
+        try:
+            await _settled(outbox, [_enqueue(outbox, "before@example.com")])
+            # Restarting the server drops the worker's open session
+            controller.stop()
+            controller = aiosmtpd_controller.Controller(handler, hostname="127.0.0.1", port=smtp_port)
+            controller.start()
+            [record] = await _settled(outbox, [_enqueue(outbox, "after@example.com")])
+            await outbox.stop()
+            return record
+        finally:
+            controller.stop()
+
+    record = asyncio.run(scenario())
+    # Delivered on the first attempt: the reconnect happens inside the send
+    assert record["status"] == "sent"
+    assert record["attempts"] == 1
+    assert handler.recipients == ["before@example.com", "after@example.com"]
+    assert handler.sessions == 2
+
+def test_retries_with_backoff_then_fails(smtp_port, monkeypatch):
+    delays = []
+
+    async def recording_sleep(delay, *args, **kwargs):
+        delays.append(delay)
+        await _poll_sleep(0)
+
+    async def scenario():
+        outbox = EmailOutbox(workers=1, max_attempts=3, retry_base_seconds=0.2, history=10)
+        # No server is listening on the port, so every attempt fails
+        message_id = _enqueue(outbox, "nobody@example.com")
+        with monkeypatch.context() as patch:
+            patch.setattr(email.asyncio, "sleep", recording_sleep)
+            [record] = await _settled(outbox, [message_id])
+        await outbox.stop()
+        return record, outbox.stats(), outbox.messages(status="failed")
+
+    record, stats, failed = asyncio.run(scenario())
+    assert [message["id"] for message in failed] == [record["id"]]
+    assert record["status"] == "failed"
+    assert record["attempts"] == 3
+    assert record["last_error"]
+    assert stats["retried"] == 2
+    assert stats["failed"] == 1
+    # Exponential backoff with up to +/-50% jitter: ~0.2s, then ~0.4s
+    assert len(delays) == 2
+    assert 0.1 <= delays[0] <= 0.3
+    assert 0.2 <= delays[1] <= 0.6
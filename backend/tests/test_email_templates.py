@@ -0,0 +1,28 @@
+# banjos_restaurant\tests\test_email_templates.py
+from app.utils.email import precompile_templates, render_batch, render_template
+
+TEMPLATE = "job_application_status_update.html"
+
+def _contexts():
+    return [
+        {"applicant_name": "Asha", "position_title": "Chef", "status": "Under Review"},
+        {"applicant_name": "Ravi", "position_title": "Cashier", "status": "Selected"},
+        {"applicant_name": "Meera", "position_title": "Server", "status": "Rejected"},
+    ]
+
+def test_render_batch_matches_single_renders():
+    assert precompile_templates() > 0
+    bodies = render_batch(TEMPLATE, _contexts())
+    assert bodies == [render_template(TEMPLATE, context) for context in _contexts()]
+
+def test_render_batch_fills_each_context():
+    bodies = render_batch(TEMPLATE, _contexts())
+    assert len(bodies) == 3
+    for body, context in zip(bodies, _contexts()):
+        assert context["applicant_name"] in body
+        assert context["position_title"] in body
+        assert context["status"].lower().replace(" ", "-") in body
+    assert "Ravi" not in bodies[0]
+
+def test_render_batch_of_nothing():
+    assert render_batch(TEMPLATE, []) == []
@@ -0,0 +1,42 @@
+# banjos_restaurant\tests\test_opening_hours.py
+import pytest
+from app.core.opening_hours import MINUTES_PER_DAY, parse_opening_hours
+
+DAY = MINUTES_PER_DAY
+
+def _week(start: int, end: int, days=range(7)):
+    """The same hours (minutes past midnight) on each of `days`."""
+    return [(day * DAY + start, day * DAY + end) for day in days]
+
+@pytest.mark.parametrize("text, expected", [
+    # Hours first, then the closed day: open every other day
+    ("11:00 AM - 11:00 PM, Monday Closed", _week(11 * 60, 23 * 60, range(1, 7))),
+    ("9:00 - 21:00 (Sunday closed)", _week(9 * 60, 21 * 60, range(6))),
+    ("Mon-Sat 10-22, Sun closed", _week(10 * 60, 22 * 60, range(6))),
+    ("Sat & Sun closed, Mon-Fri 9-17", _week(9 * 60, 17 * 60, range(5))),
+    ("daily 10-22, closed on Mondays", _week(10 * 60, 22 * 60, range(1, 7))),
+    ("10-22 daily", _week(10 * 60, 22 * 60)),
+    ("10-22 Mon-Fri, 11-23 Sat-Sun", _week(10 * 60, 22 * 60, range(5)) + _week(11 * 60, 23 * 60, (5, 6))),
+])
+def test_days_and_closed_days(text, expected):
+    assert parse_opening_hours(text) == expected
+
+@pytest.mark.parametrize("text, expected", [
+    # A 12-hour range without am/pm that ends on a smaller number runs into the afternoon
+    ("Mon-Fri 9am-5pm, Sat 10-2", _week(9 * 60, 17 * 60, range(5)) + [(5 * DAY + 10 * 60, 5 * DAY + 14 * 60)]),
+    ("12-3", _week(12 * 60, 15 * 60)),
+    ("5-9pm", _week(17 * 60, 21 * 60)),
+    ("10-11pm", _week(10 * 60, 23 * 60)),
+])
+def test_twelve_hour_ranges(text, expected):
+    assert parse_opening_hours(text) == expected
+
+def test_overnight_hours_wrap_into_the_next_day():
+    intervals = parse_opening_hours("22-2")
+    assert intervals[0] == (0, 2 * 60)  # Sunday night into Monday
+    assert (22 * 60, DAY + 2 * 60) in intervals
+
+def test_unknown_and_never_open():
+    assert parse_opening_hours(None) is None
+    assert parse_opening_hours("call us") is None
+    assert parse_opening_hours("Sun closed") == []